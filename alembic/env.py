@@ -7,16 +7,24 @@ from alembic import context
 
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.app.core.config import settings
+from src.app.core.config import get_settings
 from src.app.db.base import Base
 
 
 config = context.config
+settings = get_settings()
 
-config.set_main_option(
-    "sqlalchemy.url",
-    f"postgresql+psycopg2://{settings.database_user}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}",
-)
+# Every shard has the full schema; migrate shard N with `alembic -x shard=N ...`
+shard = int(context.get_x_argument(as_dictionary=True).get("shard", 0))
+if shard:
+    config.set_main_option(
+        "sqlalchemy.url", settings.database_shard_urls[shard - 1].replace("%", "%%")
+    )
+else:
+    config.set_main_option(
+        "sqlalchemy.url",
+        f"postgresql+psycopg2://{settings.database_user}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}",
+    )
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
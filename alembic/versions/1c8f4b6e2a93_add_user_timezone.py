@@ -0,0 +1,53 @@
+"""add user timezone
+
+Revision ID: 1c8f4b6e2a93
+Revises: 5a7c0e3d9f68
+Create Date: 2026-10-19 19:12:38.204617
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1c8f4b6e2a93"
+down_revision: Union[str, Sequence[str], None] = "5a7c0e3d9f68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "timezone", sa.String(), server_default=sa.text("'UTC'"), nullable=False
+        ),
+    )
+    op.add_column("expenses", sa.Column("local_date", sa.Date(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE expenses SET local_date = (expenses.date AT TIME ZONE users.timezone)::date
+        FROM users
+        WHERE users.id = expenses.user_id
+        """
+    )
+    op.alter_column("expenses", "local_date", nullable=False)
+    op.create_index(
+        "ix_expenses_user_id_local_date",
+        "expenses",
+        ["user_id", "local_date"],
+        unique=False,
+        postgresql_include=["category_id", "amount"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_expenses_user_id_local_date", table_name="expenses")
+    op.drop_column("expenses", "local_date")
+    op.drop_column("users", "timezone")
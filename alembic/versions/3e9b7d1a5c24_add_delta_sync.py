@@ -0,0 +1,102 @@
+"""add delta sync
+
+Revision ID: 3e9b7d1a5c24
+Revises: 8d2a6c4f1e07
+Create Date: 2026-10-19 21:12:06.530714
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e9b7d1a5c24"
+down_revision: Union[str, Sequence[str], None] = "8d2a6c4f1e07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("expenses", "budgets"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                "row_version",
+                sa.BigInteger(),
+                server_default=sa.text("0"),
+                nullable=False,
+            ),
+        )
+        op.create_index(
+            f"ix_{table}_user_id_row_version",
+            table,
+            ["user_id", "row_version", "id"],
+            unique=False,
+        )
+
+    for name in ("change_version", "sync_floor"):
+        op.add_column(
+            "user_counters",
+            sa.Column(
+                name, sa.BigInteger(), server_default=sa.text("0"), nullable=False
+            ),
+        )
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(length=16), nullable=False),
+        sa.Column("record_id", sa.Integer(), nullable=False),
+        sa.Column("row_version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_sync_tombstones_deleted_at"),
+        "sync_tombstones",
+        ["deleted_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_sync_tombstones_user_id_row_version",
+        "sync_tombstones",
+        ["user_id", "row_version", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_sync_tombstones_user_id_row_version", table_name="sync_tombstones"
+    )
+    op.drop_index(op.f("ix_sync_tombstones_deleted_at"), table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+
+    for name in ("sync_floor", "change_version"):
+        op.drop_column("user_counters", name)
+
+    for table in ("budgets", "expenses"):
+        op.drop_index(f"ix_{table}_user_id_row_version", table_name=table)
+        op.drop_column(table, "row_version")
+        op.drop_column(table, "updated_at")
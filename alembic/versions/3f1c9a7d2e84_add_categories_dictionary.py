@@ -0,0 +1,103 @@
+"""add categories dictionary
+
+Revision ID: 3f1c9a7d2e84
+Revises: b7858b2acd15
+Create Date: 2026-10-19 10:12:31.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1c9a7d2e84"
+down_revision: Union[str, Sequence[str], None] = "b7858b2acd15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "categories",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("id", sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "id"),
+        sa.UniqueConstraint("user_id", "name", name="user_category_name_unique"),
+    )
+
+    # Number every distinct (user, category name) pair found in either table.
+    op.execute(
+        """
+        INSERT INTO categories (user_id, id, name)
+        SELECT user_id,
+               row_number() OVER (PARTITION BY user_id ORDER BY category),
+               category
+        FROM (
+            SELECT user_id, category FROM expenses
+            UNION
+            SELECT user_id, category FROM budgets
+        ) AS names
+        """
+    )
+
+    for table in ("expenses", "budgets"):
+        op.add_column(table, sa.Column("category_id", sa.SmallInteger(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} AS t
+            SET category_id = c.id
+            FROM categories AS c
+            WHERE c.user_id = t.user_id AND c.name = t.category
+            """
+        )
+        op.alter_column(table, "category_id", nullable=False)
+        op.create_foreign_key(
+            f"{table}_user_id_category_id_fkey",
+            table,
+            "categories",
+            ["user_id", "category_id"],
+            ["user_id", "id"],
+            ondelete="CASCADE",
+        )
+
+    op.drop_constraint("user_category_month_unique", "budgets", type_="unique")
+    op.create_unique_constraint(
+        "user_category_month_unique", "budgets", ["user_id", "category_id", "month"]
+    )
+
+    op.drop_column("expenses", "category")
+    op.drop_column("budgets", "category")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("expenses", "budgets"):
+        op.add_column(table, sa.Column("category", sa.String(), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} AS t
+            SET category = c.name
+            FROM categories AS c
+            WHERE c.user_id = t.user_id AND c.id = t.category_id
+            """
+        )
+        op.alter_column(table, "category", nullable=False)
+
+    op.drop_constraint("user_category_month_unique", "budgets", type_="unique")
+    op.create_unique_constraint(
+        "user_category_month_unique", "budgets", ["user_id", "category", "month"]
+    )
+
+    for table in ("expenses", "budgets"):
+        op.drop_constraint(
+            f"{table}_user_id_category_id_fkey", table, type_="foreignkey"
+        )
+        op.drop_column(table, "category_id")
+
+    op.drop_table("categories")
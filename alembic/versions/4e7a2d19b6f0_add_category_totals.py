@@ -0,0 +1,57 @@
+"""add category totals
+
+Revision ID: 4e7a2d19b6f0
+Revises: c81f5a3e07d2
+Create Date: 2026-10-19 15:03:55.640219
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e7a2d19b6f0"
+down_revision: Union[str, Sequence[str], None] = "c81f5a3e07d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "category_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.SmallInteger(), nullable=False),
+        sa.Column(
+            "total",
+            sa.Numeric(precision=14, scale=2),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "expense_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("user_id", "category_id"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO category_totals (user_id, category_id, total, expense_count)
+        SELECT user_id, category_id, sum(amount), count(*)
+        FROM expenses
+        GROUP BY user_id, category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("category_totals")
@@ -0,0 +1,34 @@
+"""add user shard
+
+Revision ID: 5a7c0e3d9f68
+Revises: e2d86a4f1b57
+Create Date: 2026-10-19 18:04:12.551930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5a7c0e3d9f68"
+down_revision: Union[str, Sequence[str], None] = "e2d86a4f1b57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column(
+            "shard", sa.SmallInteger(), server_default=sa.text("0"), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "shard")
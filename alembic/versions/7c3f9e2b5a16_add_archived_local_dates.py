@@ -0,0 +1,48 @@
+"""add archived local dates
+
+Revision ID: 7c3f9e2b5a16
+Revises: 1c8f4b6e2a93
+Create Date: 2026-10-19 23:04:51.218406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3f9e2b5a16"
+down_revision: Union[str, Sequence[str], None] = "1c8f4b6e2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "expense_archive",
+        sa.Column("local_dates", postgresql.ARRAY(sa.DATE()), nullable=True),
+    )
+    # The days of expenses archived so far were not kept; the best estimate
+    # is the user's current timezone, which the reads used until now
+    op.execute(
+        """
+        UPDATE expense_archive AS a
+        SET local_dates = ARRAY(
+            SELECT (d.date AT TIME ZONE users.timezone)::date
+            FROM unnest(a.dates) WITH ORDINALITY AS d(date, n)
+            ORDER BY d.n
+        )
+        FROM users
+        WHERE users.id = a.user_id
+        """
+    )
+    op.alter_column("expense_archive", "local_dates", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("expense_archive", "local_dates")
@@ -0,0 +1,34 @@
+"""add budget rollover
+
+Revision ID: 8d2a6c4f1e07
+Revises: 7c3f9e2b5a16
+Create Date: 2026-10-19 20:03:51.418269
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2a6c4f1e07"
+down_revision: Union[str, Sequence[str], None] = "7c3f9e2b5a16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "budgets",
+        sa.Column(
+            "rollover", sa.Boolean(), server_default=sa.text("false"), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("budgets", "rollover")
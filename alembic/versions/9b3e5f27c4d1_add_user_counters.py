@@ -0,0 +1,54 @@
+"""add user counters
+
+Revision ID: 9b3e5f27c4d1
+Revises: 4e7a2d19b6f0
+Create Date: 2026-10-19 16:12:08.318542
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b3e5f27c4d1"
+down_revision: Union[str, Sequence[str], None] = "4e7a2d19b6f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "user_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "expense_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "budget_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        "ix_expenses_user_id_date", "expenses", ["user_id", "date"], unique=False
+    )
+
+    op.execute(
+        """
+        INSERT INTO user_counters (user_id, expense_count, budget_count)
+        SELECT users.id,
+               (SELECT count(*) FROM expenses WHERE expenses.user_id = users.id),
+               (SELECT count(*) FROM budgets WHERE budgets.user_id = users.id)
+        FROM users
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_expenses_user_id_date", table_name="expenses")
+    op.drop_table("user_counters")
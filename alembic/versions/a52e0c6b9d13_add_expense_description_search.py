@@ -0,0 +1,56 @@
+"""add expense description search
+
+Revision ID: a52e0c6b9d13
+Revises: 3f1c9a7d2e84
+Create Date: 2026-10-19 11:40:02.731950
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a52e0c6b9d13"
+down_revision: Union[str, Sequence[str], None] = "3f1c9a7d2e84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    op.add_column(
+        "expenses",
+        sa.Column(
+            "description_search",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', description)"),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_expenses_user_id_description_search",
+        "expenses",
+        ["user_id", "description_search"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_expenses_user_id_description_trgm",
+        "expenses",
+        ["user_id", "description"],
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_expenses_user_id_description_trgm", table_name="expenses")
+    op.drop_index("ix_expenses_user_id_description_search", table_name="expenses")
+    op.drop_column("expenses", "description_search")
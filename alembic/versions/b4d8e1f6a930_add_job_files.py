@@ -0,0 +1,61 @@
+"""add job files
+
+Revision ID: b4d8e1f6a930
+Revises: 6d0b4e91c27a
+Create Date: 2026-10-20 09:41:27.635018
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4d8e1f6a930"
+down_revision: Union[str, Sequence[str], None] = "6d0b4e91c27a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_files",
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+    # Move the exports stored so far out of the queue rows
+    op.execute(
+        """
+        INSERT INTO job_files (job_id, content)
+        SELECT id, convert_to(result->>'content', 'UTF8')
+        FROM jobs
+        WHERE result ? 'content'
+        """
+    )
+    op.execute(
+        """
+        UPDATE jobs
+        SET result = (result - 'content')
+            || jsonb_build_object('size', octet_length(result->>'content'))
+        WHERE result ? 'content'
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        UPDATE jobs
+        SET result = (jobs.result - 'size')
+            || jsonb_build_object('content', convert_from(f.content, 'UTF8'))
+        FROM job_files AS f
+        WHERE f.job_id = jobs.id
+        """
+    )
+    op.drop_table("job_files")
@@ -0,0 +1,40 @@
+"""add stream tickets
+
+Revision ID: d5a1c7e9f342
+Revises: b4d8e1f6a930
+Create Date: 2026-10-20 11:08:53.402716
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a1c7e9f342"
+down_revision: Union[str, Sequence[str], None] = "b4d8e1f6a930"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "stream_tickets",
+        sa.Column("ticket_hash", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ticket_hash"),
+    )
+    op.create_index(
+        op.f("ix_stream_tickets_user_id"), "stream_tickets", ["user_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_stream_tickets_user_id"), table_name="stream_tickets")
+    op.drop_table("stream_tickets")
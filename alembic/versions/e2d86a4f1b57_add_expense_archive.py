@@ -0,0 +1,69 @@
+"""add expense archive
+
+Revision ID: e2d86a4f1b57
+Revises: 9b3e5f27c4d1
+Create Date: 2026-10-19 17:26:41.905317
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2d86a4f1b57"
+down_revision: Union[str, Sequence[str], None] = "9b3e5f27c4d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "expense_archive",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.SmallInteger(), nullable=False),
+        sa.Column("ids", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("category_ids", postgresql.ARRAY(sa.SmallInteger()), nullable=False),
+        sa.Column(
+            "amounts",
+            postgresql.ARRAY(sa.Numeric(precision=10, scale=2)),
+            nullable=False,
+        ),
+        sa.Column(
+            "dates", postgresql.ARRAY(sa.TIMESTAMP(timezone=True)), nullable=False
+        ),
+        sa.Column("descriptions", postgresql.ARRAY(sa.String()), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "year"),
+    )
+    op.create_table(
+        "monthly_totals",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.DATE(), nullable=False),
+        sa.Column("category_id", sa.SmallInteger(), nullable=False),
+        sa.Column(
+            "total",
+            sa.Numeric(precision=14, scale=2),
+            server_default=sa.text("0"),
+            nullable=False,
+        ),
+        sa.Column(
+            "expense_count", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("user_id", "month", "category_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("monthly_totals")
+    op.drop_table("expense_archive")
@@ -0,0 +1,127 @@
+"""
+Microbenchmarks of `crud.analytics`.
+
+Times the Python side of the analytics functions: building their statements,
+the compiled cache lookup and shaping the result rows. Data size is the
+number of rows the database returns (categories, or category-days), which is
+what the Python work grows with; the SQL itself is not executed.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from src.app.crud import analytics as crud_analytics
+from src.app.crud import categories as crud_categories
+
+
+SIZES = (10, 100, 1000)
+USER_ID = 1
+
+
+def categories(count: int) -> dict:
+    return {f"Category {i}": i for i in range(1, count + 1)}
+
+
+@pytest.fixture
+def category_cache():
+    """
+    Answers category lookups as the warm per-process cache would.
+    """
+    with patch.object(crud_categories, "get_category_ids") as get_ids:
+        yield get_ids
+
+
+def test_summary_month(bench, bench_session, category_cache):
+    category_cache.return_value = categories(20)
+    bench_session.rows = [(1,)]
+    summary = crud_analytics.get_summary(bench_session, USER_ID, 10, 2026)
+    assert summary["top_category"] == "Category 1"
+    assert summary["remaining_budget"] == 0
+    bench(lambda: crud_analytics.get_summary(bench_session, USER_ID, 10, 2026))
+
+
+def test_summary_all_time(bench, bench_session, category_cache):
+    category_cache.return_value = categories(20)
+    bench_session.rows = [(1,)]
+    summary = crud_analytics.get_summary(bench_session, USER_ID, None, None)
+    assert summary["total_spent"] == 1
+    bench(lambda: crud_analytics.get_summary(bench_session, USER_ID, None, None))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_category_breakdown(bench, bench_session, category_cache, size):
+    category_cache.return_value = categories(size)
+    bench_session.keys = ("category_id", "total", "percentage")
+    bench_session.rows = [
+        (i, Decimal(size - i + 1), Decimal("1.0")) for i in range(1, size + 1)
+    ]
+    rows = crud_analytics.get_category_breakdown_data(bench_session, USER_ID, 10, 2026)
+    assert len(rows) == size
+    assert (rows[0].category, rows[0].total) == ("Category 1", size)
+    bench(
+        lambda: crud_analytics.get_category_breakdown_data(
+            bench_session, USER_ID, 10, 2026
+        )
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_daily_spending_by_category(bench, bench_session, category_cache, size):
+    category_cache.return_value = categories(20)
+    start = date(2026, 1, 1)
+    bench_session.keys = ("category_id", "day", "total")
+    bench_session.rows = [
+        (i % 20 + 1, start + timedelta(days=i // 20), Decimal("12.50"))
+        for i in range(size)
+    ]
+    rows = crud_analytics.get_daily_spending(
+        bench_session, USER_ID, None, 2026, by_category=True
+    )
+    assert len(rows) == size
+    assert (rows[0].category, rows[0].day) == ("Category 1", start)
+    bench(
+        lambda: crud_analytics.get_daily_spending(
+            bench_session, USER_ID, None, 2026, by_category=True
+        )
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_period_comparison(bench, bench_session, category_cache, size):
+    category_cache.return_value = categories(size)
+    periods = [
+        crud_analytics.period_range(10, 2026),
+        crud_analytics.period_range(9, 2026),
+        crud_analytics.period_range(10, 2025),
+    ]
+    bench_session.keys = ("category_id", "period_0", "period_1", "period_2")
+    bench_session.rows = [
+        (i, Decimal(1), Decimal(2), Decimal(3)) for i in range(1, size + 1)
+    ]
+    rows = crud_analytics.get_period_comparison_data(bench_session, USER_ID, periods)
+    assert len(rows) == size
+    assert rows[-1].category == f"Category {size}"
+    assert (rows[0].period_0, rows[0].period_2) == (1, 3)
+    bench(
+        lambda: crud_analytics.get_period_comparison_data(
+            bench_session, USER_ID, periods
+        )
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_month_budgets(bench, bench_session, category_cache, size):
+    category_cache.return_value = categories(size)
+    bench_session.keys = ("category_id", "amount")
+    bench_session.rows = [(i, Decimal(100)) for i in range(1, size + 1)]
+    rows = crud_analytics.get_month_budgets(bench_session, USER_ID, date(2026, 10, 1))
+    assert len(rows) == size
+    assert (rows[0].category, rows[0].amount) == ("Category 1", 100)
+    bench(
+        lambda: crud_analytics.get_month_budgets(
+            bench_session, USER_ID, date(2026, 10, 1)
+        )
+    )
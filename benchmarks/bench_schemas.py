@@ -0,0 +1,73 @@
+"""
+Microbenchmarks of response serialization and request validation.
+
+`ExpenseResponse` lists are validated from ORM objects and dumped to JSON
+the way FastAPI does for a `response_model`; budget payloads go through
+`BudgetBase.standardize_month_to_first_day` as part of their validation.
+"""
+
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from src.app.models.categories import Categories
+from src.app.models.expenses import Expenses
+from src.app.schemas.budgets import BudgetBase, BudgetCreate
+from src.app.schemas.expenses import ExpenseResponse
+
+
+EXPENSE_LIST = TypeAdapter(List[ExpenseResponse])
+
+
+def expenses(count: int) -> List[Expenses]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    categories = [Categories(id=i, user_id=1, name=f"Category {i}") for i in range(20)]
+    rows = []
+    for i in range(count):
+        when = start + timedelta(minutes=37 * i)
+        expense = Expenses(
+            id=i + 1,
+            user_id=1,
+            amount=Decimal("12.50"),
+            description=f"Expense number {i}",
+            category_id=i % 20,
+            date=when,
+            local_date=when.date(),
+            updated_at=when,
+            row_version=i + 1,
+        )
+        expense.category_entry = categories[i % 20]
+        rows.append(expense)
+    return rows
+
+
+@pytest.mark.parametrize("size", (100, 1_000, 10_000))
+def test_expense_response_serialization(bench, size):
+    rows = expenses(size)
+    dumped = json.loads(
+        EXPENSE_LIST.dump_json(EXPENSE_LIST.validate_python(rows, from_attributes=True))
+    )
+    assert len(dumped) == size
+    assert dumped[-1]["category"] == f"Category {(size - 1) % 20}"
+    assert dumped[0]["amount"] == "12.50"
+    bench(
+        lambda: EXPENSE_LIST.dump_json(
+            EXPENSE_LIST.validate_python(rows, from_attributes=True)
+        )
+    )
+
+
+def test_standardize_month_to_first_day(bench):
+    month = date(2026, 10, 19)
+    assert BudgetBase.standardize_month_to_first_day(month) == date(2026, 10, 1)
+    bench(lambda: BudgetBase.standardize_month_to_first_day(month))
+
+
+def test_budget_create_validation(bench):
+    payload = {"category": "Food", "amount": "250.00", "month": "2026-10-19"}
+    assert BudgetCreate.model_validate(payload).month == date(2026, 10, 1)
+    bench(lambda: BudgetCreate.model_validate(payload))
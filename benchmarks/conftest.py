@@ -0,0 +1,198 @@
+"""
+Pytest Harness for the Microbenchmarks.
+
+The `bench_*.py` modules in this directory are collected by pytest and use
+the `bench` fixture to time a hot-path callable. Each benchmark is calibrated
+to run for at least `--bench-min-time` seconds per round and repeated
+`--bench-rounds` times; the fastest round is the result, since it is the
+least disturbed by other activity on the machine. Before timing, every
+benchmark checks the result of its callable once (a smoke assertion), so a
+hot path that returns wrong results fails instead of being timed.
+
+Results are written as JSON to `--bench-json`. Given a `--bench-baseline`
+(the JSON of an earlier run, on the same machine), a benchmark fails when it
+is more than `--bench-threshold` slower than its baseline. Typical use, with
+the baseline taken from the deployed revision:
+
+    python -m pytest benchmarks --bench-json baseline.json        # old code
+    python -m pytest benchmarks --bench-baseline baseline.json    # new code
+
+No database is needed: the hot paths run against `BenchSession`, which
+compiles the statements it is given, like a real session does before
+sending them to the driver, and returns canned rows.
+"""
+
+import json
+import os
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_NAME": "bench",
+    "SECRET_KEY": "benchmark-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2  # noqa: E402
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.util import LRUCache  # noqa: E402
+import src.app.db.base  # noqa: E402, F401  (registers every model with the mappers)
+
+
+DEFAULT_JSON = os.path.join(os.path.dirname(__file__), "results.json")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "microbenchmarks")
+    group.addoption(
+        "--bench-json",
+        default=DEFAULT_JSON,
+        help="Where to write the results (default: benchmarks/results.json).",
+    )
+    group.addoption(
+        "--bench-baseline",
+        default=None,
+        help="Results of an earlier run to compare against.",
+    )
+    group.addoption(
+        "--bench-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline, as a fraction (0.25).",
+    )
+    group.addoption("--bench-rounds", type=int, default=5, help="Rounds per bench.")
+    group.addoption(
+        "--bench-min-time",
+        type=float,
+        default=0.05,
+        help="Minimum duration of a round, in seconds (0.05).",
+    )
+
+
+def pytest_collect_file(file_path, parent):
+    # Paths given on the command line are collected by pytest itself
+    if (
+        file_path.suffix == ".py"
+        and file_path.name.startswith("bench_")
+        and not parent.session.isinitpath(file_path)
+    ):
+        return pytest.Module.from_parent(parent, path=file_path)
+
+
+def pytest_configure(config):
+    config._bench_results = {}
+    config._bench_baseline = {}
+    path = config.getoption("--bench-baseline")
+    if path:
+        with open(path) as f:
+            config._bench_baseline = json.load(f)["results"]
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config._bench_results:
+        return
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": config._bench_results,
+    }
+    with open(config.getoption("--bench-json"), "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+@pytest.fixture
+def bench(request) -> Callable:
+    """
+    Returns a function timing a callable and recording the result.
+
+    `bench(fn, name=None)` returns the seconds per call. The name defaults to
+    the test's ID; pass one when a test times several callables.
+    """
+    config = request.config
+
+    def run(fn: Callable[[], object], name: Optional[str] = None) -> float:
+        name = name or request.node.nodeid.split("::", 1)[-1]
+        fn()
+
+        timer = timeit.Timer(fn)
+        number, elapsed = timer.autorange()
+        min_time = config.getoption("--bench-min-time")
+        if elapsed < min_time:
+            number = max(number, int(number * min_time / elapsed) + 1)
+        rounds = timer.repeat(repeat=config.getoption("--bench-rounds"), number=number)
+        per_call = [elapsed / number for elapsed in rounds]
+        best = min(per_call)
+
+        config._bench_results[name] = {
+            "seconds": best,
+            "median_seconds": sorted(per_call)[len(per_call) // 2],
+            "iterations": number,
+            "rounds": len(per_call),
+        }
+
+        baseline = config._bench_baseline.get(name)
+        if baseline is not None:
+            limit = baseline["seconds"] * (1 + config.getoption("--bench-threshold"))
+            if best > limit:
+                pytest.fail(
+                    f"{name}: {best * 1e6:.2f} us/call, "
+                    f"{best / baseline['seconds'] - 1:.0%} slower than the baseline "
+                    f"({baseline['seconds'] * 1e6:.2f} us/call)"
+                )
+        return best
+
+    return run
+
+
+class BenchSession(Session):
+    """
+    Session that compiles every statement through a compiled cache, like
+    `Connection.execute()` does, and answers with `rows`.
+
+    Attributes:
+        keys (tuple): Column names of the canned result.
+        rows (list): Tuples returned by every statement.
+    """
+
+    dialect = PGDialect_psycopg2()
+
+    def __init__(self, keys=("value",), rows=()):
+        super().__init__()
+        self.cache = LRUCache(500)
+        self.keys = tuple(keys)
+        self.rows = list(rows)
+
+    def execute(self, statement, params=None, **kwargs):
+        statement._compile_w_cache(
+            self.dialect,
+            compiled_cache=self.cache,
+            column_keys=sorted(params or ()) if isinstance(params, dict) else [],
+        )
+        return IteratorResult(SimpleResultMetaData(self.keys), iter(self.rows))
+
+    def scalar(self, statement, params=None, **kwargs):
+        return self.execute(statement, params).scalar()
+
+    def scalars(self, statement, params=None, **kwargs):
+        return self.execute(statement, params).scalars()
+
+
+@pytest.fixture
+def bench_session() -> BenchSession:
+    return BenchSession()
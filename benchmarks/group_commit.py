@@ -0,0 +1,114 @@
+"""
+Benchmark of the latency/throughput trade-off of group commit.
+
+Concurrent clients create expenses through a `GroupCommitter` whose flush
+simulates a database write: a fixed cost per transaction, serialized like
+PostgreSQL serializes WAL flushes on commit, plus a small cost per row. Each
+window setting is run with the same clients and reports the throughput,
+the number of commits, the mean batch size and the per-create latency.
+"window 0" is a committer that never waits, and "off" writes every
+create in its own transaction, as `expense_group_commit = False` does.
+
+No database is needed. The default costs roughly match a commit on a local
+SSD; pass other ones to model slower or faster storage.
+
+Usage:
+    python benchmarks/group_commit.py [clients] [commit_ms] [row_ms]
+"""
+
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.core.group_commit import GroupCommitter  # noqa: E402
+
+
+WINDOWS_MS = (0, 1, 2, 5, 10)
+CREATES_PER_CLIENT = 50
+MAX_BATCH = 64
+
+
+def simulated_flush(commit_seconds: float, row_seconds: float):
+    """
+    Returns a flush function costing `commit_seconds` per call (one at a time)
+    plus `row_seconds` per item.
+    """
+    wal = threading.Lock()
+
+    def flush(items):
+        time.sleep(row_seconds * len(items))
+        with wal:
+            time.sleep(commit_seconds)
+        return items
+
+    return flush
+
+
+def run(clients: int, write) -> tuple:
+    """
+    Runs `clients` threads each making `CREATES_PER_CLIENT` writes; returns
+    the elapsed seconds and every write's latency.
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        mine = []
+        for i in range(CREATES_PER_CLIENT):
+            start = time.perf_counter()
+            result = write(i)
+            mine.append(time.perf_counter() - start)
+            # Smoke check: every caller gets the result of its own item
+            assert result == i, (result, i)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(label: str, elapsed: float, latencies, commits: int) -> None:
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1e3
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+    print(
+        f"{label:12s} {len(latencies) / elapsed:9.0f} /s {commits:8d} "
+        f"{len(latencies) / commits:8.1f} {p50:8.2f} ms {p99:8.2f} ms "
+        f"{statistics.mean(latencies) * 1e3:8.2f} ms"
+    )
+
+
+def main(clients: int, commit_ms: float, row_ms: float) -> None:
+    flush = simulated_flush(commit_ms / 1000, row_ms / 1000)
+    print(f"{clients} clients, {commit_ms} ms per commit, {row_ms} ms per row")
+    print(
+        f"{'':12s} {'throughput':>12s} {'commits':>8s} {'batch':>8s} "
+        f"{'p50':>11s} {'p99':>11s} {'mean':>11s}"
+    )
+
+    elapsed, latencies = run(clients, lambda item: flush([item])[0])
+    report("off", elapsed, latencies, len(latencies))
+
+    for window_ms in WINDOWS_MS:
+        committer = GroupCommitter(flush, window_ms / 1000, MAX_BATCH)
+        elapsed, latencies = run(clients, committer.submit)
+        assert committer.items == clients * CREATES_PER_CLIENT
+        report(f"window {window_ms}", elapsed, latencies, committer.batches)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else 32,
+        float(args[1]) if len(args) > 1 else 1.0,
+        float(args[2]) if len(args) > 2 else 0.02,
+    )
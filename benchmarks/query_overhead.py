@@ -0,0 +1,210 @@
+"""
+Microbenchmark of the Python-side overhead of the hot-path queries.
+
+Measures, per call, what happens in Python before a query reaches the
+database driver: building the statement and looking up its compiled SQL in
+SQLAlchemy's compiled cache. Each query is timed twice:
+
+- "query chain": the statement rebuilt with `db.query(...)` on every call,
+  as the CRUD functions used to do;
+- "prebuilt": the CRUD function as it is now, running its module-level
+  `select()` statement.
+
+No database is needed: the session used by the prebuilt variant only
+compiles the statements it is given and returns empty results.
+
+Usage:
+    python benchmarks/query_overhead.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+for name, value in {
+    "DATABASE_HOST": "localhost",
+    "DATABASE_PORT": "5432",
+    "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench",
+    "DATABASE_NAME": "bench",
+    "SECRET_KEY": "benchmark-secret-key",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import desc, extract, func  # noqa: E402
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from sqlalchemy.util import LRUCache  # noqa: E402
+from src.app.crud import analytics as crud_analytics  # noqa: E402
+from src.app.crud import archive as crud_archive  # noqa: E402
+from src.app.crud import budgets as crud_budgets  # noqa: E402
+from src.app.crud import categories as crud_categories  # noqa: E402
+from src.app.crud import expenses as crud_expenses  # noqa: E402
+from src.app.crud import users as crud_users  # noqa: E402
+from src.app.models.budgets import Budgets  # noqa: E402
+from src.app.models.category_totals import CategoryTotals  # noqa: E402
+from src.app.models.expenses import Expenses  # noqa: E402
+from src.app.models.users import Users  # noqa: E402
+
+
+DIALECT = PGDialect_psycopg2()
+MONTH = date(2026, 10, 1)
+
+
+class CompileOnlySession:
+    """
+    Stands in for a session: compiles each statement through a compiled cache,
+    like `Connection.execute()` does, and returns no rows.
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(500)
+
+    def compile(self, statement, params=None):
+        statement._compile_w_cache(
+            DIALECT, compiled_cache=self.cache, column_keys=sorted(params or ())
+        )
+
+    def scalar(self, statement, params=None):
+        self.compile(statement, params)
+        return None
+
+    def scalars(self, statement, params=None):
+        self.compile(statement, params)
+        return SimpleNamespace(first=lambda: None)
+
+    def execute(self, statement, params=None):
+        self.compile(statement, params)
+        return SimpleNamespace(all=list)
+
+
+def query_chains(db: Session, compile):
+    """
+    Returns the per-call statement building of the former `db.query(...)`
+    implementations, each followed by the compiled cache lookup.
+    """
+
+    def expense_by_id():
+        query = db.query(Expenses).filter(Expenses.id == 1, Expenses.user_id == 1)
+        compile(query.limit(1).statement)
+
+    def budget_by_category():
+        query = db.query(Budgets).filter(
+            Budgets.user_id == 1, Budgets.category_id == 1, Budgets.month == MONTH
+        )
+        compile(query.limit(1).statement)
+
+    def user_by_id():
+        compile(db.query(Users).filter(Users.id == 1).limit(1).statement)
+
+    def total_spent_all_time():
+        query = db.query(func.sum(CategoryTotals.total)).filter(
+            CategoryTotals.user_id == 1
+        )
+        compile(query.statement)
+
+    def total_spent_month():
+        spending = crud_archive.spending_rows(1)
+        query = db.query(func.sum(spending.c.amount)).filter(
+            extract("month", spending.c.local_date) == 10,
+            extract("year", spending.c.local_date) == 2026,
+        )
+        compile(query.statement)
+
+    def total_budget_month():
+        query = db.query(func.sum(Budgets.amount)).filter(Budgets.user_id == 1)
+        query = query.filter(extract("month", Budgets.month) == 10)
+        query = query.filter(extract("year", Budgets.month) == 2026)
+        compile(query.statement)
+
+    def top_category_month():
+        spending = crud_archive.spending_rows(1)
+        query = (
+            db.query(spending.c.category_id, func.sum(spending.c.amount).label("total"))
+            .filter(
+                extract("month", spending.c.local_date) == 10,
+                extract("year", spending.c.local_date) == 2026,
+            )
+            .group_by(spending.c.category_id)
+        )
+        compile(query.order_by(desc("total")).limit(1).statement)
+
+    return {
+        "get_expense_by_id": expense_by_id,
+        "get_budget_by_category": budget_by_category,
+        "get_user_by_id": user_by_id,
+        "get_total_spent (all time)": total_spent_all_time,
+        "get_total_spent (month)": total_spent_month,
+        "get_total_budget (month)": total_budget_month,
+        "get_top_category (month)": top_category_month,
+    }
+
+
+def prebuilt(db: CompileOnlySession):
+    """
+    Returns the current CRUD functions, bound to the compile-only session.
+    """
+    return {
+        "get_expense_by_id": lambda: crud_expenses.get_expense_by_id(db, 1, 1),
+        "get_budget_by_category": lambda: crud_budgets.get_budget_by_category(
+            db, 1, "Food", MONTH
+        ),
+        "get_user_by_id": lambda: crud_users.get_user_by_id(db, 1),
+        "get_total_spent (all time)": lambda: crud_analytics.get_total_spent(
+            db, 1, None, None
+        ),
+        "get_total_spent (month)": lambda: crud_analytics.get_total_spent(
+            db, 1, 10, 2026
+        ),
+        "get_total_budget (month)": lambda: crud_analytics.get_total_budget(
+            db, 1, 10, 2026
+        ),
+        "get_top_category (month)": lambda: crud_analytics.get_top_category(
+            db, 1, 10, 2026
+        ),
+    }
+
+
+# What each CRUD function returns when the database returns no rows
+EMPTY_RESULTS = {
+    "get_expense_by_id": None,
+    "get_budget_by_category": None,
+    "get_user_by_id": None,
+    "get_total_spent (all time)": 0,
+    "get_total_spent (month)": 0,
+    "get_total_budget (month)": 0,
+    "get_top_category (month)": "No Data",
+}
+
+
+def main(iterations: int) -> None:
+    old_db = CompileOnlySession()
+    new_db = CompileOnlySession()
+    old = query_chains(Session(), old_db.compile)
+    new = prebuilt(new_db)
+
+    print(f"{'':32s} {'query chain':>14s} {'prebuilt':>14s}")
+    with patch.object(crud_categories, "get_category_id", return_value=1):
+        for label in old:
+            compiled = len(old_db.cache), len(new_db.cache)
+            old[label]()
+            # Smoke check: both sides compiled a statement, the result is right
+            assert new[label]() == EMPTY_RESULTS[label], label
+            assert len(old_db.cache) > compiled[0], label
+            assert len(new_db.cache) > compiled[1], label
+            times = [
+                min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+                for fn in (old[label], new[label])
+            ]
+            print(f"{label:32s} {times[0]:8.2f} us/call {times[1]:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for running CozyCash with multiple Uvicorn workers.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+
+The application is built with the `create_app()` factory and imported once in
+the master (`preload_app`), so workers fork with the code already loaded and
+start quickly. Database pools are created by each worker's lifespan hook after
+the fork; `post_fork` additionally drops any engine the master may have created.
+
+Every worker has its own pool of `DB_POOL_SIZE + DB_MAX_OVERFLOW` connections, so
+keep `workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)` below PostgreSQL's
+`max_connections` (minus connections used by migrations and admin tools).
+With several workers, change events go through PostgreSQL LISTEN/NOTIFY, which
+takes one more connection per worker.
+"""
+
+import multiprocessing
+import os
+
+
+wsgi_app = "src.app.main:create_app()"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Tells the workers how many they are (see the `event_broker` setting)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Load the application code before forking; resources are created per worker
+preload_app = True
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    from src.app.db import session
+
+    session.dispose_engine(close=False)
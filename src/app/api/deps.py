@@ -4,32 +4,40 @@ API Dependencies and Security.
 This module defines reusable dependencies for FastAPI endpoints, primarily
 focusing on authentication and authorization. It handles the creation of
 access tokens (JWT) and the retrieval of the current authenticated user
-from the database using the provided token.
+from the database using the provided token. It also provides the rate-limit
+dependencies that throttle login and sign-up attempts.
 """
 
+import math
 from typing import Optional
 from datetime import datetime, timedelta, timezone
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
-from src.app.core.config import settings
-from src.app.db.session import get_db
+from src.app.core.config import API_V1_STR, get_settings
+from src.app.core.rate_limit import RateLimit, get_rate_limit_store
+from src.app.core.token_cache import VerifiedTokenCache
+from src.app.db.session import get_db, route_session
 from src.app.models.users import Users
 from src.app.crud import users as crud_users
+from src.app.crud import stream_tickets as crud_stream_tickets
 from src.app.schemas import token as token_schemas
 
 
-token_url = (
-    f"{settings.api_v1_str}/auth/login"
-    if hasattr(settings, "api_v1_str")
-    else "/auth/login"
-)
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=token_url)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{API_V1_STR}/auth/login")
 
-SECRET_KEY = settings.secret_key
-ALGORITHM = settings.algorithm
-ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+_token_cache: Optional[VerifiedTokenCache] = None
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    """
+    Returns the process-wide cache of verified tokens, creating it on first use.
+    """
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = VerifiedTokenCache(get_settings().token_cache_size)
+    return _token_cache
 
 
 def create_access_token(data: dict) -> str:
@@ -42,13 +50,18 @@ def create_access_token(data: dict) -> str:
     Returns:
         str: The encoded JWT string with an expiration time.
     """
+    settings = get_settings()
     to_encode = data.copy()
 
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + timedelta(
+        minutes=settings.access_token_expire_minutes
+    )
 
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(
+        to_encode, settings.secret_key, algorithm=settings.algorithm
+    )
     return encoded_jwt
 
 
@@ -60,6 +73,9 @@ def get_current_user(
 
     This function is used as a FastAPI dependency to protect endpoints.
     It decodes the JWT, extracts the user ID, and fetches the user from the database.
+    The request's session is then routed to the shard holding the user's data.
+    Tokens verified recently are served from the verified-token cache, which
+    skips the signature check until the token expires.
 
     Args:
         db (Session): The database session.
@@ -78,7 +94,14 @@ def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = get_token_cache().get(token)
+        if payload is None:
+            settings = get_settings()
+            payload = jwt.decode(
+                token, settings.secret_key, algorithms=[settings.algorithm]
+            )
+            get_token_cache().put(token, payload)
+
         user_id: Optional[int] = payload.get("user_id")
 
         if user_id is None:
@@ -97,4 +120,88 @@ def get_current_user(
     if user is None:
         raise credentials_exception
 
+    route_session(db, user.shard)
+    return user
+
+
+def get_current_user_from_ticket(
+    db: Session = Depends(get_db), ticket: str = Query(...)
+) -> Users:
+    """
+    Authenticates a request that carries a stream ticket as `?ticket=`.
+
+    Browsers' `EventSource` cannot send an Authorization header, so the event
+    stream endpoint takes a single-use ticket (see `crud/stream_tickets.py`)
+    in the query string instead of the access token.
+
+    Raises:
+        HTTPException: If the ticket is unknown, expired or already used, or
+            the user is not found.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
+
+    user_id = crud_stream_tickets.redeem_stream_ticket(db, ticket)
+    if user_id is None:
+        raise credentials_exception
+
+    user = crud_users.get_user_by_id(db, user_id=user_id)
+    if user is None:
+        raise credentials_exception
+
+    route_session(db, user.shard)
     return user
+
+
+def _enforce_rate_limit(key: str, capacity: int) -> None:
+    """
+    Takes one token from the bucket `key`, raising HTTP 429 if it is empty.
+    """
+    limit = RateLimit(capacity, get_settings().rate_limit_window_seconds)
+    retry_after = get_rate_limit_store().consume(key, limit)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_login_attempts(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> None:
+    """
+    Throttles login attempts per client IP and per account.
+
+    Runs before the endpoint touches the database or bcrypt, so a rejected
+    attempt costs only a dictionary lookup.
+
+    Raises:
+        HTTPException(429): If either bucket is exhausted.
+    """
+    settings = get_settings()
+    _enforce_rate_limit(
+        f"login:ip:{_client_ip(request)}", settings.login_attempts_per_ip
+    )
+    _enforce_rate_limit(
+        f"login:account:{form_data.username.strip().lower()}",
+        settings.login_attempts_per_account,
+    )
+
+
+def limit_signups(request: Request) -> None:
+    """
+    Throttles account creation per client IP.
+
+    Raises:
+        HTTPException(429): If the bucket is exhausted.
+    """
+    _enforce_rate_limit(
+        f"signup:ip:{_client_ip(request)}", get_settings().signups_per_ip
+    )
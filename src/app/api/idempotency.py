@@ -0,0 +1,160 @@
+"""
+Idempotent Request Handling.
+
+This module lets create endpoints honour the `Idempotency-Key` request header.
+The first request with a key runs normally and its response is stored for
+`idempotency_ttl_seconds`. A retry with the same key and payload is answered
+with the stored response (marked `Idempotent-Replayed: true`) without running
+the endpoint again. A duplicate arriving while the original is still running
+waits for it (up to `idempotency_wait_seconds`) and then gets the same answer.
+
+The key is claimed and the response stored in the request's own session,
+inside the transaction that creates the record, so the record and its key
+are committed together. Failed requests (any exception, including HTTP
+errors) are rolled back and store nothing, so the client may retry them with
+the same key.
+"""
+
+import hashlib
+import json
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Type
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from src.app.core.config import get_settings
+from src.app.crud import idempotency as crud_idempotency
+
+
+class IdempotentRequest:
+    """
+    State of one request made with (or without) an idempotency key.
+
+    `replay` is set when the request was already answered; the endpoint must
+    then return it as is. Otherwise the endpoint does its work and hands the
+    crud function `before_commit(schema)`, which stores the response in the
+    same transaction as the record.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Session] = None,
+        user_id: Optional[int] = None,
+        key: Optional[str] = None,
+        status_code: int = 200,
+    ):
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.status_code = status_code
+        self.replay: Optional[JSONResponse] = None
+
+    def before_commit(
+        self, schema: Type[BaseModel]
+    ) -> Optional[Callable[[object], None]]:
+        """
+        Returns the callback storing the response, built by validating the
+        created (flushed, not yet committed) record with `schema`; None if the
+        request has no key.
+        """
+        if self.db is None:
+            return None
+
+        def save(record) -> None:
+            crud_idempotency.save_idempotent_response(
+                self.db,
+                self.user_id,
+                self.key,
+                self.status_code,
+                schema.model_validate(record).model_dump(mode="json"),
+            )
+
+        return save
+
+
+def _fingerprint(scope: str, payload: BaseModel) -> str:
+    body = json.dumps(
+        payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(f"{scope}\n{body}".encode()).hexdigest()
+
+
+@contextmanager
+def idempotent_request(
+    db: Session,
+    user_id: int,
+    key: Optional[str],
+    scope: str,
+    payload: BaseModel,
+    status_code: int,
+) -> Iterator[IdempotentRequest]:
+    """
+    Wraps the body of a create endpoint that accepts an `Idempotency-Key`.
+
+    With a key, the key is claimed in `db`'s transaction, which the crud
+    function commits along with the record; the body must not commit `db`
+    before that.
+
+    Args:
+        db (Session): The request's database session.
+        user_id (int): The ID of the authenticated user.
+        key (str, optional): The `Idempotency-Key` header; None disables it.
+        scope (str): Identifies the endpoint, e.g. "POST /expenses/".
+        payload (BaseModel): The validated request body.
+        status_code (int): The status code of a successful response.
+
+    Raises:
+        HTTPException(409): If the original request is still running after
+            the wait timeout.
+        HTTPException(422): If the key was already used for a different request.
+    """
+    if key is None:
+        yield IdempotentRequest(status_code=status_code)
+        return
+
+    settings = get_settings()
+    fingerprint = _fingerprint(scope, payload)
+
+    # The timeout only covers waiting for a duplicate's key, not the locks
+    # taken by the write afterwards
+    db.execute(
+        text(
+            f"SET LOCAL lock_timeout = {int(settings.idempotency_wait_seconds * 1000)}"
+        )
+    )
+    try:
+        stored = crud_idempotency.claim_idempotency_key(
+            db, user_id, key, fingerprint, settings.idempotency_ttl_seconds
+        )
+    except OperationalError:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="A request with this Idempotency-Key is still in progress",
+        )
+
+    request = IdempotentRequest(db, user_id, key, status_code)
+    if stored is not None:
+        db.rollback()
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="This Idempotency-Key was used for a different request",
+            )
+        request.replay = JSONResponse(
+            stored.response_body,
+            status_code=stored.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+        yield request
+        return
+
+    db.execute(text("SET LOCAL lock_timeout = DEFAULT"))
+    try:
+        yield request
+    except BaseException:
+        db.rollback()
+        raise
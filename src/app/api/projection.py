@@ -0,0 +1,72 @@
+"""
+Sparse Fieldsets and Columnar Responses.
+
+List endpoints accept `?fields=a,b,c` to return only some fields (the crud
+layer then selects only those columns) and `?format=columnar` to return one
+array per field instead of one object per row, e.g.
+`{"amount": ["4.50", "12.00"], "category": ["Food", "Fuel"]}`.
+
+Projected responses are encoded straight to JSON bytes with pydantic-core,
+using the same value formats as the regular response models (decimals as
+strings, ISO 8601 dates).
+"""
+
+from typing import Dict, List, Optional, Sequence
+from fastapi import HTTPException, Response
+from pydantic_core import to_json
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    Validates a comma-separated `fields` parameter.
+
+    Args:
+        fields (str, optional): The raw query parameter.
+        allowed (Sequence[str]): The fields the endpoint can return.
+
+    Returns:
+        List[str] | None: The requested fields without duplicates, in the
+            order given, or None if the parameter was omitted.
+
+    Raises:
+        HTTPException(422): If the list is empty or names an unknown field.
+    """
+    if fields is None:
+        return None
+
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"fields must be a comma-separated subset of: {', '.join(allowed)}",
+        )
+    return requested
+
+
+def projected_response(
+    rows,
+    fields: Sequence[str],
+    columnar: bool,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Encodes projected rows (tuples in `fields` order) as a JSON response.
+
+    Args:
+        rows: The rows returned by the crud layer.
+        fields (Sequence[str]): The field name of each tuple position.
+        columnar (bool): Return one array per field instead of one object per row.
+        headers (Dict[str, str], optional): Extra response headers.
+
+    Returns:
+        Response: The encoded `application/json` response.
+    """
+    if columnar:
+        columns = zip(*rows) if rows else ([] for _ in fields)
+        payload = {field: list(values) for field, values in zip(fields, columns)}
+    else:
+        payload = [dict(zip(fields, row)) for row in rows]
+    return Response(
+        content=to_json(payload), media_type="application/json", headers=headers
+    )
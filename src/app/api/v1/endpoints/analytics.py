@@ -4,16 +4,19 @@ Financial Analytics and Dashboard Endpoints.
 This module aggregates user financial data to provide high-level summaries,
 charts, and trends. It calculates total spending, remaining budgets, and
 category-wise breakdowns to help users visualize their financial health.
+Days, months and the current date are those of the user's timezone.
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from src.app.db.session import get_db
 from src.app.api import deps
 from src.app.models.users import Users
+from src.app.core.forecast import forecast_month_end, history_start
+from src.app.core.timezones import local_today
 from src.app.crud import analytics as crud_analytics
 from src.app.schemas import analytics as analytics_schemas
 
@@ -44,27 +47,9 @@ def get_dashboard_summary(
         DashboardSummary: An object containing financial totals and a status indicator (Safe/Warning/Danger).
     """
     if month and not year:
-        year = datetime.now().year
+        year = local_today(current_user.timezone).year
 
-    total_spent = crud_analytics.get_total_spent(db, current_user.id, month, year)
-    total_budget = crud_analytics.get_total_budget(db, current_user.id, month, year)
-    top_category = crud_analytics.get_top_category(db, current_user.id, month, year)
-
-    remaining_budget = total_budget - total_spent
-
-    status = "Safe"
-    if remaining_budget < 0:
-        status = "Danger"
-    elif total_budget > 0 and remaining_budget < (total_budget * Decimal(0.2)):
-        status = "Warning"
-
-    return {
-        "total_spent": total_spent,
-        "total_budget": total_budget,
-        "remaining_budget": remaining_budget,
-        "top_category": top_category,
-        "status": status,
-    }
+    return crud_analytics.get_summary(db, current_user.id, month, year)
 
 
 @router.get(
@@ -75,43 +60,42 @@ def get_category_breakdown(
     current_user: Users = Depends(deps.get_current_user),
     month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None, ge=2000, le=2100),
+    limit: Optional[int] = Query(None, ge=1, le=50),
 ):
     """
     Retrieves spending breakdown grouped by category.
 
     Used for generating pie/doughnut charts. Returns the total amount and
-    percentage of total spending for each category.
+    percentage of total spending for each category. Percentages and ordering
+    are computed by the database.
 
     Args:
         db (Session): Database session.
         current_user (Users): Authenticated user.
         month (int, optional): Month filter.
         year (int, optional): Year filter.
+        limit (int, optional): Show only the top N categories, grouping the
+            rest as "Other".
 
     Returns:
         CategoryBreakdownResponse: A list of categories sorted by spending amount.
     """
     if month and not year:
-        year = datetime.now().year
+        year = local_today(current_user.timezone).year
 
     results = crud_analytics.get_category_breakdown_data(
-        db, current_user.id, month, year
+        db, current_user.id, month, year, limit
     )
-    grand_total = sum(r.total for r in results)
-
-    data_list = []
-    for r in results:
-        percentage = (r.total / grand_total * 100) if grand_total > 0 else 0
-        data_list.append(
+    return {
+        "data": [
             {
                 "category": r.category,
                 "total_amount": r.total,
-                "percentage": round(percentage, 1),
+                "percentage": r.percentage,
             }
-        )
-
-    data_list.sort(key=lambda x: x["total_amount"], reverse=True)
-    return {"data": data_list}
+            for r in results
+        ]
+    }
 
 
 @router.get("/spending-trend", response_model=analytics_schemas.SpendingTrendResponse)
@@ -136,9 +120,185 @@ def get_spending_trend(
         SpendingTrendResponse: A list of daily spending totals.
     """
     if month and not year:
-        year = datetime.now().year
+        year = local_today(current_user.timezone).year
 
     results = crud_analytics.get_daily_spending(db, current_user.id, month, year)
     data_list = [{"date": str(r.day), "amount": r.total} for r in results]
 
     return {"data": data_list}
+
+
+def _month_range(year: int, month: int):
+    """
+    Returns the half-open `[first day, first day of next month)` range of a month.
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _compare_period(label: str, total: Decimal, base: Decimal):
+    """
+    Builds a single period entry with its change from the base period.
+    """
+    delta = total - base
+    return {
+        "period": label,
+        "total_amount": total,
+        "delta": delta,
+        "percent_change": round(delta / base * 100, 1) if base > 0 else None,
+    }
+
+
+@router.get("/compare", response_model=analytics_schemas.PeriodComparisonResponse)
+def compare_periods(
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+    period: Optional[List[str]] = Query(
+        None,
+        max_length=12,
+        description="Months to compare as YYYY-MM; the first one is the base.",
+    ),
+):
+    """
+    Compares per-category spending across several months side by side.
+
+    Every month is computed in one grouped query. Deltas and percentage
+    changes are reported relative to the first (base) month. When no months
+    are given, the current month is compared with the previous month and
+    with the same month of the previous year.
+
+    Args:
+        db (Session): Database session.
+        current_user (Users): Authenticated user.
+        period (List[str], optional): Months in `YYYY-MM` format.
+
+    Returns:
+        PeriodComparisonResponse: Overall and per-category totals for each month.
+
+    Raises:
+        HTTPException(422): If a month is malformed or fewer than two are given.
+    """
+    if period:
+        try:
+            months = [datetime.strptime(p, "%Y-%m") for p in period]
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="Periods must be given in YYYY-MM format",
+            )
+    else:
+        now = local_today(current_user.timezone)
+        previous = now.replace(day=1) - timedelta(days=1)
+        months = [now, previous, now.replace(year=now.year - 1, day=1)]
+
+    if len(months) < 2:
+        raise HTTPException(
+            status_code=422,
+            detail="At least two periods are required for a comparison",
+        )
+
+    labels = [m.strftime("%Y-%m") for m in months]
+    ranges = [_month_range(m.year, m.month) for m in months]
+
+    results = crud_analytics.get_period_comparison_data(db, current_user.id, ranges)
+
+    grand_totals = [Decimal(0)] * len(ranges)
+    data_list = []
+    for r in results:
+        totals = list(r[1:])
+        grand_totals = [g + t for g, t in zip(grand_totals, totals)]
+        data_list.append(
+            {
+                "category": r.category,
+                "periods": [
+                    _compare_period(label, total, totals[0])
+                    for label, total in zip(labels, totals)
+                ],
+            }
+        )
+
+    data_list.sort(key=lambda x: x["periods"][0]["total_amount"], reverse=True)
+    return {
+        "periods": labels,
+        "totals": [
+            _compare_period(label, total, grand_totals[0])
+            for label, total in zip(labels, grand_totals)
+        ],
+        "data": data_list,
+    }
+
+
+def _forecast_status(projected: float, budget: Optional[Decimal]) -> Optional[str]:
+    """
+    Rates a projection against a budget, like the dashboard summary status.
+    """
+    if budget is None:
+        return None
+    if projected > float(budget):
+        return "Danger"
+    if projected > float(budget) * 0.8:
+        return "Warning"
+    return "Safe"
+
+
+@router.get("/forecast", response_model=analytics_schemas.ForecastResponse)
+def get_forecast(
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+    history: int = Query(12, ge=1, le=36, description="Past months to learn from."),
+):
+    """
+    Projects the current month's end-of-month spending for every category.
+
+    The projection combines each category's trend over the past months with
+    how its spending is usually spread over the days of a month, and is
+    compared against the category's budget for the month.
+
+    Args:
+        db (Session): Database session.
+        current_user (Users): Authenticated user.
+        history (int, optional): Number of past months used. Defaults to 12.
+
+    Returns:
+        ForecastResponse: Spent and projected totals per category, with the
+            projected status (Safe/Warning/Danger) against each budget.
+    """
+    today = local_today(current_user.timezone)
+    month_start = today.replace(day=1)
+
+    rows = crud_analytics.get_daily_spending(
+        db,
+        current_user.id,
+        None,
+        None,
+        since=history_start(today, history),
+        by_category=True,
+    )
+    forecast = forecast_month_end(rows, today, history)
+    budgets = dict(crud_analytics.get_month_budgets(db, current_user.id, month_start))
+
+    data_list = []
+    for category in forecast.keys() | budgets.keys():
+        spent, projected = forecast.get(category, (0.0, 0.0))
+        budget = budgets.get(category)
+        if not projected and budget is None:
+            continue
+        data_list.append(
+            {
+                "category": category,
+                "spent": spent,
+                "projected": projected,
+                "budget": budget,
+                "status": _forecast_status(projected, budget),
+            }
+        )
+
+    data_list.sort(key=lambda x: x["projected"], reverse=True)
+    return {
+        "month": month_start.strftime("%Y-%m"),
+        "as_of": today.isoformat(),
+        "total_spent": round(sum(x["spent"] for x in data_list), 2),
+        "total_projected": round(sum(x["projected"] for x in data_list), 2),
+        "data": data_list,
+    }
@@ -18,7 +18,11 @@ from src.app.schemas import token as token_schemas
 router = APIRouter()
 
 
-@router.post("/login", response_model=token_schemas.Token)
+@router.post(
+    "/login",
+    response_model=token_schemas.Token,
+    dependencies=[Depends(deps.limit_login_attempts)],
+)
 def login(
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -39,6 +43,8 @@ def login(
 
     Raises:
         HTTPException(401): If email is not found or password is incorrect.
+        HTTPException(429): If too many attempts were made from this IP or
+            for this account.
     """
     user = crud_users.get_user_by_email(db, email=form_data.username)
 
@@ -3,16 +3,29 @@ Budget Management Endpoints.
 
 This module handles the creation and management of budgets. It allows users
 to set spending limits for specific categories and months, preventing duplicate
-budgets for the same category/period.
+budgets for the same category/period, and shows how unspent amounts roll over
+into the following months.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 from src.app.db.session import get_db
 from src.app.schemas import budgets as budget_schemas
 from src.app.crud import budgets as crud_budgets
+from src.app.crud import user_counters as crud_user_counters
 from src.app.api import deps
+from src.app.api.idempotency import idempotent_request
+from src.app.api.projection import parse_fields, projected_response
 from src.app.models.users import Users
 
 
@@ -21,24 +34,86 @@ router = APIRouter()
 
 @router.get("/", response_model=List[budget_schemas.BudgetResponse])
 def read_budgets(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. category,amount"
+    ),
+    response_format: Literal["rows", "columnar"] = Query("rows", alias="format"),
     db: Session = Depends(get_db),
     current_user: Users = Depends(deps.get_current_user),
 ):
     """
     Retrieves a list of budgets set by the current user.
 
+    The `X-Total-Count` response header holds the user's total number of
+    budgets, read from a counter kept up to date on every write.
+
     Args:
+        response (Response): The response, used to set `X-Total-Count`.
         skip (int, optional): Pagination offset. Defaults to 0.
         limit (int, optional): Pagination limit. Defaults to 100.
+        fields (str, optional): Only select and return these fields.
+        response_format (str, optional): "rows" (a list of objects) or
+            "columnar" (one array per field). Defaults to "rows".
         db (Session): Database session dependency.
         current_user (Users): The authenticated user.
 
     Returns:
         List[BudgetResponse]: A list of budget objects.
+
+    Raises:
+        HTTPException(422): If `fields` names an unknown field.
+    """
+    selected = parse_fields(fields, list(crud_budgets.BUDGET_FIELDS))
+    _, budget_count = crud_user_counters.get_user_counts(db, current_user.id)
+    headers = {"X-Total-Count": str(budget_count)}
+    if selected is None and response_format == "rows":
+        response.headers.update(headers)
+        return crud_budgets.get_budgets(
+            db, user_id=current_user.id, skip=skip, limit=limit
+        )
+
+    selected = selected or list(crud_budgets.BUDGET_FIELDS)
+    rows = crud_budgets.get_budgets(
+        db, user_id=current_user.id, skip=skip, limit=limit, fields=selected
+    )
+    return projected_response(
+        rows, selected, response_format == "columnar", headers=headers
+    )
+
+
+@router.get("/rollover", response_model=List[budget_schemas.BudgetRollover])
+def read_budget_rollover(
+    month: Optional[date] = Query(
+        None, description="Only return the budgets of this month."
+    ),
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
     """
-    return crud_budgets.get_budgets(db, user_id=current_user.id, skip=skip, limit=limit)
+    Retrieves the current user's budgets with the amounts rolled over.
+
+    A budget with `rollover` set passes what is left of it at the end of its
+    month on to the same category's budget of the next month. The effective
+    budget is the budget's own amount plus what was carried over into it.
+
+    Args:
+        month (date, optional): Only return the budgets of this month (any
+            day of it).
+        db (Session): Database session dependency.
+        current_user (Users): The authenticated user.
+
+    Returns:
+        List[BudgetRollover]: Budgets with their carried over, effective,
+            spent and remaining amounts, by month and category.
+    """
+    return crud_budgets.get_budget_rollover(
+        db,
+        user_id=current_user.id,
+        month=month.replace(day=1) if month else None,
+    )
 
 
 @router.post(
@@ -50,33 +125,58 @@ def create_budget(
     budget_in: budget_schemas.BudgetCreate,
     db: Session = Depends(get_db),
     current_user: Users = Depends(deps.get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
     """
     Creates a new budget for a specific category and month.
 
     Enforces a constraint that prevents duplicate budgets for the same
-    category and month combination.
+    category and month combination. With an `Idempotency-Key` header, retries
+    of the same request return the original response.
 
     Args:
         budget_in (BudgetCreate): The budget details.
         db (Session): Database session dependency.
         current_user (Users): The authenticated user.
+        idempotency_key (str, optional): Client-chosen key identifying the request.
 
     Returns:
         BudgetResponse: The created budget object.
 
     Raises:
         HTTPException(400): If a budget for this category and month already exists.
+        HTTPException(409): If the original request with this key is still running.
+        HTTPException(422): If the key was already used for a different request.
     """
-    existing_budget = crud_budgets.get_budget_by_category(
-        db, user_id=current_user.id, category=budget_in.category, month=budget_in.month
-    )
-    if existing_budget:
-        raise HTTPException(
-            status_code=400, detail="Budget for this category and month already exists"
+    with idempotent_request(
+        db,
+        current_user.id,
+        idempotency_key,
+        "POST /budgets/",
+        budget_in,
+        status.HTTP_201_CREATED,
+    ) as request:
+        if request.replay is not None:
+            return request.replay
+
+        existing_budget = crud_budgets.get_budget_by_category(
+            db,
+            user_id=current_user.id,
+            category=budget_in.category,
+            month=budget_in.month,
+        )
+        if existing_budget:
+            raise HTTPException(
+                status_code=400,
+                detail="Budget for this category and month already exists",
+            )
+
+        return crud_budgets.create_budget(
+            db,
+            budget=budget_in,
+            user_id=current_user.id,
+            before_commit=request.before_commit(budget_schemas.BudgetResponse),
         )
-
-    return crud_budgets.create_budget(db, budget=budget_in, user_id=current_user.id)
 
 
 @router.put("/{budget_id}", response_model=budget_schemas.BudgetResponse)
@@ -0,0 +1,84 @@
+"""
+Dashboard Bootstrap Endpoint.
+
+This module serves everything the dashboard page needs in a single response:
+the user profile, the summary cards, the most recent expenses and the data for
+both charts. The page therefore pays for one token check, one user lookup and
+one database session instead of five.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from src.app.core.timezones import local_today
+from src.app.db.session import get_db
+from src.app.api import deps
+from src.app.models.users import Users
+from src.app.crud import expenses as crud_expenses
+from src.app.crud import analytics as crud_analytics
+from src.app.schemas import dashboard as dashboard_schemas
+from src.app.schemas import users as user_schemas
+from src.app.api.v1.endpoints import analytics
+
+
+router = APIRouter()
+
+RECENT_EXPENSES_LIMIT = 10
+
+
+@router.get("", response_model=dashboard_schemas.DashboardResponse)
+def get_dashboard(
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+):
+    """
+    Returns the complete dashboard payload in one request.
+
+    All sections are read inside a single REPEATABLE READ transaction, so the
+    summary, the charts and the recent activity reflect the same snapshot even
+    if the user adds an expense while the dashboard is loading.
+
+    Args:
+        db (Session): Database session.
+        current_user (Users): Authenticated user.
+        month (int, optional): Month filter for the summary and charts.
+        year (int, optional): Year filter for the summary and charts.
+
+    Returns:
+        DashboardResponse: Profile, summary, recent expenses and chart data.
+    """
+    user = user_schemas.UserResponse.model_validate(current_user)
+
+    # End the transaction opened by the user lookup so the snapshot can start.
+    # Nothing was written, so loaded objects do not need to be expired.
+    db.expire_on_commit = False
+    db.commit()
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    if month and not year:
+        year = local_today(current_user.timezone).year
+
+    # The breakdown is ordered by total, so it also yields the top category
+    breakdown = analytics.get_category_breakdown(
+        db=db, current_user=current_user, month=month, year=year, limit=None
+    )
+    top_category = breakdown["data"][0]["category"] if breakdown["data"] else "No Data"
+    summary = crud_analytics.get_summary(
+        db, current_user.id, month, year, top_category=top_category
+    )
+    trend = analytics.get_spending_trend(
+        db=db, current_user=current_user, month=month, year=year
+    )
+    recent_expenses = crud_expenses.get_recent_expenses(
+        db, user_id=current_user.id, limit=RECENT_EXPENSES_LIMIT
+    )
+
+    return {
+        "user": user,
+        "summary": summary,
+        "recent_expenses": recent_expenses,
+        "spending_trend": trend["data"],
+        "category_breakdown": breakdown["data"],
+    }
@@ -0,0 +1,95 @@
+"""
+Change Event Stream Endpoint.
+
+This module exposes a Server-Sent Events stream per user. Whenever one of the
+user's expenses or budgets is created, updated or deleted, a `change` event
+with the affected aggregates is pushed to every open stream of that user, so
+pages can patch their view instead of polling or refetching.
+
+Streams are opened with a single-use ticket obtained from `POST /ticket`,
+so the access token never appears in a URL.
+"""
+
+import asyncio
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from src.app.core.config import get_settings
+from src.app.core.events import format_event, get_event_broker
+from src.app.db.session import get_db, get_shard_session
+from src.app.api import deps
+from src.app.crud import stream_tickets as crud_stream_tickets
+from src.app.models.users import Users
+from src.app.schemas import token as token_schemas
+
+
+router = APIRouter()
+
+
+async def _stream(user_id: int, keepalive_seconds: int):
+    """
+    Yields the user's events, with a comment line when idle to keep proxies
+    from closing the connection. Unsubscribes when the client disconnects.
+    """
+    broker = get_event_broker()
+    subscription = broker.subscribe(user_id)
+    try:
+        yield "retry: 5000\n\n" + format_event("ready", {})
+        while True:
+            try:
+                yield await asyncio.wait_for(subscription.get(), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.post("/ticket", response_model=token_schemas.StreamTicket)
+def create_stream_ticket(current_user: Users = Depends(deps.get_current_user)):
+    """
+    Issues a single-use ticket for opening the user's event stream.
+
+    Tickets are kept in the main database, where the stream looks them up
+    before knowing the user's shard. A new ticket is needed for every
+    (re)connection.
+
+    Returns:
+        StreamTicket: The ticket and its lifetime in seconds.
+    """
+    ttl = get_settings().event_ticket_ttl_seconds
+    db = get_shard_session(0)
+    try:
+        ticket = crud_stream_tickets.create_stream_ticket(db, current_user.id, ttl)
+    finally:
+        db.close()
+    return {"ticket": ticket, "expires_in": ttl}
+
+
+@router.get("", response_class=StreamingResponse)
+def stream_events(
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user_from_ticket),
+):
+    """
+    Opens the current user's change event stream (`text/event-stream`).
+
+    The stream is authenticated with `?ticket=` (see `create_stream_ticket`)
+    because `EventSource` cannot set headers. The database session is
+    released before streaming starts, so an open stream does not hold a
+    pooled connection.
+
+    Args:
+        db (Session): Database session dependency (used for authentication only).
+        current_user (Users): The authenticated user.
+
+    Returns:
+        StreamingResponse: An endless stream of `ready`, `change` and `resync` events.
+    """
+    user_id = current_user.id
+    db.close()
+
+    return StreamingResponse(
+        _stream(user_id, get_settings().event_keepalive_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -6,13 +6,24 @@ It supports Create, Read, Update, and Delete (CRUD) operations, allowing
 users to track their spending habits efficiently.
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    status,
+)
 from sqlalchemy.orm import Session
 from src.app.db.session import get_db
 from src.app.schemas import expenses as expense_schemas
 from src.app.crud import expenses as crud_expenses
+from src.app.crud import user_counters as crud_user_counters
 from src.app.api import deps
+from src.app.api.idempotency import idempotent_request
+from src.app.api.projection import parse_fields, projected_response
 from src.app.models.users import Users
 
 
@@ -21,28 +32,104 @@ router = APIRouter()
 
 @router.get("/", response_model=List[expense_schemas.ExpenseResponse])
 def read_expenses(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. amount,date"
+    ),
+    response_format: Literal["rows", "columnar"] = Query("rows", alias="format"),
     db: Session = Depends(get_db),
     current_user: Users = Depends(deps.get_current_user),
 ):
     """
-    Retrieves a list of expenses for the current user.
+    Retrieves a list of expenses for the current user, newest first.
+
+    The `X-Total-Count` response header holds the user's total number of
+    expenses, read from a counter kept up to date on every write.
 
     Args:
+        response (Response): The response, used to set `X-Total-Count`.
         skip (int, optional): Number of records to skip for pagination. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 100.
+        fields (str, optional): Only select and return these fields.
+        response_format (str, optional): "rows" (a list of objects) or
+            "columnar" (one array per field). Defaults to "rows".
         db (Session): Database session dependency.
         current_user (Users): The authenticated user.
 
     Returns:
         List[ExpenseResponse]: A list of expense objects associated with the user.
+
+    Raises:
+        HTTPException(422): If `fields` names an unknown field.
+    """
+    if limit > 100:
+        limit = 100
+
+    selected = parse_fields(fields, list(crud_expenses.EXPENSE_FIELDS))
+    expense_count, _ = crud_user_counters.get_user_counts(db, current_user.id)
+    headers = {"X-Total-Count": str(expense_count)}
+    if selected is None and response_format == "rows":
+        response.headers.update(headers)
+        return crud_expenses.get_expenses(
+            db, user_id=current_user.id, skip=skip, limit=limit
+        )
+
+    selected = selected or list(crud_expenses.EXPENSE_FIELDS)
+    rows = crud_expenses.get_expenses(
+        db, user_id=current_user.id, skip=skip, limit=limit, fields=selected
+    )
+    return projected_response(
+        rows, selected, response_format == "columnar", headers=headers
+    )
+
+
+@router.get("/search", response_model=List[expense_schemas.ExpenseResponse])
+def search_expenses(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = 100,
+    estimate: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Searches the current user's expenses by description.
+
+    Combines full-text matching with typo-tolerant (trigram) matching and
+    returns the best matches first. The `X-Total-Count` response header holds
+    the number of matches; with `estimate=true` it is the query planner's
+    estimate (flagged by `X-Total-Count-Estimated: true`), which avoids
+    counting every match on each page flip.
+
+    Args:
+        response (Response): The response, used to set `X-Total-Count`.
+        q (str): The search text.
+        skip (int, optional): Number of records to skip for pagination. Defaults to 0.
+        limit (int, optional): Maximum number of records to return. Defaults to 100.
+        estimate (bool, optional): Estimate the total instead of counting it.
+            Defaults to False.
+        db (Session): Database session dependency.
+        current_user (Users): The authenticated user.
+
+    Returns:
+        List[ExpenseResponse]: Matching expenses ordered by relevance.
     """
     if limit > 100:
         limit = 100
 
-    return crud_expenses.get_expenses(
-        db, user_id=current_user.id, skip=skip, limit=limit
+    response.headers["X-Total-Count"] = str(
+        crud_expenses.count_search_expenses(
+            db, user_id=current_user.id, q=q, estimate=estimate
+        )
+    )
+    if estimate:
+        response.headers["X-Total-Count-Estimated"] = "true"
+
+    return crud_expenses.search_expenses(
+        db, user_id=current_user.id, q=q, skip=skip, limit=limit
     )
 
 
@@ -55,19 +142,44 @@ def create_expense(
     expense_in: expense_schemas.ExpenseCreate,
     db: Session = Depends(get_db),
     current_user: Users = Depends(deps.get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
     """
     Creates a new expense record.
 
+    With an `Idempotency-Key` header, retries of the same request return the
+    original response instead of creating a duplicate expense.
+
     Args:
         expense_in (ExpenseCreate): The payload containing expense details (amount, category, etc.).
         db (Session): Database session dependency.
         current_user (Users): The authenticated user.
+        idempotency_key (str, optional): Client-chosen key identifying the request.
 
     Returns:
         ExpenseResponse: The created expense object.
+
+    Raises:
+        HTTPException(409): If the original request with this key is still running.
+        HTTPException(422): If the key was already used for a different request.
     """
-    return crud_expenses.create_expense(db, expense=expense_in, user_id=current_user.id)
+    with idempotent_request(
+        db,
+        current_user.id,
+        idempotency_key,
+        "POST /expenses/",
+        expense_in,
+        status.HTTP_201_CREATED,
+    ) as request:
+        if request.replay is not None:
+            return request.replay
+
+        return crud_expenses.create_expense(
+            db,
+            expense=expense_in,
+            user_id=current_user.id,
+            before_commit=request.before_commit(expense_schemas.ExpenseResponse),
+        )
 
 
 @router.put("/{expense_id}", response_model=expense_schemas.ExpenseResponse)
@@ -0,0 +1,119 @@
+"""
+Background Job Endpoints.
+
+This module lets users start long-running work (full exports, multi-year
+analytics) without holding a request open. Jobs are queued in the database
+and executed by `src.app.jobs.worker`; clients poll the status endpoint and
+fetch the result once the job has succeeded.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from src.app.core.config import get_settings
+from src.app.db.session import get_db
+from src.app.schemas import jobs as job_schemas
+from src.app.crud import jobs as crud_jobs
+from src.app.api import deps
+from src.app.models.users import Users
+
+
+router = APIRouter()
+
+
+@router.post(
+    "/",
+    response_model=job_schemas.JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_job(
+    job_in: job_schemas.JobCreate,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Enqueues a background job for the current user.
+
+    Args:
+        job_in (JobCreate): The job kind and its parameters, validated for
+            that kind (invalid parameters get a 422 here, not a failed job).
+        db (Session): Database session dependency.
+        current_user (Users): The authenticated user.
+
+    Raises:
+        HTTPException(429): If the user already has too many unfinished jobs.
+
+    Returns:
+        JobResponse: The queued job.
+    """
+    settings = get_settings()
+    job = crud_jobs.create_job(
+        db,
+        user_id=current_user.id,
+        kind=job_in.kind,
+        params=job_in.params.model_dump(mode="json", exclude_none=True),
+        max_attempts=settings.job_max_attempts,
+        max_active=settings.jobs_max_active_per_user,
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many jobs in progress, please wait for one to finish",
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=job_schemas.JobResponse)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Retrieves the status of a job.
+
+    Raises:
+        HTTPException(404): If the job is not found or not owned by the user.
+    """
+    job = crud_jobs.get_job(db, job_id=job_id, user_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/result")
+def read_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Retrieves the result of a finished job.
+
+    Exports are returned as a file download; other jobs return their JSON result.
+
+    Raises:
+        HTTPException(404): If the job is not found or not owned by the user.
+        HTTPException(409): If the job has not succeeded (yet).
+    """
+    job = crud_jobs.get_job(db, job_id=job_id, user_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "succeeded":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}",
+        )
+
+    result = job.result or {}
+    if "filename" in result:
+        content = crud_jobs.get_job_file(db, job_id=job.id)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Job file not found")
+        return Response(
+            content=content,
+            media_type=result["content_type"],
+            headers={
+                "Content-Disposition": f'attachment; filename="{result["filename"]}"'
+            },
+        )
+    return result
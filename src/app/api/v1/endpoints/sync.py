@@ -0,0 +1,79 @@
+"""
+Delta Sync Endpoint.
+
+This module lets clients that cache expenses and budgets offline download
+only what changed since their last sync, instead of the full lists.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from src.app.db.session import get_db
+from src.app.schemas import sync as sync_schemas
+from src.app.crud import sync as crud_sync
+from src.app.api import deps
+from src.app.models.users import Users
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=sync_schemas.SyncResponse)
+def sync(
+    since: Optional[str] = None,
+    limit: int = 500,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Retrieves the current user's expense and budget changes since a cursor.
+
+    Without `since`, every expense and budget is returned (a full sync).
+    Changes come in version order, at most `limit` per call; follow
+    `has_more` with the returned cursor until it is false, and store the
+    last cursor for the next sync.
+
+    Args:
+        since (str, optional): The cursor returned by the previous sync.
+        limit (int, optional): Maximum number of changes. Defaults to 500.
+        db (Session): Database session dependency.
+        current_user (Users): The authenticated user.
+
+    Returns:
+        SyncResponse: The changed and deleted records and the next cursor.
+
+    Raises:
+        HTTPException(410): If the cursor has expired; sync again without it.
+        HTTPException(422): If the cursor is malformed.
+    """
+    if limit > 1000:
+        limit = 1000
+    limit = max(limit, 1)
+
+    cursor = None
+    if since is not None:
+        try:
+            cursor = crud_sync.decode_cursor(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="Invalid sync cursor",
+            )
+
+    changes = crud_sync.get_changes(db, current_user.id, cursor, limit)
+    if changes is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync cursor expired, sync again without a cursor",
+        )
+
+    return sync_schemas.SyncResponse(
+        expenses=changes.expenses,
+        budgets=changes.budgets,
+        deleted=[
+            sync_schemas.SyncDeletion(entity=entity, id=record_id)
+            for entity, record_id in changes.deleted
+        ],
+        cursor=crud_sync.encode_cursor(changes.cursor),
+        has_more=changes.has_more,
+    )
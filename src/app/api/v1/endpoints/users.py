@@ -2,7 +2,8 @@
 User Management Endpoints.
 
 This module provides API endpoints for user-related operations, including
-registering new users (sign-up) and retrieving the current user's profile information.
+registering new users (sign-up), retrieving the current user's profile information
+and changing the user's settings.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -18,7 +19,10 @@ router = APIRouter()
 
 
 @router.post(
-    "/", response_model=user_schemas.UserResponse, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=user_schemas.UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(deps.limit_signups)],
 )
 def create_user(user_in: user_schemas.UserCreate, db: Session = Depends(get_db)):
     """
@@ -35,6 +39,7 @@ def create_user(user_in: user_schemas.UserCreate, db: Session = Depends(get_db))
 
     Raises:
         HTTPException(400): If a user with the given email already exists.
+        HTTPException(429): If too many accounts were created from this IP.
     """
     user = crud_users.get_user_by_email(db, email=user_in.email)
     if user:
@@ -60,3 +65,27 @@ def read_users_me(current_user: Users = Depends(deps.get_current_user)):
         Users: The detailed profile of the current user.
     """
     return current_user
+
+
+@router.patch("/me", response_model=user_schemas.UserResponse)
+def update_users_me(
+    user_in: user_schemas.UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: Users = Depends(deps.get_current_user),
+):
+    """
+    Updates the settings of the currently authenticated user.
+
+    Changing the timezone moves the user's expenses into the days and months
+    of the new timezone. It is applied even when the profile already shows
+    it, to finish a change whose shard step failed (a no-op otherwise).
+
+    Args:
+        user_in (UserUpdate): The new settings.
+        db (Session): Database session dependency.
+        current_user (Users): The user object obtained from the token dependency.
+
+    Returns:
+        Users: The updated profile of the current user.
+    """
+    return crud_users.set_user_timezone(db, current_user, user_in.timezone)
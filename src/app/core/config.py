@@ -4,11 +4,19 @@ Application Configuration.
 This module defines the global settings for the application using Pydantic's BaseSettings.
 It reads configuration variables from environment variables (e.g., .env file) to ensure
 secrets and sensitive data are kept separate from the codebase.
+
+Settings are loaded lazily on the first call to `get_settings()`, so importing
+application modules (e.g. from tests or CLI tools) does not read the environment.
 """
 
+from functools import lru_cache
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+API_V1_STR = "/api/v1"
+
+
 class Settings(BaseSettings):
     """
     Global application settings.
@@ -24,9 +32,91 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
-    api_v1_str: str = "/api/v1"
+    token_cache_size: int = 10_000
+
+    # Extra databases holding sharded user data (shards 1..N-1), as SQLAlchemy
+    # URLs; the main database above is shard 0. See db/session.py
+    database_shard_urls: List[str] = []
+
+    # Connection pool (per worker process, per shard)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_warm_connections: int = 5
+
+    # Load shedding (per worker process); see core/load_shedding.py
+    shed_enabled: bool = True
+    shed_max_in_flight: int = 64
+    shed_max_pool_utilization: float = 0.9
+    shed_max_threadpool_queue: int = 20
+    shed_max_queue_wait_ms: float = 250.0
+    shed_retry_after_seconds: int = 5
+    shed_low_priority_prefixes: List[str] = [
+        f"{API_V1_STR}/analytics",
+        f"{API_V1_STR}/dashboard",
+        f"{API_V1_STR}/expenses/search",
+        f"{API_V1_STR}/jobs",
+        f"{API_V1_STR}/events",
+    ]
+    # Long-lived requests that are not counted as in flight (new ones are
+    # still shed if they are low priority, open ones are never cut)
+    shed_untracked_prefixes: List[str] = [f"{API_V1_STR}/events"]
+
+    # Rate limits (attempts per window); see core/rate_limit.py
+    rate_limit_window_seconds: int = 60
+    login_attempts_per_ip: int = 20
+    login_attempts_per_account: int = 5
+    signups_per_ip: int = 5
+
+    # Background jobs; see src/app/jobs/worker.py
+    job_worker_concurrency: int = 2
+    job_poll_interval_seconds: float = 1.0
+    job_lease_seconds: int = 300
+    job_max_attempts: int = 3
+    job_retry_backoff_seconds: int = 10
+    jobs_max_active_per_user: int = 3
+
+    # Idempotency-Key handling on create endpoints; see api/idempotency.py
+    idempotency_ttl_seconds: int = 86_400
+    idempotency_wait_seconds: float = 10.0
+
+    # Change event streams; see core/events.py. "auto" uses PostgreSQL
+    # LISTEN/NOTIFY when the server runs several workers (`WEB_CONCURRENCY`)
+    # and an in-process broker otherwise
+    event_broker: Literal["auto", "memory", "postgres"] = "auto"
+    event_keepalive_seconds: int = 15
+    event_ticket_ttl_seconds: int = 30
+
+    # Expenses older than this many whole months are moved to the archive by
+    # the job worker (0 disables archival); see crud/archive.py
+    archive_after_months: int = 24
+
+    # Deleted expenses and budgets are reported to syncing clients for this
+    # long; clients that did not sync since then must sync from scratch. See
+    # crud/sync.py
+    sync_tombstone_ttl_days: int = 90
+
+    # Group commit of expense creation (per worker process, per shard); see
+    # core/group_commit.py. Off by default: each create then waits up to the
+    # window for other creates, in exchange for one commit per batch
+    expense_group_commit: bool = False
+    expense_group_commit_window_ms: float = 1.0
+    expense_group_commit_max_batch: int = 64
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    Returns the application settings, loading them on first use.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keeps `from src.app.core.config import settings` working for scripts.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,334 @@
+"""
+Change Event Broker.
+
+This module delivers per-user change events (an expense or budget was
+created, updated or deleted, with the new aggregates) from the code that
+commits the change to the Server-Sent Events streams the user has open.
+
+`InMemoryEventBroker` fans events out to the streams connected to the same
+worker process. Publishers usually run in the sync threadpool, so delivery
+to each stream's asyncio queue goes through `call_soon_threadsafe`.
+`PgNotifyEventBroker` carries events between worker processes and hosts
+through PostgreSQL LISTEN/NOTIFY. `create_event_broker()` picks one from the
+`event_broker` setting; other shared backends (e.g. Redis pub/sub) can be
+plugged in by implementing `EventBroker` and registering it with
+`set_event_broker()`.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Set
+from sqlalchemy import func, select as sql_select
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event: str, data: dict) -> str:
+    """
+    Serializes an event in the `text/event-stream` wire format.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+RESYNC_EVENT = format_event("resync", {})
+
+
+class Subscription:
+    """
+    One open event stream: a bounded queue of formatted events.
+
+    If the client falls behind and the queue fills up, pending events are
+    dropped and replaced by a single `resync` event telling the client to
+    reload its view.
+    """
+
+    def __init__(self, user_id: int, max_pending: int = 100):
+        self.user_id = user_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(max_pending)
+
+    def deliver(self, message: str) -> None:
+        """
+        Queues a formatted event; safe to call from any thread.
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The stream's event loop has already been closed
+            pass
+
+    def _put(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+
+class EventBroker(ABC):
+    """
+    Interface for change event backends.
+    """
+
+    @abstractmethod
+    def publish(self, user_id: int, event: str, data: dict) -> None:
+        """
+        Sends an event to every open stream of a user.
+
+        Args:
+            user_id (int): The user whose streams receive the event.
+            event (str): The event name (e.g. "change").
+            data (dict): JSON-serializable event payload.
+        """
+
+    @abstractmethod
+    def has_subscribers(self, user_id: int) -> bool:
+        """
+        Tells whether publishing for `user_id` can reach anyone.
+
+        Publishers use it to skip computing event payloads nobody will read.
+        Shared backends that cannot know should return True.
+        """
+
+    @abstractmethod
+    def subscribe(self, user_id: int) -> Subscription:
+        """
+        Opens a stream for a user. Must be called from the event loop.
+        """
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Closes a stream opened by `subscribe()`.
+        """
+
+    def start(self) -> None:
+        """
+        Opens the backend's connections, if any. Called on worker startup.
+        """
+
+    def close(self) -> None:
+        """
+        Releases what `start()` opened. Called on worker shutdown.
+        """
+
+
+class InMemoryEventBroker(EventBroker):
+    """
+    Process-local fan-out to the streams connected to this worker.
+    """
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending = max_pending
+        self._subscriptions: Dict[int, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: int, event: str, data: dict) -> None:
+        if self.has_subscribers(user_id):
+            self.deliver(user_id, format_event(event, data))
+
+    def deliver(self, user_id: int, message: str) -> None:
+        """
+        Queues an already formatted event on every open stream of a user.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def deliver_all(self, message: str) -> None:
+        """
+        Queues an already formatted event on every open stream.
+        """
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def has_subscribers(self, user_id: int) -> bool:
+        return user_id in self._subscriptions
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.max_pending)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+
+NOTIFY_CHANNEL = "cozycash_events"
+
+# PostgreSQL rejects notification payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+class PgNotifyEventBroker(EventBroker):
+    """
+    Fan-out across worker processes and hosts through PostgreSQL
+    LISTEN/NOTIFY on the main database.
+
+    Events are sent with `pg_notify()` on a pooled connection, so they reach
+    the streams of every process (this one included) once sent. Each process
+    keeps one extra connection that listens on the channel, in a background
+    thread, and hands what it receives to its own streams. An event too large
+    for a notification is sent as a `resync` event instead. When the listening
+    connection is lost, it is reopened and every local stream gets a `resync`
+    event, since events may have been missed meanwhile.
+
+    Args:
+        connect: Opens a new DBAPI (psycopg2) connection for listening.
+        get_engine: Returns the engine whose pool is used for publishing.
+        max_pending (int): Queue size of each stream.
+        reconnect_seconds (float): Pause before reopening the listener.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        get_engine: Callable[[], Engine],
+        max_pending: int = 100,
+        reconnect_seconds: float = 1.0,
+    ):
+        self._connect = connect
+        self._get_engine = get_engine
+        self.reconnect_seconds = reconnect_seconds
+        self._local = InMemoryEventBroker(max_pending)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, user_id: int, event: str, data: dict) -> None:
+        payload = json.dumps(
+            {"user_id": user_id, "message": format_event(event, data)},
+            separators=(",", ":"),
+        )
+        if len(payload.encode("utf-8")) > MAX_NOTIFY_PAYLOAD:
+            payload = json.dumps(
+                {"user_id": user_id, "message": RESYNC_EVENT}, separators=(",", ":")
+            )
+        with self._get_engine().connect() as conn:
+            conn.execute(sql_select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+            conn.commit()
+
+    def has_subscribers(self, user_id: int) -> bool:
+        # Streams of other processes are not known here
+        return True
+
+    def subscribe(self, user_id: int) -> Subscription:
+        return self._local.subscribe(user_id)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._local.unsubscribe(subscription)
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name="event-listener", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def receive(self, payload: str) -> None:
+        """
+        Hands a notification received on the channel to the local streams.
+        """
+        try:
+            event = json.loads(payload)
+            self._local.deliver(int(event["user_id"]), event["message"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed event notification: %.100s", payload)
+
+    def _listen(self) -> None:
+        reconnected = False
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                if reconnected:
+                    self._local.deliver_all(RESYNC_EVENT)
+                reconnected = True
+
+                while not self._stopped.is_set():
+                    # Wake up regularly to notice close()
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            self.receive(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Event listener connection failed, reconnecting")
+                self._stopped.wait(self.reconnect_seconds)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+def create_event_broker(
+    backend: str,
+    workers: int,
+    connect: Callable[[], Any],
+    get_engine: Callable[[], Engine],
+) -> EventBroker:
+    """
+    Builds the broker selected by the `event_broker` setting.
+
+    Args:
+        backend (str): "memory", "postgres", or "auto" (PostgreSQL when the
+            server runs more than one worker process).
+        workers (int): Number of worker processes of the server.
+        connect: Opens a DBAPI connection to the main database.
+        get_engine: Returns the main database's engine.
+
+    Returns:
+        EventBroker: The broker, not started yet.
+    """
+    if backend == "postgres" or (backend == "auto" and workers > 1):
+        return PgNotifyEventBroker(connect, get_engine)
+    if workers > 1:
+        logger.warning(
+            "In-memory event broker with %s workers: events only reach streams "
+            "connected to the worker that published them",
+            workers,
+        )
+    return InMemoryEventBroker()
+
+
+_broker: EventBroker = InMemoryEventBroker()
+
+
+def get_event_broker() -> EventBroker:
+    return _broker
+
+
+def set_event_broker(broker: EventBroker) -> None:
+    """
+    Replaces the broker used by all publishers and streams.
+    """
+    global _broker
+    _broker = broker
@@ -0,0 +1,122 @@
+"""
+Month-End Spending Forecast.
+
+This module projects how much a user will have spent in each category by the
+end of the current month, from the daily spending series of the current and
+past months. All categories are projected at once with NumPy array
+operations, so the cost barely grows with the number of categories or the
+length of the history.
+
+Two signals are combined per category:
+
+- Trend: a least-squares line through the past monthly totals, evaluated at
+  the current month.
+- Day-of-month seasonality: the share of a month's spending that, in past
+  months, was already spent by today's day of the month. It tells how much
+  of the month is still to come (rent paid on the 1st, groceries spread
+  evenly, ...).
+
+The expected month total starts at the trend and moves towards the current
+pace as the month's usual share is spent; the projection is what was spent
+so far plus the part of the expected total that usually comes after today.
+"""
+
+import calendar
+from datetime import date
+from typing import Dict, Iterable, Tuple
+import numpy as np
+
+
+# Number of day-of-month slots in the daily spending arrays
+DAYS = 31
+
+
+def _month_index(day: date, first: date) -> int:
+    return (day.year - first.year) * 12 + day.month - first.month
+
+
+def history_start(today: date, history_months: int) -> date:
+    """
+    Returns the first day of the month `history_months` months before today's.
+    """
+    year, month = divmod(today.year * 12 + today.month - 1 - history_months, 12)
+    return date(year, month + 1, 1)
+
+
+def forecast_month_end(
+    rows: Iterable[Tuple[str, date, float]], today: date, history_months: int
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Projects each category's month-end spending.
+
+    Args:
+        rows (Iterable[Tuple[str, date, float]]): Daily spending as
+            `(category, day, amount)`, covering the `history_months` months
+            before the current one and the current month up to today.
+        today (date): The current day; its month is projected.
+        history_months (int): Number of full past months in `rows`.
+
+    Returns:
+        Dict[str, Tuple[float, float]]: Category to the amount spent so far
+            this month and the projected month-end total.
+    """
+    first = history_start(today, history_months)
+    months = history_months + 1
+
+    categories, category_idx, month_idx, day_idx, amounts = {}, [], [], [], []
+    for category, day, amount in rows:
+        index = _month_index(day, first)
+        if 0 <= index < months and day <= today:
+            category_idx.append(categories.setdefault(category, len(categories)))
+            month_idx.append(index)
+            day_idx.append(day.day - 1)
+            amounts.append(float(amount))
+    if not categories:
+        return {}
+
+    # Daily spending laid out as (category, month, day of month)
+    daily = np.zeros((len(categories), months, DAYS))
+    np.add.at(daily, (category_idx, month_idx, day_idx), amounts)
+    cumulative = daily.cumsum(axis=2)
+    spent = cumulative[:, -1, today.day - 1]
+
+    # Only use past months from the user's first month with any spending on
+    monthly = cumulative[:, :-1, -1]
+    active = np.flatnonzero(monthly.sum(axis=0))
+    start = active[0] if active.size else history_months
+    monthly = monthly[:, start:]
+    past = cumulative[:, start:-1, :]
+    count = monthly.shape[1]
+
+    elapsed = today.day / calendar.monthrange(today.year, today.month)[1]
+    if count == 0:
+        # No history: assume an even pace through the month
+        share = np.full(len(categories), elapsed)
+        trend = spent / elapsed
+    else:
+        history_total = monthly.sum(axis=1)
+        has_history = history_total > 0
+        share = np.where(
+            has_history,
+            past[:, :, today.day - 1].sum(axis=1)
+            / np.where(has_history, history_total, 1),
+            elapsed,
+        )
+
+        if count == 1:
+            trend = monthly[:, 0]
+        else:
+            t = np.arange(count) - (count - 1) / 2
+            slope = (monthly * t).sum(axis=1) / (t * t).sum()
+            trend = monthly.mean(axis=1) + slope * (count - (count - 1) / 2)
+        trend = np.where(has_history, np.maximum(trend, 0), spent / elapsed)
+
+    # Expected month total: the current pace (spent / share) weighted by the
+    # share already spent, the trend weighted by the rest
+    expected = np.where(share > 0, spent + (1 - share) * trend, trend)
+    projected = spent + (1 - share) * expected
+
+    return {
+        category: (round(float(spent[i]), 2), round(float(projected[i]), 2))
+        for category, i in categories.items()
+    }
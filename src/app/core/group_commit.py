@@ -0,0 +1,179 @@
+"""
+Group Commit.
+
+This module coalesces concurrent writes so that many of them share one
+transaction, and so one commit (one WAL flush) instead of one each.
+
+Request threads `submit()` their item to a `GroupCommitter` and block until
+it is written. There is no background thread: the first caller to find no
+batch forming becomes its leader. The leader waits up to `window` seconds
+for more items (less if `max_batch` items arrive first), writes and commits
+the whole batch with the `flush` function, and hands every caller its own
+result. Items that arrive while a batch is being written form the next batch.
+
+Batches are written one at a time: while one is being written, the next
+keeps filling past its window (unless it fills up), so concurrent writes are
+coalesced even with a window of 0. A longer window gives bigger batches and
+fewer commits but adds up to the window to every caller's latency;
+`benchmarks/group_commit.py` measures the trade-off. If a batch fails, its
+items are retried one by one, so an invalid item only fails its own caller.
+That is only safe if nothing was committed, so `flush` must do no work that
+can fail after its commit. Such work (e.g. publishing events) goes in the
+`after_commit` function, which the leader runs once the callers have their
+results; its failures are logged and never retry or fail the items.
+
+Callers must not hold a pooled database connection while they `submit()`:
+the leader needs one to write the batch, and with every connection held by
+a blocked caller it would wait for the pool forever.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Generic, List, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _Pending:
+    """
+    One submitted item and, once its batch is written, its outcome.
+    """
+
+    __slots__ = ("item", "done", "lead", "result", "error")
+
+    def __init__(self, item):
+        self.item = item
+        self.done = threading.Event()
+        self.lead = False
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitter(Generic[T, R]):
+    """
+    Thread-safe batcher writing submitted items with one `flush` per batch.
+
+    Args:
+        flush (Callable[[List[T]], List[R]]): Writes and commits a batch in one
+            transaction and returns one result per item, in order. It must
+            only raise if the transaction was not committed.
+        window (float): Seconds a leader waits for a batch to fill.
+        max_batch (int): Largest number of items written together.
+        after_commit (Callable[[List[R]], None], optional): Called with the
+            results of the items committed by a batch (and its retries).
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], List[R]],
+        window: float,
+        max_batch: int,
+        after_commit: Optional[Callable[[List[R]], None]] = None,
+    ):
+        self.flush = flush
+        self.after_commit = after_commit
+        self.window = window
+        self.max_batch = max(max_batch, 1)
+        self.batches = 0
+        self.items = 0
+        self._queue: List[_Pending] = []
+        self._forming = False
+        self._writing = False
+        self._cond = threading.Condition()
+
+    def submit(self, item: T) -> R:
+        """
+        Writes an item as part of the next batch and returns its result.
+
+        Raises:
+            Exception: Whatever writing this item raised.
+        """
+        pending = _Pending(item)
+        with self._cond:
+            self._queue.append(pending)
+            lead = not self._forming
+            self._forming = True
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+        if not lead:
+            pending.done.wait()
+        if lead or pending.lead:
+            self._lead()
+            pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _lead(self) -> None:
+        with self._cond:
+            deadline = time.monotonic() + self.window
+            while len(self._queue) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not self._writing:
+                    break
+                self._cond.wait(remaining if remaining > 0 else None)
+            batch = self._queue[: self.max_batch]
+            self._queue = self._queue[self.max_batch :]
+            if self._queue:
+                # Items beyond this batch: the first one leads the next batch
+                successor = self._queue[0]
+                successor.lead = True
+                successor.done.set()
+            else:
+                self._forming = False
+            self._writing = True
+
+        try:
+            self._write(batch)
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write(self, batch: List[_Pending]) -> None:
+        committed = []
+        try:
+            results = self.flush([p.item for p in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0].error = exc
+            else:
+                logger.warning(
+                    "Group commit of %d items failed; retrying them one by one",
+                    len(batch),
+                    exc_info=True,
+                )
+                for pending in batch:
+                    try:
+                        (pending.result,) = self.flush([pending.item])
+                    except Exception as exc:
+                        pending.error = exc
+                    else:
+                        committed.append(pending.result)
+        else:
+            for pending, result in zip(batch, results):
+                pending.result = result
+            committed = results
+
+        with self._cond:
+            self.batches += 1
+            self.items += len(batch)
+        logger.debug("Group commit of %d items", len(batch))
+        for pending in batch:
+            pending.done.set()
+
+        if self.after_commit is not None and committed:
+            try:
+                self.after_commit(committed)
+            except Exception:
+                logger.exception(
+                    "After-commit step of a group commit of %d items failed",
+                    len(committed),
+                )
@@ -0,0 +1,151 @@
+"""
+Load Shedding (Admission Control).
+
+This module provides an ASGI middleware that rejects low-priority requests
+early when the worker is saturated, instead of letting every request queue
+behind the threadpool and the database pool until they all time out.
+
+Saturation is judged from four signals, checked on every request:
+    * how long admitted requests recently waited before their handler
+      started (time in queue),
+    * the number of requests currently in flight in this worker,
+    * the fraction of database pool connections checked out,
+    * the number of tasks waiting for a free thread in the sync threadpool.
+
+Time in queue is the most direct of them: it is what clients feel, whatever
+the cause. The middleware stamps each request as it is admitted, and the
+`record_queue_wait` dependency, which runs on a threadpool thread like the
+sync handlers, reports the time since then. The recent wait is a moving
+average that decays with a half-life of `QUEUE_WAIT_HALF_LIFE` seconds, so
+it falls back once the queue drains even if only shed requests arrive.
+
+Only requests whose path starts with one of the configured low-priority
+prefixes (analytics, dashboard, search, background jobs including exports,
+event streams) are shed; they receive a 503 with a `Retry-After` header.
+Expense writes and authentication keep flowing.
+
+Long-lived requests (event streams) are never counted as in flight, since an
+idle open stream does not load the worker, and a stream that is already open
+is never cut. Opening one does cost an authentication query, so new streams
+are shed like other low-priority requests; `EventSource` reconnects on its
+own and the pages work without live updates meanwhile.
+"""
+
+import time
+from typing import Callable, Sequence
+import anyio.to_thread
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+QUEUE_WAIT_HALF_LIFE = 1.0
+# Weight of a new measurement in the moving average
+QUEUE_WAIT_WEIGHT = 0.2
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware that sheds low-priority requests under overload.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        low_priority_prefixes: Sequence[str],
+        max_in_flight: int,
+        max_pool_utilization: float,
+        max_threadpool_queue: int,
+        retry_after_seconds: int,
+        pool_utilization: Callable[[], float],
+        untracked_prefixes: Sequence[str] = (),
+        max_queue_wait: float = float("inf"),
+    ):
+        self.app = app
+        self.low_priority_prefixes = tuple(low_priority_prefixes)
+        self.max_in_flight = max_in_flight
+        self.max_pool_utilization = max_pool_utilization
+        self.max_threadpool_queue = max_threadpool_queue
+        self.retry_after_seconds = retry_after_seconds
+        self.pool_utilization = pool_utilization
+        self.untracked_prefixes = tuple(untracked_prefixes)
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self.shed_count = 0
+        self._queue_wait = 0.0
+        self._queue_wait_at = time.monotonic()
+
+    def queue_wait(self) -> float:
+        """
+        Returns the recent time in queue, in seconds, decayed to now.
+        """
+        elapsed = time.monotonic() - self._queue_wait_at
+        return self._queue_wait * 0.5 ** (elapsed / QUEUE_WAIT_HALF_LIFE)
+
+    def record_queue_wait(self, seconds: float) -> None:
+        """
+        Adds the time in queue of one request to the moving average.
+        """
+        current = self.queue_wait()
+        self._queue_wait = current + QUEUE_WAIT_WEIGHT * (seconds - current)
+        self._queue_wait_at = time.monotonic()
+
+    def overload_reason(self) -> str:
+        """
+        Returns which limit is currently exceeded, or an empty string.
+        """
+        if self.queue_wait() >= self.max_queue_wait:
+            return "queue_wait"
+        if self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.pool_utilization() >= self.max_pool_utilization:
+            return "db_pool"
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        if limiter.statistics().tasks_waiting >= self.max_threadpool_queue:
+            return "threadpool"
+        return ""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(self.low_priority_prefixes):
+            reason = self.overload_reason()
+            if reason:
+                self.shed_count += 1
+                response = JSONResponse(
+                    {"detail": "Server is busy, please retry later"},
+                    status_code=503,
+                    headers={
+                        "Retry-After": str(self.retry_after_seconds),
+                        "X-Load-Shed-Reason": reason,
+                    },
+                )
+                await response(scope, receive, send)
+                return
+
+        if path.startswith(self.untracked_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["load_shedder"] = self
+        state["admitted_at"] = time.monotonic()
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+def record_queue_wait(request: Request) -> None:
+    """
+    Dependency reporting how long the request waited between admission and
+    the start of its handling. Declared sync, so it runs on a threadpool
+    thread and includes the wait for a free one.
+    """
+    shedder = getattr(request.state, "load_shedder", None)
+    if shedder is not None:
+        shedder.record_queue_wait(time.monotonic() - request.state.admitted_at)
@@ -0,0 +1,101 @@
+"""
+Rate Limiting Utilities.
+
+This module implements token-bucket rate limiting behind a small store
+interface. Each bucket holds up to `capacity` tokens and refills continuously
+at `capacity / period_seconds` tokens per second; an attempt is allowed if a
+token can be taken.
+
+`InMemoryTokenBucketStore` keeps the buckets inside the worker process and
+answers in microseconds. Deployments running several workers or hosts can
+plug in a shared store (e.g. backed by Redis) by implementing
+`TokenBucketStore.consume` and registering it with `set_rate_limit_store()`.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, NamedTuple
+
+
+class RateLimit(NamedTuple):
+    """
+    A limit of `capacity` attempts per `period_seconds`, with bursts allowed.
+    """
+
+    capacity: int
+    period_seconds: float
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+
+class TokenBucketStore(ABC):
+    """
+    Interface for token-bucket storage backends.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        """
+        Takes `cost` tokens from the bucket identified by `key`.
+
+        Args:
+            key (str): The bucket identifier (e.g. "login:ip:10.0.0.1").
+            limit (RateLimit): The bucket's capacity and refill period.
+            cost (float, optional): Tokens needed for this attempt. Defaults to 1.
+
+        Returns:
+            float: 0.0 if the attempt is allowed, otherwise the number of
+                seconds until enough tokens will be available.
+        """
+
+
+class InMemoryTokenBucketStore(TokenBucketStore):
+    """
+    Process-local token buckets, bounded to the `max_keys` most recently used.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, limit: RateLimit, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(limit.capacity), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(
+                    limit.capacity,
+                    bucket[0] + (now - bucket[1]) * limit.refill_per_second,
+                )
+                bucket[1] = now
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0.0
+            return (cost - bucket[0]) / limit.refill_per_second
+
+
+_store: TokenBucketStore = InMemoryTokenBucketStore()
+
+
+def get_rate_limit_store() -> TokenBucketStore:
+    return _store
+
+
+def set_rate_limit_store(store: TokenBucketStore) -> None:
+    """
+    Replaces the store used by all rate limits (e.g. with a shared backend).
+    """
+    global _store
+    _store = store
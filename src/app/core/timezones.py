@@ -0,0 +1,35 @@
+"""
+User Timezones.
+
+Every user has an IANA timezone (e.g. "Europe/Berlin"), "UTC" by default.
+Expenses store the day they fall on in that timezone (`local_date`), so days
+and months are bucketed the way the user sees them; this module validates
+timezone names and tells what day it is for a user.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import FrozenSet
+from zoneinfo import ZoneInfo, available_timezones
+
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+@lru_cache(maxsize=1)
+def _timezone_names() -> FrozenSet[str]:
+    return frozenset(available_timezones())
+
+
+def is_valid_timezone(name: str) -> bool:
+    """
+    Tells whether `name` is a known IANA timezone.
+    """
+    return name in _timezone_names()
+
+
+def local_today(timezone: str) -> date:
+    """
+    Returns the current day in a timezone.
+    """
+    return datetime.now(ZoneInfo(timezone)).date()
@@ -0,0 +1,70 @@
+"""
+Verified Token Cache.
+
+This module keeps the claims of recently verified access tokens so that a
+client sending the same token repeatedly (e.g. the several requests of a page
+load) does not pay for signature verification, base64 decoding and JSON
+parsing every time.
+
+Entries are keyed by a SHA-256 digest of the token, so raw tokens are never
+kept in memory, and they are only returned until the token's `exp` claim.
+The cache is bounded and evicts the least recently used entry when full.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class VerifiedTokenCache:
+    """
+    Thread-safe LRU mapping of verified token digests to their claims.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        """
+        Returns the cached claims of `token`, or None if absent or expired.
+        """
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        """
+        Caches the claims of a token whose signature was just verified.
+
+        Tokens without a numeric `exp` claim are not cached.
+        """
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
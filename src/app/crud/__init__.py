@@ -2,15 +2,26 @@
 CRUD Interface Layer.
 
 This module acts as a facade for the CRUD (Create, Read, Update, Delete) operations.
-It aggregates and re-exports functions from individual sub-modules (users, expenses,
-budgets, analytics) to provide a single, clean import point for the rest of the application.
+It aggregates and re-exports functions from individual sub-modules (users, categories,
+expenses, budgets, analytics, jobs, sync, stream tickets) to provide a single, clean import point for the rest of the application.
 Instead of importing from `src.app.crud.users`, other modules can import directly from `src.app.crud`.
 """
 
-from .users import create_user, get_user_by_email, get_user_by_id
+from .users import create_user, get_user_by_email, get_user_by_id, set_user_timezone
+from .categories import (
+    get_category_ids,
+    get_category_names,
+    get_category_id,
+    get_or_create_category_id,
+)
+from .category_totals import adjust_category_totals
+from .user_counters import adjust_user_counters, get_user_counts, lock_user_counters
 from .expenses import (
     create_expense,
     get_expenses,
+    get_recent_expenses,
+    search_expenses,
+    count_search_expenses,
     get_expense_by_id,
     delete_expense,
     update_expense,
@@ -19,6 +30,7 @@ from .budgets import (
     create_budget,
     get_budgets,
     get_budget_by_category,
+    get_budget_rollover,
     update_budget,
     delete_budget,
 )
@@ -26,6 +38,20 @@ from .analytics import (
     get_total_spent,
     get_total_budget,
     get_top_category,
+    get_summary,
     get_category_breakdown_data,
     get_daily_spending,
+    get_month_budgets,
+    get_period_comparison_data,
+)
+from .jobs import (
+    create_job,
+    get_job,
+    count_active_jobs,
+    claim_job,
+    complete_job,
+    fail_job,
+    get_job_file,
 )
+from .sync import get_changes, record_deletions, purge_tombstones
+from .stream_tickets import create_stream_ticket, redeem_stream_ticket
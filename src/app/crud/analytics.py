@@ -4,13 +4,157 @@ Analytics and Statistics Operations.
 This module performs complex database queries to calculate financial summaries,
 such as total spending, remaining budgets, category breakdowns, and daily spending trends.
 It uses SQLAlchemy aggregation functions (SUM, COUNT, etc.).
+
+All-time figures (no month or year filter) are read from the per-category
+lifetime counters in `category_totals`, so they cost O(categories) rather than
+a scan of the user's whole history. Filtered figures and daily series also
+cover archived expenses (see `crud/archive.py`).
+
+Days and months are those of the user's timezone: expenses are bucketed by
+their stored `local_date`, and a year (or a month of a year) is selected as a
+date range on it, which the `(user_id, local_date)` index serves directly.
+
+The dashboard summary queries run on every dashboard load and after every
+change. They are built once at import time as `select()` statements with bind
+parameters (one per combination of month and year filter), so a call only
+binds its values and hits SQLAlchemy's compiled cache instead of rebuilding
+the query each time.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, extract, cast, Date
-from typing import Optional
-from src.app.models.expenses import Expenses
+from sqlalchemy import (
+    func,
+    desc,
+    extract,
+    case,
+    and_,
+    or_,
+    bindparam,
+    select,
+)
+from typing import List, Optional, Tuple
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
 from src.app.models.budgets import Budgets
+from src.app.models.category_totals import CategoryTotals
+from src.app.crud import archive as crud_archive
+from src.app.crud import categories as crud_categories
+
+
+# Label of the bucket that groups the categories beyond a breakdown's limit
+OTHER_CATEGORY = "Other"
+
+
+def _by_period(stmt, when) -> dict:
+    """
+    Builds `stmt` once for each combination of month and year filter on the
+    date column `when`, keyed by `(month given, year given)`.
+
+    A year, or a month of a year, is bound as the `[:start, :end)` range; a
+    month of every year as `:month`.
+    """
+    in_range = and_(when >= bindparam("start"), when < bindparam("end"))
+    return {
+        (False, False): stmt,
+        (True, False): stmt.where(extract("month", when) == bindparam("month")),
+        (False, True): stmt.where(in_range),
+        (True, True): stmt.where(in_range),
+    }
+
+
+SPENDING = crud_archive.SPENDING_ROWS
+
+TOTAL_SPENT_ALL_TIME = select(func.sum(CategoryTotals.total)).where(
+    CategoryTotals.user_id == bindparam("user_id")
+)
+TOTAL_SPENT = _by_period(select(func.sum(SPENDING.c.amount)), SPENDING.c.local_date)
+TOTAL_BUDGET = _by_period(
+    select(func.sum(Budgets.amount)).where(Budgets.user_id == bindparam("user_id")),
+    Budgets.month,
+)
+TOP_CATEGORY_ALL_TIME = (
+    select(CategoryTotals.category_id)
+    .where(
+        CategoryTotals.user_id == bindparam("user_id"),
+        CategoryTotals.expense_count > 0,
+    )
+    .order_by(CategoryTotals.total.desc())
+    .limit(1)
+)
+TOP_CATEGORY = _by_period(
+    select(SPENDING.c.category_id)
+    .group_by(SPENDING.c.category_id)
+    .order_by(func.sum(SPENDING.c.amount).desc())
+    .limit(1),
+    SPENDING.c.local_date,
+)
+MONTH_BUDGETS = select(Budgets.category_id, Budgets.amount).where(
+    Budgets.user_id == bindparam("user_id"), Budgets.month == bindparam("month")
+)
+
+
+def _with_category_names(db: Session, user_id: int, rows):
+    """
+    Replaces the leading `category_id` of grouped rows with the category name.
+
+    Grouping is done on the compact integer key; names are resolved afterwards
+    from the cached category lookup, once per distinct category.
+    """
+    if not rows:
+        return []
+
+    names = crud_categories.get_category_names(
+        db, user_id, required_ids={r[0] for r in rows}
+    )
+    CategoryRow = namedtuple("CategoryRow", ("category",) + tuple(rows[0]._fields[1:]))
+    return [CategoryRow(names[r[0]], *r[1:]) for r in rows]
+
+
+def _all_time(month: Optional[int], year: Optional[int]) -> bool:
+    return not month and not year
+
+
+def period_range(month: Optional[int], year: int) -> Tuple[date, date]:
+    """
+    Returns the half-open `[start, end)` date range of a year, or of one of
+    its months.
+    """
+    if not month:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _in_period(when, month: Optional[int], year: Optional[int]) -> list:
+    """
+    Builds the filter conditions selecting a month and/or year of the date
+    column `when`.
+    """
+    if year:
+        start, end = period_range(month, year)
+        return [when >= start, when < end]
+    if month:
+        return [extract("month", when) == month]
+    return []
+
+
+def _scalar_for_period(
+    db: Session,
+    statements: dict,
+    user_id: int,
+    month: Optional[int],
+    year: Optional[int],
+):
+    """
+    Runs the variant of a `_by_period()` statement matching the filters given.
+    """
+    start, end = period_range(month, year) if year else (None, None)
+    return db.scalar(
+        statements[bool(month), bool(year)],
+        {"user_id": user_id, "month": month, "start": start, "end": end},
+    )
 
 
 def get_total_spent(
@@ -28,12 +172,10 @@ def get_total_spent(
     Returns:
         float: The sum of expenses, or 0 if no expenses found.
     """
-    query = db.query(func.sum(Expenses.amount)).filter(Expenses.user_id == user_id)
-    if month:
-        query = query.filter(extract("month", Expenses.date) == month)
-    if year:
-        query = query.filter(extract("year", Expenses.date) == year)
-    return query.scalar() or 0
+    if _all_time(month, year):
+        return db.scalar(TOTAL_SPENT_ALL_TIME, {"user_id": user_id}) or 0
+
+    return _scalar_for_period(db, TOTAL_SPENT, user_id, month, year) or 0
 
 
 def get_total_budget(
@@ -51,12 +193,7 @@ def get_total_budget(
     Returns:
         float: The sum of budgets, or 0 if no budgets found.
     """
-    query = db.query(func.sum(Budgets.amount)).filter(Budgets.user_id == user_id)
-    if month:
-        query = query.filter(extract("month", Budgets.month) == month)
-    if year:
-        query = query.filter(extract("year", Budgets.month) == year)
-    return query.scalar() or 0
+    return _scalar_for_period(db, TOTAL_BUDGET, user_id, month, year) or 0
 
 
 def get_top_category(
@@ -74,50 +211,166 @@ def get_top_category(
     Returns:
         str: The name of the category with the highest spending, or "No Data".
     """
-    query = db.query(
-        Expenses.category,
-        func.sum(Expenses.amount).label("total"),
-    ).filter(Expenses.user_id == user_id)
+    if _all_time(month, year):
+        category_id = db.scalar(TOP_CATEGORY_ALL_TIME, {"user_id": user_id})
+    else:
+        category_id = _scalar_for_period(db, TOP_CATEGORY, user_id, month, year)
 
-    if month:
-        query = query.filter(extract("month", Expenses.date) == month)
-    if year:
-        query = query.filter(extract("year", Expenses.date) == year)
+    if category_id is None:
+        return "No Data"
+    return crud_categories.get_category_names(db, user_id, required_ids=[category_id])[
+        category_id
+    ]
+
+
+def get_summary(
+    db: Session,
+    user_id: int,
+    month: Optional[int],
+    year: Optional[int],
+    top_category: Optional[str] = None,
+):
+    """
+    Computes the dashboard summary: totals, remaining budget and top category.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The user's ID.
+        month (int, optional): Filter by month number.
+        year (int, optional): Filter by year.
+        top_category (str, optional): The top category, if the caller already
+            has it from a category breakdown; queried otherwise.
+
+    Returns:
+        dict: Total spent, total budget, remaining budget, top category and a
+            status indicator (Safe/Warning/Danger).
+    """
+    total_spent = get_total_spent(db, user_id, month, year)
+    total_budget = get_total_budget(db, user_id, month, year)
+    if top_category is None:
+        top_category = get_top_category(db, user_id, month, year)
+
+    remaining_budget = total_budget - total_spent
 
-    result = query.group_by(Expenses.category).order_by(desc("total")).first()
-    return result[0] if result else "No Data"
+    status = "Safe"
+    if remaining_budget < 0:
+        status = "Danger"
+    elif total_budget > 0 and remaining_budget < (total_budget * Decimal(0.2)):
+        status = "Warning"
+
+    return {
+        "total_spent": total_spent,
+        "total_budget": total_budget,
+        "remaining_budget": remaining_budget,
+        "top_category": top_category,
+        "status": status,
+    }
 
 
 def get_category_breakdown_data(
-    db: Session, user_id: int, month: Optional[int], year: Optional[int]
+    db: Session,
+    user_id: int,
+    month: Optional[int],
+    year: Optional[int],
+    limit: Optional[int] = None,
 ):
     """
     Retrieves spending data grouped by category for charts.
 
+    Totals, percentages of the grand total (`SUM(...) OVER ()`) and the
+    ordering are all computed by the database in a single query. With a
+    `limit`, only the top categories are returned individually and the rest
+    are folded into a trailing "Other" bucket. All-time breakdowns rank the
+    lifetime counters instead of grouping the expenses.
+
     Args:
         db (Session): The database session.
         user_id (int): The user's ID.
         month (int, optional): Filter by month number.
         year (int, optional): Filter by year.
+        limit (int, optional): Number of categories to return individually.
 
     Returns:
-        list: A list of tuples/objects containing category names and total amounts.
+        list: Rows with the category name, total amount and percentage,
+            largest first (the "Other" bucket, if any, last).
     """
-    query = db.query(
-        Expenses.category,
-        func.sum(Expenses.amount).label("total"),
-    ).filter(Expenses.user_id == user_id)
+    if _all_time(month, year):
+        category, total = CategoryTotals.category_id, CategoryTotals.total
+        query = db.query(category).filter(
+            CategoryTotals.user_id == user_id, CategoryTotals.expense_count > 0
+        )
+    else:
+        spending = crud_archive.spending_rows(user_id)
+        category, total = spending.c.category_id, func.sum(spending.c.amount)
+        query = (
+            db.query(category)
+            .filter(*_in_period(spending.c.local_date, month, year))
+            .group_by(category)
+        )
 
-    if month:
-        query = query.filter(extract("month", Expenses.date) == month)
-    if year:
-        query = query.filter(extract("year", Expenses.date) == year)
+    ranked = query.add_columns(
+        total.label("total"),
+        func.sum(total).over().label("grand_total"),
+        func.row_number().over(order_by=(total.desc(), category)).label("rank"),
+    ).subquery()
+    if limit is None:
+        category_id = ranked.c.category_id
+    else:
+        category_id = case((ranked.c.rank <= limit, ranked.c.category_id))
+    amount = func.sum(ranked.c.total)
+    percentage = func.coalesce(
+        func.round(amount * 100 / func.nullif(func.max(ranked.c.grand_total), 0), 1),
+        0,
+    )
+
+    rows = (
+        db.query(
+            category_id.label("category_id"),
+            amount.label("total"),
+            percentage.label("percentage"),
+        )
+        .group_by(category_id)
+        .order_by(category_id.is_(None), desc("total"), category_id)
+        .all()
+    )
+    if not rows:
+        return []
 
-    return query.group_by(Expenses.category).all()
+    names = crud_categories.get_category_names(
+        db, user_id, required_ids={r.category_id for r in rows} - {None}
+    )
+    CategoryRow = namedtuple("CategoryRow", ("category", "total", "percentage"))
+    results = [
+        CategoryRow(
+            names[r.category_id] if r.category_id is not None else OTHER_CATEGORY,
+            r.total,
+            r.percentage,
+        )
+        for r in rows
+    ]
+
+    # A user category named like the bucket is merged into it
+    if rows[-1].category_id is None:
+        other = [r for r in results if r.category == OTHER_CATEGORY]
+        if len(other) > 1:
+            results = [r for r in results if r.category != OTHER_CATEGORY]
+            results.append(
+                CategoryRow(
+                    OTHER_CATEGORY,
+                    sum(r.total for r in other),
+                    sum(r.percentage for r in other),
+                )
+            )
+    return results
 
 
 def get_daily_spending(
-    db: Session, user_id: int, month: Optional[int], year: Optional[int]
+    db: Session,
+    user_id: int,
+    month: Optional[int],
+    year: Optional[int],
+    since: Optional[date] = None,
+    by_category: bool = False,
 ):
     """
     Retrieves total spending grouped by day for trend charts.
@@ -127,18 +380,76 @@ def get_daily_spending(
         user_id (int): The user's ID.
         month (int, optional): Filter by month number.
         year (int, optional): Filter by year.
+        since (date, optional): Only include expenses from this day on.
+        by_category (bool, optional): Also group by category. Defaults to False.
 
     Returns:
-        list: A list of results containing the date and total amount for that day.
+        list: A list of results containing the date and total amount for that
+            day, preceded by the category name if `by_category` is set.
     """
-    date_only = cast(Expenses.date, Date)
-    query = db.query(
-        date_only.label("day"), func.sum(Expenses.amount).label("total")
-    ).filter(Expenses.user_id == user_id)
+    expenses = crud_archive.expense_rows(user_id, since=since)
+    day = expenses.c.local_date
+    columns = [day.label("day"), func.sum(expenses.c.amount).label("total")]
+    if by_category:
+        columns.insert(0, expenses.c.category_id)
+    query = db.query(*columns).filter(*_in_period(day, month, year))
 
-    if month:
-        query = query.filter(extract("month", Expenses.date) == month)
-    if year:
-        query = query.filter(extract("year", Expenses.date) == year)
+    if not by_category:
+        return query.group_by(day).order_by(day).all()
+
+    rows = query.group_by(expenses.c.category_id, day).order_by(day).all()
+    return _with_category_names(db, user_id, rows)
+
+
+def get_month_budgets(db: Session, user_id: int, month: date):
+    """
+    Retrieves the user's budget for each category in one month.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The user's ID.
+        month (date): The first day of the month.
+
+    Returns:
+        list: Rows with the category name and the budgeted amount.
+    """
+    rows = db.execute(MONTH_BUDGETS, {"user_id": user_id, "month": month}).all()
+    return _with_category_names(db, user_id, rows)
+
+
+def get_period_comparison_data(
+    db: Session, user_id: int, periods: List[Tuple[date, date]]
+):
+    """
+    Retrieves per-category spending for several periods side by side.
+
+    All periods are computed in a single grouped query: each period becomes its
+    own `SUM(...) FILTER (WHERE ...)` column, so the expenses table is scanned
+    once no matter how many periods are compared. Archived months are read
+    from their monthly totals, so periods must be whole months.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The user's ID.
+        periods (List[Tuple[date, date]]): Half-open `[start, end)` date ranges.
+
+    Returns:
+        list: Rows with the category name followed by one total per period
+            (`period_0`, `period_1`, ...), in the order the periods were given.
+    """
+    spending = crud_archive.spending_rows(user_id)
+    ranges = [
+        and_(spending.c.local_date >= start, spending.c.local_date < end)
+        for start, end in periods
+    ]
+    totals = [
+        func.coalesce(func.sum(spending.c.amount).filter(in_range), 0).label(
+            f"period_{index}"
+        )
+        for index, in_range in enumerate(ranges)
+    ]
+    query = db.query(spending.c.category_id, *totals).filter(or_(*ranges))
 
-    return query.group_by(date_only).order_by(date_only).all()
+    return _with_category_names(
+        db, user_id, query.group_by(spending.c.category_id).all()
+    )
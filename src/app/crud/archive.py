@@ -0,0 +1,252 @@
+"""
+CRUD Operations for the Expense Archive.
+
+Expenses older than the archive horizon are moved out of the hot `expenses`
+table into one compact row per user and year (`expense_archive`), and their
+per-category monthly totals are added to `monthly_totals`. The lifetime
+`category_totals` keep counting archived expenses. Years, months and the
+archive horizon are those of the expenses' `local_date` (the user's
+timezone), which is archived with them; a later timezone change moves
+neither archived expenses nor archived monthly totals to other days.
+
+Reads that must cover a user's whole history go through the selectables
+defined here instead of the `Expenses` model:
+
+- `expense_rows()`: every expense, hot or archived, one row each (daily
+  series, exports).
+- `spending_rows()`: hot expenses plus the archived monthly totals, for
+  monthly or yearly aggregates that never need the archived rows themselves.
+  `SPENDING_ROWS` is the same subquery built once, with the user bound as
+  `:user_id` when it is executed.
+
+Archived expenses are read-only: they are no longer listed, searched,
+updated or deleted through the expense endpoints.
+"""
+
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import (
+    Date,
+    Integer,
+    SmallInteger,
+    String,
+    Numeric,
+    TIMESTAMP,
+    bindparam,
+    column,
+    func,
+    select,
+    text,
+    true,
+    union_all,
+)
+from sqlalchemy.orm import Session
+from src.app.models.expenses import Expenses
+from src.app.models.users import Users
+from src.app.models.expense_archive import ExpenseArchive, MonthlyTotals
+from src.app.crud import user_counters as crud_user_counters
+
+
+ARCHIVE_EXPENSES = text(
+    """
+    WITH moved AS (
+        DELETE FROM expenses
+        WHERE user_id = :user_id AND local_date < :before
+        RETURNING id, category_id, amount, date, local_date, description
+    ),
+    tombstoned AS (
+        INSERT INTO sync_tombstones (user_id, entity, record_id, row_version)
+        SELECT :user_id, 'expense', id, :version FROM moved
+    ),
+    archived AS (
+        INSERT INTO expense_archive
+            (user_id, year, ids, category_ids, amounts, dates, local_dates,
+             descriptions)
+        SELECT :user_id,
+               year,
+               array_agg(id ORDER BY date, id),
+               array_agg(category_id ORDER BY date, id),
+               array_agg(amount ORDER BY date, id),
+               array_agg(date ORDER BY date, id),
+               array_agg(local_date ORDER BY date, id),
+               array_agg(description ORDER BY date, id)
+        FROM (SELECT *, extract(year FROM local_date)::smallint AS year FROM moved) AS m
+        GROUP BY year
+        ON CONFLICT (user_id, year) DO UPDATE SET
+            ids = expense_archive.ids || excluded.ids,
+            category_ids = expense_archive.category_ids || excluded.category_ids,
+            amounts = expense_archive.amounts || excluded.amounts,
+            dates = expense_archive.dates || excluded.dates,
+            local_dates = expense_archive.local_dates || excluded.local_dates,
+            descriptions = expense_archive.descriptions || excluded.descriptions
+    ),
+    summarized AS (
+        INSERT INTO monthly_totals (user_id, month, category_id, total, expense_count)
+        SELECT :user_id, date_trunc('month', local_date)::date, category_id,
+               sum(amount), count(*)
+        FROM moved
+        GROUP BY 2, 3
+        ON CONFLICT (user_id, month, category_id) DO UPDATE SET
+            total = monthly_totals.total + excluded.total,
+            expense_count = monthly_totals.expense_count + excluded.expense_count
+    )
+    SELECT count(*) FROM moved
+    """
+)
+
+
+def get_users_to_archive(
+    db: Session, before: date, after: int = 0, limit: int = 100
+) -> List[int]:
+    """
+    Retrieves users who have hot expenses dated before `before`, in ID order.
+
+    Users are walked by ID from `after` and each one is checked with an
+    EXISTS probe on the (user_id, local_date) index, so a call costs one
+    index lookup per user instead of a scan of every old expense.
+
+    Args:
+        db (Session): The database session.
+        before (date): The archive horizon.
+        after (int, optional): Only users with a greater ID are returned
+            (the last ID of the previous call). Defaults to 0.
+        limit (int, optional): Maximum number of users to return. Defaults to 100.
+
+    Returns:
+        List[int]: The IDs of the users.
+    """
+    has_old_expenses = (
+        select(Expenses.id)
+        .where(Expenses.user_id == Users.id, Expenses.local_date < before)
+        .exists()
+    )
+    return list(
+        db.scalars(
+            select(Users.id)
+            .where(Users.id > after, has_old_expenses)
+            .order_by(Users.id)
+            .limit(limit)
+        )
+    )
+
+
+def archive_expenses(db: Session, user_id: int, before: date) -> int:
+    """
+    Moves a user's expenses dated before `before` to the archive.
+
+    The expenses are deleted, appended to the user's yearly archive rows and
+    added to the monthly totals in one statement, and the user's expense
+    count is adjusted, all in one transaction. Synced clients see them as
+    deleted, since the expense endpoints no longer serve them.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        before (date): The archive horizon.
+
+    Returns:
+        int: The number of expenses archived.
+    """
+    # The version of the tombstones is taken first; the count is only known
+    # once the expenses are moved
+    version = crud_user_counters.adjust_user_counters(db, user_id)
+    moved = db.execute(
+        ARCHIVE_EXPENSES, {"user_id": user_id, "before": before, "version": version}
+    )
+    count = moved.scalar()
+    crud_user_counters.adjust_user_counters(db, user_id, expenses=-count)
+    db.commit()
+    return count
+
+
+def expense_rows(user_id: int, since: Optional[date] = None):
+    """
+    Builds a subquery of all of a user's expenses, hot and archived.
+
+    Archived expenses keep the `local_date` they had when they were archived.
+
+    Args:
+        user_id (int): The ID of the user.
+        since (date, optional): Only include expenses from this (local) day
+            on; archive rows of earlier years are skipped without unpacking.
+
+    Returns:
+        Subquery: Columns `id`, `category_id`, `amount`, `date`, `local_date`
+            and `description`.
+    """
+    hot = select(
+        Expenses.id,
+        Expenses.category_id,
+        Expenses.amount,
+        Expenses.date,
+        Expenses.local_date,
+        Expenses.description,
+    ).where(Expenses.user_id == user_id)
+
+    unpacked = (
+        func.unnest(
+            ExpenseArchive.ids,
+            ExpenseArchive.category_ids,
+            ExpenseArchive.amounts,
+            ExpenseArchive.dates,
+            ExpenseArchive.local_dates,
+            ExpenseArchive.descriptions,
+        )
+        .table_valued(
+            column("id", Integer),
+            column("category_id", SmallInteger),
+            column("amount", Numeric(precision=10, scale=2)),
+            column("date", TIMESTAMP(timezone=True)),
+            column("local_date", Date),
+            column("description", String),
+        )
+        .render_derived(name="archived")
+    )
+    archived = (
+        select(
+            unpacked.c.id,
+            unpacked.c.category_id,
+            unpacked.c.amount,
+            unpacked.c.date,
+            unpacked.c.local_date,
+            unpacked.c.description,
+        )
+        .select_from(ExpenseArchive)
+        .join(unpacked, true())
+        .where(ExpenseArchive.user_id == user_id)
+    )
+
+    if since:
+        hot = hot.where(Expenses.local_date >= since)
+        archived = archived.where(
+            ExpenseArchive.year >= since.year, unpacked.c.local_date >= since
+        )
+    return union_all(hot, archived).subquery("expense_rows")
+
+
+def spending_rows(user_id):
+    """
+    Builds a subquery of a user's spending at monthly resolution or finer.
+
+    Hot expenses appear one row each, on their local day; archived expenses
+    only as their monthly per-category totals, dated on the first day of the
+    month. Filters must
+    therefore not split a month once it is archived.
+
+    Args:
+        user_id (int | BindParameter): The ID of the user, or a bind parameter
+            supplying it at execution time.
+
+    Returns:
+        Subquery: Columns `category_id`, `local_date` and `amount`.
+    """
+    hot = select(Expenses.category_id, Expenses.local_date, Expenses.amount).where(
+        Expenses.user_id == user_id
+    )
+    archived = select(
+        MonthlyTotals.category_id, MonthlyTotals.month, MonthlyTotals.total
+    ).where(MonthlyTotals.user_id == user_id)
+    return union_all(hot, archived).subquery("spending_rows")
+
+
+SPENDING_ROWS = spending_rows(bindparam("user_id"))
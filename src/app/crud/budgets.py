@@ -3,40 +3,105 @@ CRUD Operations for Budgets.
 
 This module manages database interactions for Budget records, including
 creating new budgets, retrieving lists or specific budgets by category,
-updating existing budgets, and deleting them.
+updating existing budgets, and deleting them, as well as computing the
+amounts carried over between months by rollover budgets.
 """
 
-from typing import List
+from collections import namedtuple
+from datetime import date
+from typing import Callable, List, Optional, Sequence
+from sqlalchemy import Date, and_, bindparam, case, cast, func, select, text
 from sqlalchemy.orm import Session
 from src.app.models.budgets import Budgets
+from src.app.models.categories import Categories
+from src.app.crud import archive as crud_archive
+from src.app.crud import categories as crud_categories
+from src.app.crud import changes as crud_changes
+from src.app.crud import user_counters as crud_user_counters
+from src.app.crud import sync as crud_sync
 from src.app.schemas.budgets import BudgetCreate
 
 
+# Fields that can be selected individually, and the column each one reads
+BUDGET_FIELDS = {
+    "id": Budgets.id,
+    "user_id": Budgets.user_id,
+    "category": Categories.name,
+    "amount": Budgets.amount,
+    "month": Budgets.month,
+    "rollover": Budgets.rollover,
+    "updated_at": Budgets.updated_at,
+    "row_version": Budgets.row_version,
+}
+
+# Built once; the values are bound when the statement is executed
+BUDGET_BY_ID = select(Budgets).where(
+    Budgets.id == bindparam("budget_id"), Budgets.user_id == bindparam("user_id")
+)
+BUDGET_BY_CATEGORY = select(Budgets).where(
+    Budgets.user_id == bindparam("user_id"),
+    Budgets.category_id == bindparam("category_id"),
+    Budgets.month == bindparam("month"),
+)
+
+
 def get_budgets(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[Budgets]:
     """
-    Retrieves a list of budgets for a specific user.
+    Retrieves a list of budgets for a specific user, oldest first.
 
     Args:
         db (Session): The database session.
         user_id (int): The ID of the user.
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 100.
+        fields (Sequence[str], optional): Names from `BUDGET_FIELDS` to select.
+            Only those columns are read, and the category table is only joined
+            when `category` is requested.
 
     Returns:
-        List[Budgets]: A list of budget objects.
+        List[Budgets]: A list of budget objects, or tuples of the requested
+            fields (in order) if `fields` is given.
     """
+    if fields is not None:
+        query = db.query(*(BUDGET_FIELDS[f] for f in fields)).select_from(Budgets)
+        if "category" in fields:
+            query = query.join(
+                Categories,
+                and_(
+                    Categories.user_id == Budgets.user_id,
+                    Categories.id == Budgets.category_id,
+                ),
+            )
+        return (
+            query.filter(Budgets.user_id == user_id)
+            .order_by(Budgets.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
     return (
         db.query(Budgets)
         .filter(Budgets.user_id == user_id)
+        .order_by(Budgets.id)
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
-def create_budget(db: Session, budget: BudgetCreate, user_id: int):
+def create_budget(
+    db: Session,
+    budget: BudgetCreate,
+    user_id: int,
+    before_commit: Optional[Callable[[Budgets], None]] = None,
+):
     """
     Creates a new budget record for a user.
     Forces the budget date to be the first day of the month.
@@ -45,14 +110,32 @@ def create_budget(db: Session, budget: BudgetCreate, user_id: int):
         db (Session): The database session.
         budget (BudgetCreate): The budget data schema.
         user_id (int): The ID of the user creating the budget.
+        before_commit (Callable, optional): Called with the flushed budget
+            just before the commit, to write more in the same transaction.
 
     Returns:
         Budgets: The created budget object.
     """
-    db_budget = Budgets(**budget.model_dump(), user_id=user_id)
+    data = budget.model_dump()
+    data["category_id"] = crud_categories.get_or_create_category_id(
+        db, user_id=user_id, name=data.pop("category")
+    )
+    version = crud_user_counters.adjust_user_counters(db, user_id, budgets=1)
+    db_budget = Budgets(**data, user_id=user_id, row_version=version)
     db.add(db_budget)
+    if before_commit is not None:
+        db.flush()
+        before_commit(db_budget)
     db.commit()
     db.refresh(db_budget)
+    crud_changes.publish_budget_change(
+        db,
+        user_id,
+        "created",
+        db_budget.id,
+        db_budget,
+        keys=[(db_budget.category_id, db_budget.month)],
+    )
     return db_budget
 
 
@@ -71,15 +154,14 @@ def get_budget_by_category(db: Session, user_id: int, category: str, month: int)
     Returns:
         Budgets | None: The budget object if found, otherwise None.
     """
-    return (
-        db.query(Budgets)
-        .filter(
-            Budgets.user_id == user_id,
-            Budgets.category == category,
-            Budgets.month == month,
-        )
-        .first()
-    )
+    category_id = crud_categories.get_category_id(db, user_id=user_id, name=category)
+    if category_id is None:
+        return None
+
+    return db.scalars(
+        BUDGET_BY_CATEGORY,
+        {"user_id": user_id, "category_id": category_id, "month": month},
+    ).first()
 
 
 def update_budget(db: Session, budget_id: int, budget_data: BudgetCreate, user_id: int):
@@ -97,27 +179,42 @@ def update_budget(db: Session, budget_id: int, budget_data: BudgetCreate, user_i
     Returns:
         Budgets | None: The updated budget object, or None if not found.
     """
-    db_budget = (
-        db.query(Budgets)
-        .filter(Budgets.id == budget_id, Budgets.user_id == user_id)
-        .first()
-    )
-    if not db_budget:
-        return None
-
     update_data = budget_data.model_dump(exclude_unset=True)
 
     if "id" in update_data:
         del update_data["id"]
     if "user_id" in update_data:
         del update_data["user_id"]
+    if "category" in update_data:
+        update_data["category_id"] = crud_categories.get_or_create_category_id(
+            db, user_id=user_id, name=update_data.pop("category")
+        )
+
+    crud_user_counters.lock_user_counters(db, user_id)
+    db_budget = db.scalars(
+        BUDGET_BY_ID, {"budget_id": budget_id, "user_id": user_id}
+    ).first()
+    if not db_budget:
+        db.rollback()
+        return None
+
+    previous = db_budget.category_id, db_budget.month
 
     for key, value in update_data.items():
         setattr(db_budget, key, value)
+    db_budget.row_version = crud_user_counters.adjust_user_counters(db, user_id)
 
     db.add(db_budget)
     db.commit()
     db.refresh(db_budget)
+    crud_changes.publish_budget_change(
+        db,
+        user_id,
+        "updated",
+        budget_id,
+        db_budget,
+        keys=[previous, (db_budget.category_id, db_budget.month)],
+    )
     return db_budget
 
 
@@ -133,12 +230,171 @@ def delete_budget(db: Session, budget_id: int, user_id: int):
     Returns:
         Budgets | None: The deleted budget object if found, otherwise None.
     """
-    budget = (
-        db.query(Budgets)
-        .filter(Budgets.id == budget_id, Budgets.user_id == user_id)
-        .first()
-    )
-    if budget:
+    # Read under the counter lock, so a concurrent delete of the same budget
+    # is either seen as done or waits; the count is only changed once
+    crud_user_counters.lock_user_counters(db, user_id)
+    budget = db.scalars(
+        BUDGET_BY_ID, {"budget_id": budget_id, "user_id": user_id}
+    ).first()
+    if not budget:
+        db.rollback()
+    else:
+        key = budget.category_id, budget.month
+        version = crud_user_counters.adjust_user_counters(db, user_id, budgets=-1)
         db.delete(budget)
+        crud_sync.record_deletions(db, user_id, crud_sync.BUDGET, [budget_id], version)
         db.commit()
+        crud_changes.publish_budget_change(
+            db, user_id, "deleted", budget_id, None, keys=[key]
+        )
     return budget
+
+
+def get_budget_rollover(db: Session, user_id: int, month: Optional[date] = None):
+    """
+    Computes every budget's effective amount, including what rolled over.
+
+    The unspent part of a rollover budget is added to the same category's
+    budget of the next month; overspending is not carried. Consecutive months
+    linked this way form a chain, and the amount carried into a month is the
+    clamped running balance of the chain so far. That balance follows
+    `c[m] = max(0, c[m - 1] + amount[m] - spent[m])`, which equals the running
+    sum of `amount - spent` minus its running minimum (when negative), so the
+    whole history is computed with window functions in one statement, over
+    the budgets and the monthly spend aggregates, without iterating months.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        month (date, optional): Only return the budgets of this month.
+
+    Returns:
+        list: Rows with the budget ID, category name, month, amount, rollover
+            flag, the amount carried over, the effective budget, the amount
+            spent and the remainder, by month and category.
+    """
+    spending = crud_archive.spending_rows(user_id)
+    spent_month = cast(func.date_trunc("month", spending.c.local_date), Date)
+    first_month = (
+        select(func.min(Budgets.month))
+        .where(Budgets.user_id == user_id)
+        .scalar_subquery()
+    )
+    spent = (
+        select(
+            spending.c.category_id,
+            spent_month.label("month"),
+            func.sum(spending.c.amount).label("spent"),
+        )
+        .where(spending.c.local_date >= first_month)
+        .group_by(spending.c.category_id, spent_month)
+        .subquery("spent")
+    )
+
+    # A chain starts unless last month had a rollover budget in the category
+    by_month = {"partition_by": Budgets.category_id, "order_by": Budgets.month}
+    continues = and_(
+        func.lag(Budgets.rollover).over(**by_month),
+        func.lag(Budgets.month).over(**by_month)
+        == cast(Budgets.month - text("interval '1 month'"), Date),
+    )
+    budgets = (
+        select(
+            Budgets.id,
+            Budgets.category_id,
+            Budgets.month,
+            Budgets.amount,
+            Budgets.rollover,
+            func.coalesce(spent.c.spent, 0).label("spent"),
+            case((continues, 0), else_=1).label("starts_chain"),
+        )
+        .outerjoin(
+            spent,
+            and_(
+                spent.c.category_id == Budgets.category_id,
+                spent.c.month == Budgets.month,
+            ),
+        )
+        .where(Budgets.user_id == user_id)
+        .subquery("monthly")
+    )
+
+    chained = select(
+        budgets,
+        func.sum(budgets.c.starts_chain)
+        .over(
+            partition_by=budgets.c.category_id,
+            order_by=budgets.c.month,
+            rows=(None, 0),
+        )
+        .label("chain"),
+        (budgets.c.amount - budgets.c.spent).label("balance"),
+    ).subquery("chained")
+
+    in_chain = {
+        "partition_by": (chained.c.category_id, chained.c.chain),
+        "order_by": chained.c.month,
+    }
+    running = select(
+        chained,
+        func.sum(chained.c.balance).over(**in_chain, rows=(None, 0)).label("total"),
+    ).subquery("running")
+
+    # The balance carried out of the previous month, from the running sums
+    # up to it: their last value minus their minimum, if that is negative
+    lowest_before = func.min(running.c.total).over(
+        partition_by=(running.c.category_id, running.c.chain),
+        order_by=running.c.month,
+        rows=(None, -1),
+    )
+    carried = (running.c.total - running.c.balance) - func.least(
+        func.coalesce(lowest_before, 0), 0
+    )
+    rollover = select(
+        running.c.id,
+        running.c.category_id,
+        running.c.month,
+        running.c.amount,
+        running.c.rollover,
+        carried.label("carried_over"),
+        running.c.spent,
+    ).subquery("rollover")
+
+    query = db.query(rollover)
+    if month is not None:
+        query = query.filter(rollover.c.month == month)
+    rows = query.order_by(rollover.c.month, rollover.c.category_id).all()
+    if not rows:
+        return []
+
+    names = crud_categories.get_category_names(
+        db, user_id, required_ids={r.category_id for r in rows}
+    )
+    RolloverRow = namedtuple(
+        "RolloverRow",
+        (
+            "id",
+            "category",
+            "month",
+            "amount",
+            "rollover",
+            "carried_over",
+            "effective",
+            "spent",
+            "remaining",
+        ),
+    )
+    return [
+        RolloverRow(
+            r.id,
+            names[r.category_id],
+            r.month,
+            r.amount,
+            r.rollover,
+            r.carried_over,
+            r.amount + r.carried_over,
+            r.spent,
+            r.amount + r.carried_over - r.spent,
+        )
+        for r in rows
+    ]
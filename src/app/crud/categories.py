@@ -0,0 +1,191 @@
+"""
+CRUD Operations for Categories.
+
+This module maps category names to the compact per-user integer keys stored
+on expenses and budgets. Lookups go through a process-wide cache, since a
+user's categories change rarely and ids are never reused or renamed.
+
+New categories are inserted in the caller's transaction, so they commit or
+roll back with the record that uses them, without taking a second pooled
+connection. Until that transaction ends, the user's ids are not cached: a
+rolled-back id could later be given to another category. Callers resolve
+categories before locking the user's counters (see `lock_user_counters()`),
+since a concurrent insert of the same category waits for the first one to
+commit.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.app.models.categories import Categories
+
+
+CATEGORY_CACHE_MAX_USERS = 4096
+CATEGORY_CREATE_ATTEMPTS = 5
+
+# Session.info key of the users with categories created in the open transaction
+_UNCOMMITTED = "uncommitted_category_users"
+
+_cache: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(user_id: int) -> Optional[Dict[str, int]]:
+    with _cache_lock:
+        ids = _cache.get(user_id)
+        if ids is not None:
+            _cache.move_to_end(user_id)
+        return ids
+
+
+def _cache_put(user_id: int, ids: Dict[str, int]) -> None:
+    with _cache_lock:
+        _cache[user_id] = ids
+        _cache.move_to_end(user_id)
+        while len(_cache) > CATEGORY_CACHE_MAX_USERS:
+            _cache.popitem(last=False)
+
+
+def _end_transaction(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_UNCOMMITTED, None)
+
+
+def _load_category_ids(db: Session, user_id: int) -> Dict[str, int]:
+    """
+    Reads all of a user's categories from the database and caches them,
+    unless the session created some that are not committed yet.
+    """
+    rows = db.execute(
+        select(Categories.name, Categories.id).where(Categories.user_id == user_id)
+    ).all()
+    ids = {name: category_id for name, category_id in rows}
+    if user_id not in db.info.get(_UNCOMMITTED, ()):
+        _cache_put(user_id, ids)
+    return ids
+
+
+def get_category_ids(db: Session, user_id: int) -> Dict[str, int]:
+    """
+    Retrieves the name-to-id mapping of a user's categories.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+
+    Returns:
+        Dict[str, int]: Category ids keyed by category name.
+    """
+    ids = _cache_get(user_id)
+    if ids is None:
+        ids = _load_category_ids(db, user_id)
+    return ids
+
+
+def get_category_names(
+    db: Session, user_id: int, required_ids: Iterable[int] = ()
+) -> Dict[int, str]:
+    """
+    Retrieves the id-to-name mapping of a user's categories.
+
+    The cache is refreshed if any of `required_ids` is unknown, which happens
+    when another worker process created the category.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        required_ids (Iterable[int], optional): Ids the caller needs to resolve.
+
+    Returns:
+        Dict[int, str]: Category names keyed by category id.
+    """
+    ids = get_category_ids(db, user_id)
+    names = {category_id: name for name, category_id in ids.items()}
+    if any(category_id not in names for category_id in required_ids):
+        ids = _load_category_ids(db, user_id)
+        names = {category_id: name for name, category_id in ids.items()}
+    return names
+
+
+def get_category_id(db: Session, user_id: int, name: str) -> Optional[int]:
+    """
+    Looks up the id of an existing category without creating it.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        name (str): The category name.
+
+    Returns:
+        int | None: The category id, or None if the user has no such category.
+    """
+    category_id = get_category_ids(db, user_id).get(name)
+    if category_id is None:
+        category_id = _load_category_ids(db, user_id).get(name)
+    return category_id
+
+
+def get_or_create_category_id(db: Session, user_id: int, name: str) -> int:
+    """
+    Returns the id of a category, creating the category if needed.
+
+    The category is inserted in the caller's transaction; it is not
+    committed here. The next free per-user id is allocated inside the INSERT
+    itself. Two requests creating different categories for the same user at
+    the same time may race for the same id; the loser rolls back to a
+    savepoint and retries with a fresh id.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        name (str): The category name.
+
+    Returns:
+        int: The category id.
+    """
+    category_id = get_category_id(db, user_id, name)
+    if category_id is not None:
+        return category_id
+
+    stmt = (
+        insert(Categories)
+        .from_select(
+            ["user_id", "id", "name"],
+            select(
+                literal(user_id, Categories.user_id.type),
+                func.coalesce(func.max(Categories.id), 0) + 1,
+                literal(name, Categories.name.type),
+            ).where(Categories.user_id == user_id),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "name"])
+        .returning(Categories.id)
+    )
+
+    for attempt in range(CATEGORY_CREATE_ATTEMPTS):
+        try:
+            with db.begin_nested():
+                category_id = db.execute(stmt).scalar()
+        except IntegrityError:
+            if attempt == CATEGORY_CREATE_ATTEMPTS - 1:
+                raise
+            continue
+        break
+
+    if category_id is None:
+        # Created by a transaction that committed while the insert waited
+        return db.execute(
+            select(Categories.id).where(
+                Categories.user_id == user_id, Categories.name == name
+            )
+        ).scalar_one()
+
+    db.info.setdefault(_UNCOMMITTED, set()).add(user_id)
+    if not event.contains(db, "after_transaction_end", _end_transaction):
+        event.listen(db, "after_transaction_end", _end_transaction)
+    with _cache_lock:
+        _cache.pop(user_id, None)
+    return category_id
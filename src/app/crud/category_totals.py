@@ -0,0 +1,51 @@
+"""
+CRUD Operations for Category Totals.
+
+This module maintains the per-user, per-category lifetime spending counters.
+The expense CRUD functions call `adjust_category_totals()` before committing,
+so the counters change in the same transaction as the expenses they count.
+"""
+
+from decimal import Decimal
+from typing import Dict, Tuple
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.app.models.category_totals import CategoryTotals
+
+
+def adjust_category_totals(
+    db: Session, user_id: int, deltas: Dict[int, Tuple[Decimal, int]]
+) -> None:
+    """
+    Adds amount and count deltas to a user's category counters.
+
+    Rows are upserted atomically (`INSERT ... ON CONFLICT DO UPDATE`) in
+    category order, so concurrent writers cannot lose updates or deadlock.
+    The changes are not committed here.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        deltas (Dict[int, Tuple[Decimal, int]]): Category id to the change of
+            the total amount and of the number of expenses.
+    """
+    for category_id in sorted(deltas):
+        amount, count = deltas[category_id]
+        if not amount and not count:
+            continue
+        stmt = insert(CategoryTotals).values(
+            user_id=user_id,
+            category_id=category_id,
+            total=amount,
+            expense_count=count,
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "category_id"],
+                set_={
+                    "total": CategoryTotals.total + stmt.excluded.total,
+                    "expense_count": CategoryTotals.expense_count
+                    + stmt.excluded.expense_count,
+                },
+            )
+        )
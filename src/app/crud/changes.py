@@ -0,0 +1,195 @@
+"""
+Change Notifications for Expenses and Budgets.
+
+This module is called by the expense and budget CRUD functions after they
+commit. It computes the aggregates affected by the change (the overall
+summary, the touched categories' totals, the spent/budget figures of the
+touched category-months and, for expenses, the touched days) and publishes
+them as a `change` event to the user's open event streams, so the dashboard
+and budgets pages can patch their view instead of refetching everything.
+
+Nothing is computed when the user has no open stream, and a failure here is
+logged rather than raised: the change itself is already committed.
+"""
+
+import logging
+from datetime import date
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from src.app.core.events import get_event_broker
+from src.app.models.expenses import Expenses
+from src.app.models.budgets import Budgets
+from src.app.models.category_totals import CategoryTotals
+from src.app.crud import analytics as crud_analytics
+from src.app.crud import archive as crud_archive
+from src.app.crud import categories as crud_categories
+from src.app.schemas.analytics import DashboardSummary
+from src.app.schemas.expenses import ExpenseResponse
+from src.app.schemas.budgets import BudgetResponse
+
+
+logger = logging.getLogger(__name__)
+
+# A touched (category_id, month start) pair
+ChangeKey = Tuple[int, date]
+
+
+def expense_key(category_id: int, local_date: date) -> ChangeKey:
+    return category_id, local_date.replace(day=1)
+
+
+def _category_month(db: Session, user_id: int, key: ChangeKey) -> dict:
+    """
+    Returns the spent and budgeted amounts of one category in one month.
+    """
+    category_id, month = key
+    start, end = crud_analytics.period_range(month.month, month.year)
+    spending = crud_archive.spending_rows(user_id)
+    spent = (
+        db.query(func.sum(spending.c.amount))
+        .filter(
+            spending.c.category_id == category_id,
+            spending.c.local_date >= start,
+            spending.c.local_date < end,
+        )
+        .scalar()
+    )
+    budget = (
+        db.query(Budgets.amount)
+        .filter(
+            Budgets.user_id == user_id,
+            Budgets.category_id == category_id,
+            Budgets.month == month,
+        )
+        .scalar()
+    )
+    return {
+        "month": month.isoformat(),
+        "spent": float(spent or 0),
+        "budget": float(budget) if budget is not None else None,
+    }
+
+
+def _publish(
+    db: Session,
+    user_id: int,
+    entity: str,
+    action: str,
+    record_id: int,
+    record: Optional[dict],
+    keys: Iterable[ChangeKey],
+    days: Iterable[date] = (),
+) -> None:
+    keys = sorted(set(keys))
+    category_ids = {category_id for category_id, _ in keys}
+    names = crud_categories.get_category_names(db, user_id, required_ids=category_ids)
+
+    summary = crud_analytics.get_summary(db, user_id, None, None)
+    category_totals = dict(
+        db.query(CategoryTotals.category_id, CategoryTotals.total)
+        .filter(
+            CategoryTotals.user_id == user_id,
+            CategoryTotals.category_id.in_(category_ids),
+        )
+        .all()
+    )
+
+    day_totals = []
+    for day in sorted(set(days)):
+        amount = (
+            db.query(func.sum(Expenses.amount))
+            .filter(Expenses.user_id == user_id, Expenses.local_date == day)
+            .scalar()
+        )
+        day_totals.append({"date": day.isoformat(), "amount": float(amount or 0)})
+
+    get_event_broker().publish(
+        user_id,
+        "change",
+        {
+            "entity": entity,
+            "action": action,
+            "id": record_id,
+            "record": record,
+            "summary": DashboardSummary(**summary).model_dump(),
+            "categories": [
+                {
+                    "category": names[category_id],
+                    "total_amount": float(category_totals.get(category_id, 0)),
+                }
+                for category_id in sorted(category_ids)
+            ],
+            "budgets": [
+                {"category": names[key[0]], **_category_month(db, user_id, key)}
+                for key in keys
+            ],
+            "days": day_totals,
+        },
+    )
+
+
+def publish_expense_change(
+    db: Session,
+    user_id: int,
+    action: str,
+    expense_id: int,
+    expense: Optional[Expenses],
+    keys: Iterable[ChangeKey],
+    days: Iterable[date],
+) -> None:
+    """
+    Publishes the aggregates affected by an expense change.
+
+    Args:
+        db (Session): The database session (after the change was committed).
+        user_id (int): The owner of the expense.
+        action (str): "created", "updated" or "deleted".
+        expense_id (int): The ID of the expense.
+        expense (Expenses, optional): The expense, None if deleted.
+        keys (Iterable[ChangeKey]): Category-months touched (old and new).
+        days (Iterable[date]): Days touched (old and new).
+    """
+    if not get_event_broker().has_subscribers(user_id):
+        return
+    try:
+        record = (
+            ExpenseResponse.model_validate(expense).model_dump(mode="json")
+            if expense is not None
+            else None
+        )
+        _publish(db, user_id, "expense", action, expense_id, record, keys, days)
+    except Exception:
+        logger.exception("Could not publish expense change for user %s", user_id)
+
+
+def publish_budget_change(
+    db: Session,
+    user_id: int,
+    action: str,
+    budget_id: int,
+    budget: Optional[Budgets],
+    keys: Iterable[ChangeKey],
+) -> None:
+    """
+    Publishes the aggregates affected by a budget change.
+
+    Args:
+        db (Session): The database session (after the change was committed).
+        user_id (int): The owner of the budget.
+        action (str): "created", "updated" or "deleted".
+        budget_id (int): The ID of the budget.
+        budget (Budgets, optional): The budget, None if deleted.
+        keys (Iterable[ChangeKey]): Category-months touched (old and new).
+    """
+    if not get_event_broker().has_subscribers(user_id):
+        return
+    try:
+        record = (
+            BudgetResponse.model_validate(budget).model_dump(mode="json")
+            if budget is not None
+            else None
+        )
+        _publish(db, user_id, "budget", action, budget_id, record, keys)
+    except Exception:
+        logger.exception("Could not publish budget change for user %s", user_id)
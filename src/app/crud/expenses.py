@@ -6,55 +6,436 @@ It includes functions to create, read (list and retrieve single),
 update, and delete expenses for specific users.
 """
 
-from typing import List
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import (
+    TIMESTAMP,
+    Date,
+    func,
+    or_,
+    and_,
+    desc,
+    select,
+    bindparam,
+    cast,
+    insert,
+)
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from src.app.core.config import get_settings
+from src.app.core.group_commit import GroupCommitter
+from src.app.db.session import SessionLocal
 from src.app.models.expenses import Expenses
+from src.app.models.categories import Categories
+from src.app.models.users import Users
+from src.app.crud import categories as crud_categories
+from src.app.crud import changes as crud_changes
+from src.app.crud import category_totals as crud_category_totals
+from src.app.crud import user_counters as crud_user_counters
+from src.app.crud import sync as crud_sync
 from src.app.schemas.expenses import ExpenseCreate
 
 
+# Fields that can be selected individually, and the column each one reads
+EXPENSE_FIELDS = {
+    "id": Expenses.id,
+    "user_id": Expenses.user_id,
+    "amount": Expenses.amount,
+    "description": Expenses.description,
+    "category": Categories.name,
+    "date": Expenses.date,
+    "local_date": Expenses.local_date,
+    "updated_at": Expenses.updated_at,
+    "row_version": Expenses.row_version,
+}
+
+# Built once; the IDs are bound when the statement is executed
+EXPENSE_BY_ID = select(Expenses).where(
+    Expenses.id == bindparam("expense_id"), Expenses.user_id == bindparam("user_id")
+)
+
+# Group committers of expense creation, one per database engine (shard)
+_committers: Dict[Engine, GroupCommitter] = {}
+_committers_lock = threading.Lock()
+
+
 def get_expenses(
-    db: Session, user_id: int, skip: int = 0, limit: int = 100
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[Expenses]:
     """
-    Retrieves a list of expenses for a specific user with pagination.
+    Retrieves a list of expenses for a specific user with pagination,
+    newest first.
 
     Args:
         db (Session): The database session.
         user_id (int): The ID of the user who owns the expenses.
         skip (int, optional): Number of records to skip. Defaults to 0.
         limit (int, optional): Maximum number of records to return. Defaults to 100.
+        fields (Sequence[str], optional): Names from `EXPENSE_FIELDS` to select.
+            Only those columns are read, and the category table is only joined
+            when `category` is requested.
 
     Returns:
-        List[Expenses]: A list of expense objects.
+        List[Expenses]: A list of expense objects, or tuples of the requested
+            fields (in order) if `fields` is given.
     """
+    if fields is not None:
+        query = db.query(*(EXPENSE_FIELDS[f] for f in fields)).select_from(Expenses)
+        if "category" in fields:
+            query = query.join(
+                Categories,
+                and_(
+                    Categories.user_id == Expenses.user_id,
+                    Categories.id == Expenses.category_id,
+                ),
+            )
+        return (
+            query.filter(Expenses.user_id == user_id)
+            .order_by(desc(Expenses.date), desc(Expenses.id))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
     return (
         db.query(Expenses)
         .filter(Expenses.user_id == user_id)
+        .order_by(desc(Expenses.date), desc(Expenses.id))
         .offset(skip)
         .limit(limit)
         .all()
     )
 
 
-def create_expense(db: Session, expense: ExpenseCreate, user_id: int):
+def get_recent_expenses(db: Session, user_id: int, limit: int = 10) -> List[Expenses]:
+    """
+    Retrieves a user's most recent expenses, newest first.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user who owns the expenses.
+        limit (int, optional): Maximum number of records to return. Defaults to 10.
+
+    Returns:
+        List[Expenses]: The latest expense objects.
+    """
+    return (
+        db.query(Expenses)
+        .filter(Expenses.user_id == user_id)
+        .order_by(desc(Expenses.date), desc(Expenses.id))
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_condition(user_id: int, q: str):
+    """
+    Builds the filter matching a user's expenses for a search text.
+    """
+    escaped = q.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return and_(
+        Expenses.user_id == user_id,
+        or_(
+            Expenses.description_search.op("@@")(
+                func.websearch_to_tsquery("simple", q)
+            ),
+            Expenses.description.ilike(f"%{escaped}%", escape="/"),
+            Expenses.description.op("%")(q),
+        ),
+    )
+
+
+def search_expenses(
+    db: Session, user_id: int, q: str, skip: int = 0, limit: int = 100
+) -> List[Expenses]:
+    """
+    Searches a user's expenses by description, ranked by relevance.
+
+    An expense matches if its description contains all the query words
+    (full-text), contains the query as a substring, or is similar enough to
+    tolerate typos (trigram similarity). All three conditions are served by
+    GIN indexes on `(user_id, ...)`, so the cost grows with the number of
+    matches rather than the size of the table.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user who owns the expenses.
+        q (str): The search text.
+        skip (int, optional): Number of records to skip. Defaults to 0.
+        limit (int, optional): Maximum number of records to return. Defaults to 100.
+
+    Returns:
+        List[Expenses]: Matching expenses, best matches (then newest) first.
+    """
+    tsquery = func.websearch_to_tsquery("simple", q)
+    rank = func.ts_rank_cd(Expenses.description_search, tsquery) + func.similarity(
+        Expenses.description, q
+    )
+
+    return (
+        db.query(Expenses)
+        .filter(_search_condition(user_id, q))
+        .order_by(desc(rank), desc(Expenses.date))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def count_search_expenses(
+    db: Session, user_id: int, q: str, estimate: bool = False
+) -> int:
+    """
+    Counts the expenses `search_expenses()` can return for a search text.
+
+    An exact count visits every match. With `estimate`, the query is only
+    planned (`EXPLAIN`) and the planner's row estimate is returned, which
+    costs the same however many expenses match but may be off, especially
+    for rare or very common words.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user who owns the expenses.
+        q (str): The search text.
+        estimate (bool, optional): Return the planner's estimate. Defaults to False.
+
+    Returns:
+        int: The number of matching expenses.
+    """
+    stmt = select(Expenses.id).where(_search_condition(user_id, q))
+    if not estimate:
+        return db.scalar(select(func.count()).select_from(stmt.subquery()))
+
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _set_local_date(expense: Expenses, user_id: int) -> None:
+    """
+    Sets an expense's `local_date`: the day its `date` falls on in the user's
+    timezone, which the database reads from the user row as the expense is
+    written. A `date` without a UTC offset is taken as the user's local time.
+    """
+    timezone = select(Users.timezone).where(Users.id == user_id).scalar_subquery()
+    when = expense.date
+    if when.tzinfo is None:
+        expense.local_date = when.date()
+        expense.date = func.timezone(timezone, cast(when, TIMESTAMP))
+    else:
+        expense.local_date = cast(
+            func.timezone(timezone, cast(when, TIMESTAMP(timezone=True))), Date
+        )
+
+
+def _publish_change(db: Session, action: str, expense: Expenses, previous=None):
+    """
+    Publishes a change event for an expense that was just created or updated.
+
+    `previous` is the `(category_id, local_date)` the expense had before an
+    update, whose aggregates changed as well.
+    """
+    keys = [crud_changes.expense_key(expense.category_id, expense.local_date)]
+    days = [expense.local_date]
+    if previous is not None:
+        keys.append(crud_changes.expense_key(*previous))
+        days.append(previous[1])
+    crud_changes.publish_expense_change(
+        db,
+        expense.user_id,
+        action,
+        expense.id,
+        expense,
+        keys=keys,
+        days=days,
+    )
+
+
+def create_expense(
+    db: Session,
+    expense: ExpenseCreate,
+    user_id: int,
+    before_commit: Optional[Callable[[Expenses], None]] = None,
+):
     """
     Creates a new expense record for a user.
 
+    With `expense_group_commit` enabled, the expense is written together with
+    other expenses created at the same time on the same database, in one
+    transaction (see `_create_expense_batch()`); the session's connection is
+    released before the create waits for its batch. Creates with
+    `before_commit` are always written in the session's own transaction.
+
     Args:
         db (Session): The database session.
         expense (ExpenseCreate): The expense data schema.
         user_id (int): The ID of the user creating the expense.
+        before_commit (Callable, optional): Called with the flushed expense
+            just before the commit, to write more in the same transaction.
 
     Returns:
         Expenses: The created expense object.
     """
-    db_expense = Expenses(**expense.model_dump(), user_id=user_id)
+    data = expense.model_dump()
+    category = data.pop("category")
+    if before_commit is None and get_settings().expense_group_commit:
+        # The batch is written on the leader's own connection, so this
+        # request's connection goes back to the pool before blocking: the
+        # waiters of a batch must never hold the connections its leader
+        # needs. Only a new category is committed first, to be visible to the
+        # leader; otherwise the read-only transaction is just ended
+        data["category_id"] = crud_categories.get_category_id(db, user_id, category)
+        if data["category_id"] is None:
+            data["category_id"] = crud_categories.get_or_create_category_id(
+                db, user_id=user_id, name=category
+            )
+            db.commit()
+        else:
+            db.close()
+        return _get_group_committer(db.get_bind()).submit((user_id, data, category))
+
+    data["category_id"] = crud_categories.get_or_create_category_id(
+        db, user_id=user_id, name=category
+    )
+
+    version = crud_user_counters.adjust_user_counters(db, user_id, expenses=1)
+    db_expense = Expenses(**data, user_id=user_id, row_version=version)
+    _set_local_date(db_expense, user_id)
     db.add(db_expense)
+    crud_category_totals.adjust_category_totals(
+        db, user_id, {db_expense.category_id: (db_expense.amount, 1)}
+    )
+    if before_commit is not None:
+        db.flush()
+        before_commit(db_expense)
     db.commit()
     db.refresh(db_expense)
+    _publish_change(db, "created", db_expense)
     return db_expense
 
 
+# Columns read back from a batch insert (all but the deferred search vector)
+CREATED_EXPENSE_COLUMNS = [
+    c for c in Expenses.__table__.c if c.key != "description_search"
+]
+
+
+def _create_expense_batch(
+    engine: Engine, items: List[Tuple[int, dict, str]]
+) -> List[Expenses]:
+    """
+    Creates expenses of any number of users in one transaction: the counter
+    upserts (user by user, in ID order, each counters before category totals
+    like single writers lock them), a single multi-row insert and one commit.
+
+    The users' timezones are read once for the whole batch and `local_date`
+    is computed here rather than by the database. `items` are
+    `(user_id, values, category)` triples whose category name is already
+    resolved to the `category_id` in the values. The created expenses are
+    built from the rows the insert returns, before the commit, and returned
+    in the same order (detached from any session); nothing can fail after
+    the commit, so a failure means the batch was not written. Change events
+    are published afterwards by `_publish_created()`.
+    """
+    db = SessionLocal(bind=engine)
+    try:
+        user_ids = sorted({user_id for user_id, _, _ in items})
+        timezones = dict(
+            db.execute(
+                select(Users.id, Users.timezone).where(Users.id.in_(user_ids))
+            ).all()
+        )
+
+        rows = []
+        deltas: Dict[int, Dict[int, Tuple[Decimal, int]]] = defaultdict(dict)
+        for user_id, data, _ in items:
+            row = {**data, "user_id": user_id}
+            zone = ZoneInfo(timezones[user_id])
+            when = row["date"]
+            if when.tzinfo is None:
+                row["local_date"] = when.date()
+                row["date"] = when.replace(tzinfo=zone)
+            else:
+                row["local_date"] = when.astimezone(zone).date()
+            rows.append(row)
+
+            amount, count = deltas[user_id].get(row["category_id"], (0, 0))
+            deltas[user_id][row["category_id"]] = (amount + row["amount"], count + 1)
+
+        versions = {}
+        for user_id in user_ids:
+            user_deltas = deltas[user_id]
+            versions[user_id] = crud_user_counters.adjust_user_counters(
+                db, user_id, expenses=sum(count for _, count in user_deltas.values())
+            )
+            crud_category_totals.adjust_category_totals(db, user_id, user_deltas)
+        for row in rows:
+            row["row_version"] = versions[row["user_id"]]
+
+        created = db.execute(
+            insert(Expenses.__table__).returning(
+                *CREATED_EXPENSE_COLUMNS, sort_by_parameter_order=True
+            ),
+            rows,
+        ).all()
+        expenses = []
+        for row, (user_id, data, category) in zip(created, items):
+            expense = Expenses(**row._mapping)
+            expense.category_entry = Categories(
+                user_id=user_id, id=data["category_id"], name=category
+            )
+            expenses.append(expense)
+        db.commit()
+        return expenses
+    finally:
+        db.close()
+
+
+def _publish_created(engine: Engine, expenses: List[Expenses]) -> None:
+    """
+    Publishes the change events of expenses committed by a batch.
+    """
+    db = SessionLocal(bind=engine)
+    try:
+        for expense in expenses:
+            _publish_change(db, "created", expense)
+    finally:
+        db.close()
+
+
+def _get_group_committer(engine: Engine) -> GroupCommitter:
+    """
+    Returns the group committer of expense creation on a database engine,
+    creating it on first use.
+    """
+    committer = _committers.get(engine)
+    if committer is None:
+        with _committers_lock:
+            committer = _committers.get(engine)
+            if committer is None:
+                settings = get_settings()
+                committer = GroupCommitter(
+                    partial(_create_expense_batch, engine),
+                    window=settings.expense_group_commit_window_ms / 1000,
+                    max_batch=settings.expense_group_commit_max_batch,
+                    after_commit=partial(_publish_created, engine),
+                )
+                _committers[engine] = committer
+    return committer
+
+
 def get_expense_by_id(db: Session, expense_id: int, user_id: int):
     """
     Retrieves a specific expense by ID, ensuring ownership.
@@ -67,11 +448,9 @@ def get_expense_by_id(db: Session, expense_id: int, user_id: int):
     Returns:
         Expenses | None: The expense object if found and owned by user, otherwise None.
     """
-    return (
-        db.query(Expenses)
-        .filter(Expenses.id == expense_id, Expenses.user_id == user_id)
-        .first()
-    )
+    return db.scalars(
+        EXPENSE_BY_ID, {"expense_id": expense_id, "user_id": user_id}
+    ).first()
 
 
 def delete_expense(db: Session, expense_id: int, user_id: int):
@@ -86,14 +465,27 @@ def delete_expense(db: Session, expense_id: int, user_id: int):
     Returns:
         Expenses | None: The deleted expense object if found, otherwise None.
     """
-    expense = (
-        db.query(Expenses)
-        .filter(Expenses.id == expense_id, Expenses.user_id == user_id)
-        .first()
-    )
-    if expense:
+    # Read under the counter lock, so a concurrent delete of the same expense
+    # is either seen as done or waits; the counters are only changed once
+    crud_user_counters.lock_user_counters(db, user_id)
+    expense = get_expense_by_id(db, expense_id, user_id)
+    if not expense:
+        db.rollback()
+    else:
+        key = crud_changes.expense_key(expense.category_id, expense.local_date)
+        day = expense.local_date
+        version = crud_user_counters.adjust_user_counters(db, user_id, expenses=-1)
         db.delete(expense)
+        crud_category_totals.adjust_category_totals(
+            db, user_id, {expense.category_id: (-expense.amount, -1)}
+        )
+        crud_sync.record_deletions(
+            db, user_id, crud_sync.EXPENSE, [expense_id], version
+        )
         db.commit()
+        crud_changes.publish_expense_change(
+            db, user_id, "deleted", expense_id, None, keys=[key], days=[day]
+        )
     return expense
 
 
@@ -114,25 +506,40 @@ def update_expense(
     Returns:
         Expenses | None: The updated expense object, or None if not found.
     """
-    db_expense = (
-        db.query(Expenses)
-        .filter(Expenses.id == expense_id, Expenses.user_id == user_id)
-        .first()
-    )
-    if not db_expense:
-        return None
-
     update_data = expense_data.model_dump(exclude_unset=True)
 
     if "id" in update_data:
         del update_data["id"]
     if "user_id" in update_data:
         del update_data["user_id"]
+    if "category" in update_data:
+        update_data["category_id"] = crud_categories.get_or_create_category_id(
+            db, user_id=user_id, name=update_data.pop("category")
+        )
+
+    # The deltas below are computed from the row as read under the lock
+    crud_user_counters.lock_user_counters(db, user_id)
+    db_expense = get_expense_by_id(db, expense_id, user_id)
+    if not db_expense:
+        db.rollback()
+        return None
+
+    previous = db_expense.category_id, db_expense.local_date
+    previous_amount = db_expense.amount
 
     for key, value in update_data.items():
         setattr(db_expense, key, value)
+    if "date" in update_data:
+        _set_local_date(db_expense, user_id)
+    db_expense.row_version = crud_user_counters.adjust_user_counters(db, user_id)
+
+    deltas = {previous[0]: (-previous_amount, -1)}
+    amount, count = deltas.get(db_expense.category_id, (0, 0))
+    deltas[db_expense.category_id] = (amount + db_expense.amount, count + 1)
+    crud_category_totals.adjust_category_totals(db, user_id, deltas)
 
     db.add(db_expense)
     db.commit()
     db.refresh(db_expense)
+    _publish_change(db, "updated", db_expense, previous)
     return db_expense
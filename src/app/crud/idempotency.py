@@ -0,0 +1,100 @@
+"""
+CRUD Operations for Idempotency Keys.
+
+These functions work in the request's own transaction: the key row is
+inserted first and only committed together with the write it guards and its
+stored response, so the uncommitted row holds a lock that makes concurrent
+duplicates of the same request wait for the original instead of running it
+a second time, and a key can never be committed without its write (or the
+write without its key).
+"""
+
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from src.app.models.idempotency_keys import IdempotencyKeys
+
+
+def claim_idempotency_key(
+    db: Session, user_id: int, key: str, fingerprint: str, ttl_seconds: int
+) -> Optional[Row]:
+    """
+    Claims a key for a new request, or returns the stored original.
+
+    An expired entry for the key is discarded first. If another transaction is
+    still processing the same key, this call blocks until it commits (then the
+    stored row is returned) or rolls back (then the key is claimed).
+
+    Args:
+        db (Session): The request's database session.
+        user_id (int): The ID of the user sending the request.
+        key (str): The client's idempotency key.
+        fingerprint (str): Digest of the endpoint and payload.
+        ttl_seconds (int): How long the stored response is kept.
+
+    Returns:
+        Row | None: None if the key was claimed, otherwise the stored row
+            (fingerprint, response status and body).
+    """
+    db.execute(
+        delete(IdempotencyKeys).where(
+            IdempotencyKeys.user_id == user_id,
+            IdempotencyKeys.key == key,
+            IdempotencyKeys.expires_at < func.now(),
+        )
+    )
+    claimed = db.execute(
+        insert(IdempotencyKeys)
+        .values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=func.now() + timedelta(seconds=ttl_seconds),
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKeys.key)
+    ).scalar()
+    if claimed is not None:
+        return None
+
+    return db.execute(
+        select(
+            IdempotencyKeys.fingerprint,
+            IdempotencyKeys.response_status,
+            IdempotencyKeys.response_body,
+        ).where(IdempotencyKeys.user_id == user_id, IdempotencyKeys.key == key)
+    ).one()
+
+
+def save_idempotent_response(
+    db: Session, user_id: int, key: str, status_code: int, body
+) -> None:
+    """
+    Stores the response of a request whose key was claimed in the session's
+    transaction. Not committed here.
+    """
+    db.execute(
+        update(IdempotencyKeys)
+        .where(IdempotencyKeys.user_id == user_id, IdempotencyKeys.key == key)
+        .values(response_status=status_code, response_body=body)
+    )
+
+
+def delete_expired_idempotency_keys(db: Session) -> int:
+    """
+    Deletes all expired keys.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        int: The number of keys deleted.
+    """
+    deleted = db.execute(
+        delete(IdempotencyKeys).where(IdempotencyKeys.expires_at < func.now())
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,270 @@
+"""
+CRUD Operations for Background Jobs.
+
+This module implements the PostgreSQL job queue: enqueueing jobs, letting
+workers claim them with `SELECT ... FOR UPDATE SKIP LOCKED` (so concurrent
+workers never block on or double-claim the same row), and recording success,
+retries and final failure.
+
+Files produced by jobs are stored in `job_files`, not in the job's `result`,
+so the queue rows that workers poll stay small.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+from typing import Optional, Union
+from sqlalchemy import func, or_, and_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.app.models.jobs import Jobs
+from src.app.models.job_files import JobFiles
+
+# A file produced by a job handler, returned instead of a JSON result
+JobFile = namedtuple("JobFile", ["filename", "content_type", "content", "rows"])
+
+# First key of the advisory locks serializing a user's job creation (any
+# constant not used by other advisory locks)
+JOB_CREATE_LOCK = 35
+
+
+def create_job(
+    db: Session,
+    user_id: int,
+    kind: str,
+    params: dict,
+    max_attempts: int,
+    max_active: int,
+) -> Optional[Jobs]:
+    """
+    Enqueues a new job, unless the user already has `max_active` unfinished
+    jobs.
+
+    The count and the insert run under a transaction-level advisory lock on
+    the user, so concurrent requests cannot all pass the check.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user the job runs for.
+        kind (str): The job type (a key of the handler registry).
+        params (dict): Handler-specific parameters.
+        max_attempts (int): How many times the job may run before it fails.
+        max_active (int): How many unfinished jobs the user may have.
+
+    Returns:
+        Jobs | None: The queued job, or None if the limit was reached.
+    """
+    db.execute(select(func.pg_advisory_xact_lock(JOB_CREATE_LOCK, user_id)))
+    if count_active_jobs(db, user_id) >= max_active:
+        db.rollback()
+        return None
+
+    db_job = Jobs(user_id=user_id, kind=kind, params=params, max_attempts=max_attempts)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_job(db: Session, job_id: int, user_id: int) -> Optional[Jobs]:
+    """
+    Retrieves a job by ID, ensuring ownership.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The ID of the job.
+        user_id (int): The ID of the user (for security check).
+
+    Returns:
+        Jobs | None: The job if found and owned by the user, otherwise None.
+    """
+    return db.query(Jobs).filter(Jobs.id == job_id, Jobs.user_id == user_id).first()
+
+
+def count_active_jobs(db: Session, user_id: int) -> int:
+    """
+    Counts a user's jobs that are queued or running.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+
+    Returns:
+        int: The number of unfinished jobs.
+    """
+    return (
+        db.query(func.count(Jobs.id))
+        .filter(Jobs.user_id == user_id, Jobs.status.in_(("queued", "running")))
+        .scalar()
+    )
+
+
+def claim_job(db: Session, worker_id: str, lease_seconds: int) -> Optional[Jobs]:
+    """
+    Claims the next runnable job for a worker.
+
+    A job is runnable if it is queued and due, or if it is running but its
+    previous worker's lease has expired. Rows locked by other workers are
+    skipped rather than waited on. An expired job that has used all its
+    attempts is marked failed instead of being run again.
+
+    Args:
+        db (Session): The database session.
+        worker_id (str): Identifier of the claiming worker.
+        lease_seconds (int): How long the worker may hold the job.
+
+    Returns:
+        Jobs | None: The claimed job, or None if nothing is runnable.
+    """
+    now = func.now()
+    while True:
+        job = (
+            db.query(Jobs)
+            .filter(
+                Jobs.status.in_(("queued", "running")),
+                Jobs.run_after <= now,
+                or_(
+                    Jobs.status == "queued",
+                    and_(Jobs.status == "running", Jobs.locked_until < now),
+                ),
+            )
+            .order_by(Jobs.run_after)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            db.rollback()
+            return None
+        if job.status == "queued" or job.attempts < job.max_attempts:
+            break
+
+        # The worker running its last attempt died or overran its lease
+        job.status = "failed"
+        job.error = "Lease expired during the last attempt"
+        job.locked_by = None
+        job.locked_until = None
+        job.finished_at = now
+        db.commit()
+
+    job.status = "running"
+    job.attempts = Jobs.attempts + 1
+    job.locked_by = worker_id
+    job.locked_until = now + timedelta(seconds=lease_seconds)
+    job.started_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def complete_job(
+    db: Session, job_id: int, worker_id: str, result: Union[dict, JobFile]
+) -> bool:
+    """
+    Marks a job as succeeded and stores its result.
+
+    The update only applies while the worker still holds the job, so a worker
+    whose lease expired cannot overwrite the outcome of a newer attempt. A
+    file is stored in `job_files` in the same transaction; the job's result
+    then describes it (name, content type, rows and size).
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The ID of the job.
+        worker_id (str): Identifier of the worker that ran the job.
+        result (dict | JobFile): JSON-serializable job result, or a file.
+
+    Returns:
+        bool: True if the job was updated.
+    """
+    file = None
+    if isinstance(result, JobFile):
+        file = result
+        result = {
+            "filename": file.filename,
+            "content_type": file.content_type,
+            "rows": file.rows,
+            "size": len(file.content),
+        }
+
+    updated = db.execute(
+        update(Jobs)
+        .where(Jobs.id == job_id, Jobs.locked_by == worker_id)
+        .values(
+            status="succeeded",
+            result=result,
+            error=None,
+            locked_by=None,
+            locked_until=None,
+            finished_at=func.now(),
+        )
+    ).rowcount
+    if updated and file is not None:
+        stmt = insert(JobFiles).values(job_id=job_id, content=file.content)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["job_id"], set_={"content": stmt.excluded.content}
+            )
+        )
+    db.commit()
+    return updated > 0
+
+
+def get_job_file(db: Session, job_id: int) -> Optional[bytes]:
+    """
+    Retrieves the file produced by a job (ownership is checked by the caller
+    through `get_job()`).
+
+    Returns:
+        bytes | None: The file content, or None if the job produced no file.
+    """
+    return db.scalar(select(JobFiles.content).where(JobFiles.job_id == job_id))
+
+
+def fail_job(
+    db: Session,
+    job_id: int,
+    worker_id: str,
+    error: str,
+    retry_backoff_seconds: int,
+    retry: bool = True,
+) -> bool:
+    """
+    Records a failed attempt, re-queueing the job if attempts remain.
+
+    Retries back off exponentially: `retry_backoff_seconds * 2 ** (attempts - 1)`.
+    Failures that another attempt cannot fix (e.g. invalid parameters) pass
+    `retry=False` to fail the job right away.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The ID of the job.
+        worker_id (str): Identifier of the worker that ran the job.
+        error (str): Description of the failure.
+        retry_backoff_seconds (int): Base delay before the next attempt.
+        retry (bool, optional): Whether attempts may remain. Defaults to True.
+
+    Returns:
+        bool: True if the job was updated.
+    """
+    job = (
+        db.query(Jobs)
+        .filter(Jobs.id == job_id, Jobs.locked_by == worker_id)
+        .with_for_update()
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return False
+
+    job.error = error
+    job.locked_by = None
+    job.locked_until = None
+    if retry and job.attempts < job.max_attempts:
+        job.status = "queued"
+        job.run_after = func.now() + timedelta(
+            seconds=retry_backoff_seconds * 2 ** (job.attempts - 1)
+        )
+    else:
+        job.status = "failed"
+        job.finished_at = func.now()
+    db.commit()
+    return True
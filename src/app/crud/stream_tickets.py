@@ -0,0 +1,75 @@
+"""
+CRUD Operations for Stream Tickets.
+
+Browsers' `EventSource` cannot send an Authorization header, so a client
+first exchanges its access token for a ticket and opens the event stream
+with `?ticket=`. Tickets live in the main database, expire quickly and are
+deleted when redeemed, so one showing up in a log or browser history cannot
+be used again.
+"""
+
+import hashlib
+import secrets
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+from src.app.models.stream_tickets import StreamTickets
+
+
+def _digest(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode("utf-8")).hexdigest()
+
+
+def create_stream_ticket(db: Session, user_id: int, ttl_seconds: int) -> str:
+    """
+    Issues a ticket for a user, purging the user's expired ones.
+
+    Args:
+        db (Session): A session on the main database.
+        user_id (int): The ID of the user.
+        ttl_seconds (int): How long the ticket can be redeemed.
+
+    Returns:
+        str: The ticket.
+    """
+    ticket = secrets.token_urlsafe(32)
+    db.execute(
+        delete(StreamTickets).where(
+            StreamTickets.user_id == user_id,
+            StreamTickets.expires_at < func.now(),
+        )
+    )
+    db.add(
+        StreamTickets(
+            ticket_hash=_digest(ticket),
+            user_id=user_id,
+            expires_at=func.now() + timedelta(seconds=ttl_seconds),
+        )
+    )
+    db.commit()
+    return ticket
+
+
+def redeem_stream_ticket(db: Session, ticket: str) -> Optional[int]:
+    """
+    Consumes a ticket. Of concurrent redemptions, only one succeeds.
+
+    Args:
+        db (Session): A session on the main database.
+        ticket (str): The ticket sent by the client.
+
+    Returns:
+        int | None: The ID of the ticket's user, or None if the ticket is
+            unknown, expired or already used.
+    """
+    user_id = db.execute(
+        delete(StreamTickets)
+        .where(
+            StreamTickets.ticket_hash == _digest(ticket),
+            StreamTickets.expires_at > func.now(),
+        )
+        .returning(StreamTickets.user_id)
+    ).scalar()
+    db.commit()
+    return user_id
@@ -0,0 +1,227 @@
+"""
+CRUD Operations for Delta Sync.
+
+Clients that cache a user's expenses and budgets offline catch up with
+`get_changes()` instead of downloading the lists again. Every write stamps
+the rows it touches with the user's next change version (see
+`adjust_user_counters()`), and deletions leave a tombstone carrying the
+version of the delete. A sync returns the rows and tombstones with versions
+after the client's cursor, so its cost grows with the number of changes,
+not with the user's history.
+
+Changes are ordered by `(row_version, kind, id)`, where the kind ranks
+expenses, budgets and tombstones; a cursor is the position of the last
+change a client received. Only versions up to the user's committed change
+version at the start of the sync are returned, so a change committed while
+the sync runs is never skipped past.
+
+Tombstones are deleted after `sync_tombstone_ttl_days`. Cursors from before
+the purged tombstones, like cursors from before a shard move, are expired:
+the client must then sync from scratch (without a cursor).
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import select, text, true, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.app.models.budgets import Budgets
+from src.app.models.expenses import Expenses
+from src.app.models.sync_tombstones import SyncTombstones
+from src.app.models.user_counters import UserCounters
+
+
+EXPENSE = "expense"
+BUDGET = "budget"
+
+# A position in a user's changes: (row_version, kind, id)
+Cursor = Tuple[int, int, int]
+
+# Kinds of changes, in the order they are returned within one version
+_KINDS = (
+    (Expenses, Expenses.id),
+    (Budgets, Budgets.id),
+    (SyncTombstones, SyncTombstones.id),
+)
+
+SyncChanges = namedtuple(
+    "SyncChanges", ["expenses", "budgets", "deleted", "cursor", "has_more"]
+)
+
+PURGE_TOMBSTONES = text(
+    """
+    WITH purged AS (
+        DELETE FROM sync_tombstones
+        WHERE deleted_at < :before
+        RETURNING user_id, row_version
+    ),
+    floors AS (
+        UPDATE user_counters AS c
+        SET sync_floor = greatest(c.sync_floor, p.row_version + 1)
+        FROM (
+            SELECT user_id, max(row_version) AS row_version
+            FROM purged
+            GROUP BY user_id
+        ) AS p
+        WHERE c.user_id = p.user_id
+    )
+    SELECT count(*) FROM purged
+    """
+)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    return ".".join(str(part) for part in cursor)
+
+
+def decode_cursor(value: str) -> Cursor:
+    """
+    Parses a cursor returned by an earlier sync.
+
+    Raises:
+        ValueError: If the value is not a cursor.
+    """
+    version, kind, record_id = (int(part) for part in value.split("."))
+    if version < 0 or not 0 <= kind <= len(_KINDS):
+        raise ValueError(f"Invalid sync cursor: {value!r}")
+    return version, kind, record_id
+
+
+def record_deletions(
+    db: Session, user_id: int, entity: str, record_ids: Iterable[int], version: int
+) -> None:
+    """
+    Records tombstones for deleted expenses or budgets. Not committed here.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        entity (str): `EXPENSE` or `BUDGET`.
+        record_ids (Iterable[int]): The IDs of the deleted rows.
+        version (int): The change version of the deleting transaction.
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "entity": entity,
+            "record_id": record_id,
+            "row_version": version,
+        }
+        for record_id in record_ids
+    ]
+    if rows:
+        db.execute(insert(SyncTombstones), rows)
+
+
+def _after(kind: int, cursor: Optional[Cursor]):
+    """
+    Builds the condition selecting rows of one kind positioned after `cursor`.
+    """
+    if cursor is None:
+        return true()
+    model, id_column = _KINDS[kind]
+    version, cursor_kind, record_id = cursor
+    if kind < cursor_kind:
+        return model.row_version > version
+    if kind > cursor_kind:
+        return model.row_version >= version
+    return tuple_(model.row_version, id_column) > tuple_(version, record_id)
+
+
+def get_changes(
+    db: Session, user_id: int, cursor: Optional[Cursor], limit: int = 500
+) -> Optional[SyncChanges]:
+    """
+    Retrieves a user's expense and budget changes after a cursor.
+
+    Each kind of change is read from its `(user_id, row_version, id)` index,
+    at most `limit + 1` rows each, and the first `limit` changes overall
+    are returned.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        cursor (Cursor, optional): Where the previous sync ended; None for a
+            full sync.
+        limit (int, optional): Maximum number of changes. Defaults to 500.
+
+    Returns:
+        SyncChanges | None: The changed expenses and budgets (current state),
+            the deleted records as `(entity, id)` pairs, the cursor to pass to
+            the next sync and whether more changes are waiting; None if the
+            cursor has expired.
+    """
+    state = db.execute(
+        select(UserCounters.change_version, UserCounters.sync_floor).where(
+            UserCounters.user_id == user_id
+        )
+    ).first()
+    current, floor = state if state is not None else (0, 0)
+    if cursor is not None and cursor[0] < floor:
+        return None
+
+    changes = []
+    for kind, (model, id_column) in enumerate(_KINDS):
+        rows = db.scalars(
+            select(model)
+            .where(
+                model.user_id == user_id,
+                model.row_version <= current,
+                _after(kind, cursor),
+            )
+            .order_by(model.row_version, id_column)
+            .limit(limit + 1)
+        )
+        changes.extend(((row.row_version, kind, row.id), row) for row in rows)
+    changes.sort(key=lambda change: change[0])
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        next_cursor = changes[-1][0]
+    else:
+        # Past everything up to the current version, including kinds that had
+        # no changes in it
+        next_cursor = (current, len(_KINDS), 0)
+
+    by_kind = [[], [], []]
+    for (_, kind, _), row in changes:
+        by_kind[kind].append(row)
+    return SyncChanges(
+        expenses=by_kind[0],
+        budgets=by_kind[1],
+        deleted=[(row.entity, row.record_id) for row in by_kind[2]],
+        cursor=next_cursor,
+        has_more=has_more,
+    )
+
+
+def reset_sync(db: Session, user_id: int) -> None:
+    """
+    Expires every sync cursor of a user, e.g. after their rows were given new
+    IDs on another shard. Not committed here.
+    """
+    stmt = insert(UserCounters).values(user_id=user_id, change_version=1, sync_floor=1)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "change_version": UserCounters.change_version + 1,
+                "sync_floor": UserCounters.change_version + 1,
+            },
+        )
+    )
+
+
+def purge_tombstones(db: Session, before: datetime) -> int:
+    """
+    Deletes tombstones recorded before `before` and expires the cursors that
+    still needed them.
+
+    Returns:
+        int: The number of tombstones deleted.
+    """
+    count = db.execute(PURGE_TOMBSTONES, {"before": before}).scalar()
+    db.commit()
+    return count
@@ -0,0 +1,92 @@
+"""
+CRUD Operations for User Counters.
+
+This module maintains the per-user expense and budget counts and change
+version. The expense and budget CRUD functions call `adjust_user_counters()`
+first thing in every write transaction, so the counts change together with
+the rows they count and the rows written get the new change version.
+"""
+
+from typing import Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.app.models.user_counters import UserCounters
+
+
+def adjust_user_counters(
+    db: Session, user_id: int, expenses: int = 0, budgets: int = 0
+) -> int:
+    """
+    Adds deltas to a user's expense and budget counts and advances the
+    user's change version.
+
+    The row is upserted atomically (`INSERT ... ON CONFLICT DO UPDATE`), so
+    concurrent writers cannot lose updates, and it stays locked until the
+    transaction ends, so the user's writes get their versions in commit order.
+    Writers take this lock before any other row lock (counters, then category
+    totals). The change is not committed here.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        expenses (int, optional): Change of the number of expenses.
+        budgets (int, optional): Change of the number of budgets.
+
+    Returns:
+        int: The new change version, to stamp on the rows being written.
+    """
+    stmt = insert(UserCounters).values(
+        user_id=user_id,
+        expense_count=expenses,
+        budget_count=budgets,
+        change_version=1,
+    )
+    return db.scalar(
+        stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "expense_count": UserCounters.expense_count
+                + stmt.excluded.expense_count,
+                "budget_count": UserCounters.budget_count + stmt.excluded.budget_count,
+                "change_version": UserCounters.change_version + 1,
+            },
+        ).returning(UserCounters.change_version)
+    )
+
+
+def lock_user_counters(db: Session, user_id: int) -> None:
+    """
+    Locks a user's counter row until the end of the transaction.
+
+    Updates and deletes take this lock before reading the row they change.
+    Every writer of a user's expenses and budgets holds it until it commits,
+    so what is read after it is current and stays so until the commit, and
+    the counter deltas are computed from it. A user without a counter row
+    has nothing to update or delete, so no lock is needed then.
+    """
+    db.execute(
+        select(UserCounters.user_id)
+        .where(UserCounters.user_id == user_id)
+        .with_for_update()
+    )
+
+
+def get_user_counts(db: Session, user_id: int) -> Tuple[int, int]:
+    """
+    Retrieves a user's number of expenses and budgets.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+
+    Returns:
+        Tuple[int, int]: The expense count and the budget count (zeros for a
+            user who never created either).
+    """
+    row = (
+        db.query(UserCounters.expense_count, UserCounters.budget_count)
+        .filter(UserCounters.user_id == user_id)
+        .first()
+    )
+    return (row.expense_count, row.budget_count) if row is not None else (0, 0)
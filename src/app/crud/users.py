@@ -2,14 +2,24 @@
 CRUD Operations for Users.
 
 This module contains functions to interact with the database for
-User-related operations such as retrieving user details by ID or email
-and creating new user records.
+User-related operations such as retrieving user details by ID or email,
+creating new user records and changing a user's timezone.
 """
 
+from sqlalchemy import Date, bindparam, cast, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from src.app.db.session import get_shard_session, shard_for_user
 from src.app.models.users import Users
+from src.app.models.expenses import Expenses
 from src.app.schemas.users import UserCreate
 from src.app.core.security import hash_password
+from src.app.crud import user_counters as crud_user_counters
+
+
+# Built once; the values are bound when the statement is executed
+USER_BY_EMAIL = select(Users).where(Users.email == bindparam("email"))
+USER_BY_ID = select(Users).where(Users.id == bindparam("user_id"))
 
 
 def get_user_by_email(db: Session, email: str):
@@ -23,7 +33,7 @@ def get_user_by_email(db: Session, email: str):
     Returns:
         Users | None: The user object if found, otherwise None.
     """
-    return db.query(Users).filter(Users.email == email).first()
+    return db.scalars(USER_BY_EMAIL, {"email": email}).first()
 
 
 def get_user_by_id(db: Session, user_id: int):
@@ -37,13 +47,20 @@ def get_user_by_id(db: Session, user_id: int):
     Returns:
         Users | None: The user object if found, otherwise None.
     """
-    return db.query(Users).filter(Users.id == user_id).first()
+    return db.scalars(USER_BY_ID, {"user_id": user_id}).first()
 
 
 def create_user(db: Session, user: UserCreate):
     """
     Creates a new user in the database with a hashed password.
 
+    The user is registered in the main database and placed on a shard. The
+    registration is committed first, since the main database is the
+    directory of all users; if the shard is another database, the user row
+    is then copied there. Should the copy fail, the registration is deleted
+    again, so no user is left registered on a shard that lacks its row (and
+    the email can sign up again).
+
     Args:
         db (Session): The database session.
         user (UserCreate): The user data schema containing email and password.
@@ -52,8 +69,94 @@ def create_user(db: Session, user: UserCreate):
         Users: The created user object.
     """
     hashed_pwd = hash_password(user.password)
-    db_user = Users(email=user.email, password=hashed_pwd)
+    db_user = Users(email=user.email, password=hashed_pwd, timezone=user.timezone)
     db.add(db_user)
+    db.flush()
+    db_user.shard = shard_for_user(db_user.id)
     db.commit()
+    if db_user.shard:
+        try:
+            copy_user_row(db, db_user.id, db_user.shard)
+        except Exception:
+            db.rollback()
+            db.execute(delete(Users).where(Users.id == db_user.id))
+            db.commit()
+            raise
     db.refresh(db_user)
     return db_user
+
+
+def copy_user_row(db: Session, user_id: int, shard: int) -> None:
+    """
+    Copies a user's directory row to a shard, if it is not there yet, so it
+    can be re-run after a failure.
+
+    Args:
+        db (Session): A session on the main database.
+        user_id (int): The ID of the user.
+        shard (int): The shard to copy the row to (not 0).
+    """
+    row = db.execute(select(Users.__table__).where(Users.id == user_id)).one()
+    shard_db = get_shard_session(shard)
+    try:
+        shard_db.execute(
+            insert(Users.__table__)
+            .values(**{**row._mapping, "shard": shard})
+            .on_conflict_do_nothing(index_elements=["id"])
+        )
+        shard_db.commit()
+    finally:
+        shard_db.close()
+
+
+def set_user_timezone(db: Session, user: Users, timezone: str) -> Users:
+    """
+    Changes a user's timezone and re-buckets their expenses into it.
+
+    The main database's directory row, the source of truth, is updated
+    first, in its own transaction. The user row on the user's shard is then
+    brought in line and, only if its timezone changed there, the
+    `local_date` of every hot expense is recomputed in the same transaction.
+    Both steps are no-ops when already applied, so if the shard step fails,
+    calling this again with the same timezone re-applies it (the profile
+    endpoint calls it on every update). For users on the main database the
+    two steps are one transaction. Archived monthly totals keep the months
+    they were archived in. The expenses get a new change version, so synced
+    clients refetch them.
+
+    Args:
+        db (Session): The request's session, routed to the user's shard.
+        user (Users): The user.
+        timezone (str): The new IANA timezone name.
+
+    Returns:
+        Users: The user, with the new timezone.
+    """
+    set_timezone = (
+        update(Users)
+        .where(Users.id == user.id, Users.timezone != timezone)
+        .values(timezone=timezone)
+    )
+    if user.shard:
+        directory = get_shard_session(0)
+        try:
+            directory.execute(set_timezone)
+            directory.commit()
+        finally:
+            directory.close()
+
+    changed = db.execute(set_timezone.returning(Users.id)).first() is not None
+    if changed:
+        version = crud_user_counters.adjust_user_counters(db, user.id)
+        db.execute(
+            update(Expenses)
+            .where(Expenses.user_id == user.id)
+            .values(
+                local_date=cast(func.timezone(timezone, Expenses.date), Date),
+                row_version=version,
+            )
+        )
+    db.commit()
+
+    user.timezone = timezone
+    return user
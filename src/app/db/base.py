@@ -1,12 +1,23 @@
 """
 SQLAlchemy Model Registry.
 
-This module imports all the database models (Users, Expenses, Budgets) and the Base class.
-Its primary purpose is to be imported by Alembic's `env.py` so that migrations can
-detect all the models and their relationships automatically.
+This module imports all the database models (Users, UserCounters, Categories,
+CategoryTotals, Expenses, ExpenseArchive, MonthlyTotals, Budgets, Jobs,
+JobFiles, IdempotencyKeys, SyncTombstones, StreamTickets) and the Base
+class. Its primary purpose is to be imported by Alembic's `env.py` so that
+migrations can detect all the models and their relationships automatically.
 """
 
 from src.app.db.session import Base
 from src.app.models.users import Users
+from src.app.models.user_counters import UserCounters
+from src.app.models.categories import Categories
+from src.app.models.category_totals import CategoryTotals
 from src.app.models.expenses import Expenses
+from src.app.models.expense_archive import ExpenseArchive, MonthlyTotals
 from src.app.models.budgets import Budgets
+from src.app.models.jobs import Jobs
+from src.app.models.job_files import JobFiles
+from src.app.models.idempotency_keys import IdempotencyKeys
+from src.app.models.sync_tombstones import SyncTombstones
+from src.app.models.stream_tickets import StreamTickets
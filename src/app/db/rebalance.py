@@ -0,0 +1,186 @@
+"""
+Shard Rebalancing Tool.
+
+This module moves a user's data from one shard to another:
+
+1. The user's rows are copied to the target shard in one transaction.
+   Expenses and budgets get new IDs there, because every shard numbers its
+   rows independently, and so do archived expenses (the `ids` arrays of the
+   expense archive), so that they stay unique among the user's expenses on
+   the target; all other tables are keyed by the user and copied as they
+   are.
+2. The user's placement in the main database's directory is switched.
+3. The rows are deleted from the source shard, together with the user's
+   idempotency keys, jobs and sync tombstones, which are not moved.
+
+While the copy runs, the user's counter rows on the source shard are locked,
+which holds back expense and budget creation and deletion. Other writes made
+during the move may be lost, so move users while they are inactive. Clients
+caching expense or budget IDs must re-download their data afterwards; their
+sync cursors are expired so that delta sync tells them to.
+
+Run it with `python -m src.app.db.rebalance --user ID --to SHARD`.
+"""
+
+import argparse
+import logging
+from typing import List
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from src.app.db.base import Base
+from src.app.db.session import get_shard_session, shard_count
+from src.app.crud import sync as crud_sync
+from src.app.crud import users as crud_users
+from src.app.models.users import Users
+
+
+logger = logging.getLogger(__name__)
+
+# Tables holding a user's data, parents before children
+USER_TABLES = (
+    "categories",
+    "category_totals",
+    "user_counters",
+    "monthly_totals",
+    "expense_archive",
+    "expenses",
+    "budgets",
+)
+# Tables whose serial `id` is assigned anew on the target shard
+REKEYED_TABLES = {"expenses", "budgets"}
+# Array columns of expense IDs, drawn anew from the target's expense IDs
+REKEYED_ARRAYS = {"expense_archive": "ids"}
+# Short-lived per-user rows that are dropped instead of moved
+DROPPED_TABLES = ("idempotency_keys", "jobs", "sync_tombstones")
+
+
+def _delete_user_rows(db: Session, user_id: int, tables) -> None:
+    for name in reversed(tables):
+        table = Base.metadata.tables[name]
+        db.execute(delete(table).where(table.c.user_id == user_id))
+
+
+def _new_expense_ids(target: Session, count: int) -> List[int]:
+    """
+    Allocates `count` expense IDs from the target shard's sequence.
+    """
+    return list(
+        target.execute(
+            select(
+                func.nextval(func.pg_get_serial_sequence("expenses", "id"))
+            ).select_from(func.generate_series(1, count))
+        ).scalars()
+    )
+
+
+def _copy_user_rows(source: Session, target: Session, user_id: int) -> int:
+    """
+    Copies the user's rows table by table; returns the number of rows copied.
+    """
+    copied = 0
+    for name in USER_TABLES:
+        table = Base.metadata.tables[name]
+        columns = [
+            c
+            for c in table.c
+            if c.computed is None and not (name in REKEYED_TABLES and c.name == "id")
+        ]
+        rows = source.execute(
+            select(*columns).where(table.c.user_id == user_id)
+        ).mappings()
+        batch = [dict(row) for row in rows]
+        ids = REKEYED_ARRAYS.get(name)
+        if ids:
+            for row in batch:
+                row[ids] = _new_expense_ids(target, len(row[ids]))
+        if batch:
+            target.execute(insert(table), batch)
+            copied += len(batch)
+    return copied
+
+
+def move_user(user_id: int, target_shard: int) -> int:
+    """
+    Moves a user's data to another shard.
+
+    Args:
+        user_id (int): The ID of the user.
+        target_shard (int): The shard to move the user to.
+
+    Returns:
+        int: The number of rows moved (0 if the user already was there).
+
+    Raises:
+        ValueError: If the user or the shard does not exist.
+    """
+    if not 0 <= target_shard < shard_count():
+        raise ValueError(f"Shard {target_shard} is not configured")
+
+    directory = get_shard_session(0)
+    try:
+        user = (
+            directory.query(Users).filter(Users.id == user_id).with_for_update().first()
+        )
+        if user is None:
+            raise ValueError(f"User {user_id} does not exist")
+        source_shard = user.shard
+        if source_shard == target_shard:
+            return 0
+
+        source = get_shard_session(source_shard)
+        target = get_shard_session(target_shard)
+        try:
+            for name in ("user_counters", "category_totals"):
+                table = Base.metadata.tables[name]
+                source.execute(
+                    select(table.c.user_id)
+                    .where(table.c.user_id == user_id)
+                    .with_for_update()
+                )
+
+            if target_shard:
+                crud_users.copy_user_row(directory, user_id, target_shard)
+            # Leftovers of an interrupted earlier move are replaced
+            _delete_user_rows(target, user_id, USER_TABLES)
+            copied = _copy_user_rows(source, target, user_id)
+            crud_sync.reset_sync(target, user_id)
+            target.commit()
+
+            user.shard = target_shard
+            directory.commit()
+
+            _delete_user_rows(source, user_id, DROPPED_TABLES + USER_TABLES)
+            if source_shard:
+                source.execute(delete(Users).where(Users.id == user_id))
+            source.commit()
+        finally:
+            source.close()
+            target.close()
+
+        logger.info(
+            "Moved user %s from shard %s to shard %s (%d rows)",
+            user_id,
+            source_shard,
+            target_shard,
+            copied,
+        )
+        return copied
+    finally:
+        directory.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move a user to another shard.")
+    parser.add_argument("--user", type=int, required=True, help="The user's ID.")
+    parser.add_argument("--to", type=int, required=True, help="The target shard.")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    move_user(args.user, args.to)
+
+
+if __name__ == "__main__":
+    main()
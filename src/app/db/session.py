@@ -4,23 +4,165 @@ Database Session Management.
 This module sets up the SQLAlchemy engine and session factory.
 It provides the `get_db` dependency used by FastAPI endpoints to obtain
 a database session for each request and ensure it closes afterwards.
+
+The engine (and its connection pool) is created lazily on first use rather
+than at import time. Under a pre-forking server this means every worker
+builds its own pool after the fork instead of inheriting sockets from the
+master process.
+
+User data can be sharded across several PostgreSQL databases. Shard 0 is the
+main database (`database_*` settings); `database_shard_urls` adds shards 1
+to N-1, each with the full schema. Every user is registered in the main
+database's `users` table, whose `shard` column says where the user's data
+lives; new users are placed with `shard_for_user()`. Requests start on the
+main database and `route_session()` moves them to the user's shard once the
+user is authenticated. `python -m src.app.db.rebalance` moves a user.
 """
 
+import threading
+from typing import Dict
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-from src.app.core.config import settings
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from src.app.core.config import get_settings
 
 
-SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.database_user}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}"
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+Base = declarative_base()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_engines: Dict[int, Engine] = {}
+_engine_lock = threading.Lock()
 
-Base = declarative_base()
+
+def get_database_url(driver: str = "postgresql") -> str:
+    settings = get_settings()
+    return f"{driver}://{settings.database_user}:{settings.database_password}@{settings.database_host}:{settings.database_port}/{settings.database_name}"
+
+
+def shard_count() -> int:
+    return 1 + len(get_settings().database_shard_urls)
+
+
+def shard_for_user(user_id: int) -> int:
+    """
+    Returns the shard a new user is placed on.
+
+    The mapping only depends on the user ID and the number of shards, so new
+    users spread evenly. The placement is then stored on the user, so adding
+    shards later does not move existing users.
+    """
+    return user_id % shard_count()
+
+
+def get_engine(shard: int = 0) -> Engine:
+    """
+    Returns the process-wide engine of a shard, creating it on first use.
+
+    Creating the main database's engine (shard 0) also binds `SessionLocal`.
+    """
+    engine = _engines.get(shard)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(shard)
+            if engine is None:
+                settings = get_settings()
+                url = (
+                    get_database_url()
+                    if shard == 0
+                    else settings.database_shard_urls[shard - 1]
+                )
+                engine = create_engine(
+                    url,
+                    pool_size=settings.db_pool_size,
+                    max_overflow=settings.db_max_overflow,
+                    pool_timeout=settings.db_pool_timeout,
+                    pool_recycle=settings.db_pool_recycle,
+                    pool_pre_ping=True,
+                )
+                if shard == 0:
+                    SessionLocal.configure(bind=engine)
+                _engines[shard] = engine
+    return engine
+
+
+def get_shard_session(shard: int) -> Session:
+    """
+    Opens a session on a shard's database. The caller must close it.
+    """
+    return SessionLocal(bind=get_engine(shard))
+
+
+def route_session(db: Session, shard: int) -> None:
+    """
+    Points a request's session at the shard holding the user's data.
+
+    Does nothing for users on the main database. Otherwise the session's
+    current transaction is closed (objects already loaded stay usable) and
+    its following queries run on the shard.
+    """
+    if shard == 0:
+        return
+    engine = get_engine(shard)
+    if db.get_bind() is not engine:
+        db.close()
+        db.bind = engine
+
+
+def connect_unpooled():
+    """
+    Opens a DBAPI connection to the main database outside the pool, for
+    long-lived uses (e.g. LISTEN) that must not hold a pooled connection.
+    The caller must close it.
+    """
+    return get_engine().dialect.dbapi.connect(get_database_url())
+
+
+def warm_pool(connections: int) -> None:
+    """
+    Opens up to `connections` pooled connections ahead of the first request.
+    """
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+def pool_utilization() -> float:
+    """
+    Returns the fraction of the busiest pool's connections (including
+    overflow) that are currently checked out, or 0.0 if no engine has been
+    created yet.
+    """
+    settings = get_settings()
+    capacity = settings.db_pool_size + max(settings.db_max_overflow, 0)
+    if not capacity:
+        return 0.0
+    checked_out = [engine.pool.checkedout() for engine in list(_engines.values())]
+    return max(checked_out, default=0) / capacity
+
+
+def dispose_engine(close: bool = True) -> None:
+    """
+    Discards every shard's engine and pool.
+
+    Pass `close=False` in a freshly forked child to drop inherited connections
+    without closing the parent's sockets.
+    """
+    with _engine_lock:
+        for engine in _engines.values():
+            engine.dispose(close=close)
+        _engines.clear()
 
 
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
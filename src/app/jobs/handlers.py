@@ -0,0 +1,115 @@
+"""
+Background Job Handlers.
+
+This module defines what each job kind does. A handler receives a database
+session, the owning user's ID and the job's `params`, validated with the
+kind's schema (see `JOB_PARAMS`), and returns a JSON-serializable result
+that is stored on the job row, or a `JobFile` that is stored apart from it.
+
+Handlers run inside a worker process, so they may take longer than a request
+is allowed to: full CSV exports and multi-year analytics. Both cover
+archived expenses as well.
+"""
+
+import csv
+import io
+from typing import Callable, Dict, Union
+from pydantic import BaseModel
+from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+from src.app.crud import archive as crud_archive
+from src.app.crud import categories as crud_categories
+from src.app.crud.jobs import JobFile
+from src.app.schemas.jobs import CategoryBreakdownParams, ExportExpensesParams
+
+
+def export_expenses(db: Session, user_id: int, params: ExportExpensesParams) -> JobFile:
+    """
+    Exports the user's expenses as CSV.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        params (ExportExpensesParams): Optional `start` and `end` days in the
+            user's timezone (`end` exclusive).
+
+    Returns:
+        JobFile: The CSV file and its row count.
+    """
+    expenses = crud_archive.expense_rows(user_id, since=params.start)
+    query = db.query(expenses)
+    if params.end:
+        query = query.filter(expenses.c.local_date < params.end)
+
+    names = crud_categories.get_category_names(db, user_id)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "date", "category", "description", "amount"])
+    rows = 0
+    for expense in query.order_by(expenses.c.date, expenses.c.id).yield_per(1000):
+        if expense.category_id not in names:
+            names = crud_categories.get_category_names(
+                db, user_id, required_ids=[expense.category_id]
+            )
+        writer.writerow(
+            [
+                expense.id,
+                expense.date.isoformat(),
+                names[expense.category_id],
+                expense.description,
+                str(expense.amount),
+            ]
+        )
+        rows += 1
+
+    return JobFile(
+        filename=f"expenses-{user_id}.csv",
+        content_type="text/csv",
+        content=buffer.getvalue().encode("utf-8"),
+        rows=rows,
+    )
+
+
+def category_breakdown(
+    db: Session, user_id: int, params: CategoryBreakdownParams
+) -> dict:
+    """
+    Computes per-category spending for every year in a range.
+
+    Args:
+        db (Session): The database session.
+        user_id (int): The ID of the user.
+        params (CategoryBreakdownParams): Optional `start_year` and
+            `end_year` (inclusive).
+
+    Returns:
+        dict: A mapping of year to a list of `{category, total}` entries.
+    """
+    spending = crud_archive.spending_rows(user_id)
+    year = extract("year", spending.c.local_date)
+    query = db.query(
+        spending.c.category_id,
+        year.label("year"),
+        func.sum(spending.c.amount).label("total"),
+    )
+    if params.start_year:
+        query = query.filter(year >= params.start_year)
+    if params.end_year:
+        query = query.filter(year <= params.end_year)
+
+    rows = query.group_by(spending.c.category_id, year).all()
+    names = crud_categories.get_category_names(
+        db, user_id, required_ids={r.category_id for r in rows}
+    )
+    years: Dict[str, list] = {}
+    for row in sorted(rows, key=lambda r: (r.year, -r.total)):
+        years.setdefault(str(int(row.year)), []).append(
+            {"category": names[row.category_id], "total": str(row.total)}
+        )
+    return {"years": years}
+
+
+JOB_HANDLERS: Dict[str, Callable[[Session, int, BaseModel], Union[dict, JobFile]]] = {
+    "export_expenses": export_expenses,
+    "category_breakdown": category_breakdown,
+}
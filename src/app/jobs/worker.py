@@ -0,0 +1,225 @@
+"""
+Background Job Worker.
+
+This module runs queued jobs outside the web process. Each worker thread
+loops: claim the next runnable job (`FOR UPDATE SKIP LOCKED`, so any number of
+threads and processes can poll the same table), run its handler, then store
+the result or record the failure for a later retry.
+
+Concurrency is bounded by the number of threads per process
+(`job_worker_concurrency`) and by the number of worker processes started.
+Only PostgreSQL is needed; there is no separate broker. Jobs are stored on
+their user's shard, and every thread polls all shards in turn.
+
+The main thread also does periodic housekeeping: deleting expired
+idempotency keys and sync tombstones, and moving expenses older than
+`archive_after_months` to the expense archive.
+
+Run it with `python -m src.app.jobs.worker [--concurrency N]`.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from src.app.core.config import get_settings
+from src.app.crud import archive as crud_archive
+from src.app.crud import jobs as crud_jobs
+from src.app.crud import idempotency as crud_idempotency
+from src.app.crud import sync as crud_sync
+from src.app.db.session import get_engine, get_shard_session, shard_count
+from src.app.jobs.handlers import JOB_HANDLERS
+from src.app.schemas.jobs import JOB_PARAMS
+
+
+logger = logging.getLogger(__name__)
+
+HOUSEKEEPING_INTERVAL_SECONDS = 3600
+
+
+def run_once(worker_id: str, shard: int = 0) -> bool:
+    """
+    Claims and runs a single job.
+
+    Args:
+        worker_id (str): Identifier recorded on the claimed job.
+        shard (int, optional): The shard whose queue is polled. Defaults to 0.
+
+    Returns:
+        bool: True if a job was run, False if the queue had nothing runnable.
+    """
+    settings = get_settings()
+    db = get_shard_session(shard)
+    try:
+        job = crud_jobs.claim_job(db, worker_id, settings.job_lease_seconds)
+        if job is None:
+            return False
+
+        job_id, kind = job.id, job.kind
+        logger.info("%s: running job %s (%s)", worker_id, job_id, kind)
+        try:
+            handler = JOB_HANDLERS[kind]
+            params = JOB_PARAMS[kind].model_validate(job.params or {})
+        except (KeyError, ValidationError) as exc:
+            # Another attempt would fail the same way
+            logger.error("%s: job %s is invalid: %s", worker_id, job_id, exc)
+            crud_jobs.fail_job(
+                db,
+                job_id,
+                worker_id,
+                f"{type(exc).__name__}: {exc}",
+                settings.job_retry_backoff_seconds,
+                retry=False,
+            )
+            return True
+
+        try:
+            result = handler(db, job.user_id, params)
+        except Exception as exc:
+            db.rollback()
+            logger.exception("%s: job %s failed", worker_id, job_id)
+            crud_jobs.fail_job(
+                db,
+                job_id,
+                worker_id,
+                f"{type(exc).__name__}: {exc}",
+                settings.job_retry_backoff_seconds,
+            )
+        else:
+            # End the handler's read transaction before recording the result
+            db.rollback()
+            if not crud_jobs.complete_job(db, job_id, worker_id, result):
+                logger.warning("%s: lost the lease on job %s", worker_id, job_id)
+        return True
+    finally:
+        db.close()
+
+
+def work(worker_id: str, stop: threading.Event) -> None:
+    """
+    Runs jobs until `stop` is set, sleeping between polls of an empty queue.
+    """
+    poll_interval = get_settings().job_poll_interval_seconds
+    while not stop.is_set():
+        ran = False
+        for shard in range(shard_count()):
+            try:
+                ran = run_once(worker_id, shard) or ran
+            except Exception:
+                logger.exception(
+                    "%s: could not poll the job queue of shard %s", worker_id, shard
+                )
+        if not ran:
+            stop.wait(poll_interval)
+
+
+def archive_horizon(months: int, now: Optional[datetime] = None) -> date:
+    """
+    Returns the start of the month `months` months ago, as a local date.
+
+    Expenses are archived by their `local_date`, so the month is taken from
+    the UTC date one day ago: by then every timezone has entered the current
+    month, and the horizon never moves while it is still the previous month
+    somewhere (nor depends on the server's timezone).
+    """
+    today = ((now or datetime.now(timezone.utc)) - timedelta(days=1)).date()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+
+def archive_old_expenses(db: Session, months: int) -> int:
+    """
+    Archives every user's expenses dated before `archive_horizon(months)`,
+    one user per transaction.
+
+    Returns:
+        int: The number of expenses archived.
+    """
+    before = archive_horizon(months)
+
+    archived = 0
+    after = 0
+    while True:
+        user_ids = crud_archive.get_users_to_archive(db, before, after)
+        if not user_ids:
+            return archived
+        for user_id in user_ids:
+            archived += crud_archive.archive_expenses(db, user_id, before)
+        after = user_ids[-1]
+
+
+def housekeeping(shard: int = 0) -> None:
+    """
+    Deletes expired rows that requests no longer need and archives old
+    expenses on one shard.
+    """
+    db = get_shard_session(shard)
+    try:
+        deleted = crud_idempotency.delete_expired_idempotency_keys(db)
+        logger.info("Shard %s: deleted %d expired idempotency keys", shard, deleted)
+
+        ttl = timedelta(days=get_settings().sync_tombstone_ttl_days)
+        purged = crud_sync.purge_tombstones(db, datetime.now(timezone.utc) - ttl)
+        logger.info("Shard %s: deleted %d expired sync tombstones", shard, purged)
+
+        months = get_settings().archive_after_months
+        if months > 0:
+            archived = archive_old_expenses(db, months)
+            logger.info("Shard %s: archived %d expenses", shard, archived)
+    except Exception:
+        db.rollback()
+        logger.exception("Housekeeping failed on shard %s", shard)
+    finally:
+        db.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run CozyCash background jobs.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.job_worker_concurrency,
+        help="Number of jobs this process runs at the same time.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    get_engine()
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=work, args=(f"{prefix}:{index}", stop), daemon=True)
+        for index in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("Started %d job worker threads", len(threads))
+
+    # Wait on the event (not join) so the main thread keeps handling signals;
+    # running jobs are then allowed to finish before exiting.
+    next_housekeeping = time.monotonic()
+    while not stop.wait(1):
+        if time.monotonic() >= next_housekeeping:
+            for shard in range(shard_count()):
+                housekeeping(shard)
+            next_housekeeping = time.monotonic() + HOUSEKEEPING_INTERVAL_SECONDS
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,239 @@
 """
 Main Application Entry Point.
 
-This module initializes the FastAPI application, configures global settings,
-middleware (CORS), static file serving, and template rendering. It also mounts
-the API routers and defines the endpoints for serving HTML frontend pages.
+This module builds the FastAPI application through the `create_app()` factory,
+configuring global settings, middleware (CORS), static file serving, and template
+rendering. It also mounts the API routers and defines the endpoints for serving
+HTML frontend pages.
+
+Nothing expensive happens at import time, and the settings are not read then:
+importing this module (which builds the module-level `app`) needs no
+environment. Settings are resolved, and resources set up, when the
+application starts in each worker process, after any pre-fork:
+    * the database pool is created and warmed up,
+    * the change event broker is chosen and started,
+    * the static assets are fingerprinted and precompressed,
+    * the templates are compiled and the (request-independent) pages rendered.
+
+Run it with `uvicorn src.app.main:app` (or `uvicorn src.app.main:create_app
+--factory`), or with gunicorn using the provided `gunicorn.conf.py`, which
+builds its application through the factory.
 """
 
-from fastapi import FastAPI, Request
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
 from src.app.api.v1.api import api_router
-from src.app.core.config import settings
+from src.app.core.assets import AssetRegistry
+from src.app.core.config import API_V1_STR, get_settings
+from src.app.core.events import create_event_broker, get_event_broker, set_event_broker
+from src.app.core.load_shedding import LoadSheddingMiddleware, record_queue_wait
+from src.app.db import session
 
 
-app = FastAPI(
-    title="CozyCash API",
-    description="""
-A modern, clean-architecture based API for expense tracking and budget management.
-        
-## Features
-* **Authentication**: Secure login/signup with JWT tokens.
-* **Expenses**: Track daily spending with categories and detailed descriptions.
-* **Budgets**: Set monthly limits per category to maintain financial health.
-* **Analytics**: Real-time dashboard with trend charts and category breakdowns.
-        
-Built with **FastAPI**, **SQLAlchemy**, and **PostgreSQL**.
-""",
-    version="1.0.0",
-    openapi_url=f"{settings.api_v1_str}/openapi.json",
-    docs_url=f"{settings.api_v1_str}/docs",
-)
-
-# CORS Configuration
-# Restricts requests to allowed origins to prevent unauthorized browser access.
-origins = [
-    "http://localhost:3000",
-    "http://127.0.0.1:3000",
-    "http://localhost:5500",
-]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Mount Static Files (CSS, JS, Images)
-app.mount("/static", StaticFiles(directory="src/static"), name="static")
-
-# Configure Template Engine (Jinja2) for HTML rendering
-templates = Jinja2Templates(directory="src/templates")
-
-# Include API Router (all endpoints under /api/v1)
-app.include_router(api_router, prefix="/api/v1")
-
-
-@app.get("/", response_class=HTMLResponse)
+logger = logging.getLogger("uvicorn.error")
+
+_IMPORTED_AT = time.perf_counter()
+
+PAGES = ("index.html", "auth.html", "dashboard.html", "expenses.html", "budgets.html")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates per-process resources on startup and releases them on shutdown.
+
+    Startup time is logged and kept in `app.state.cold_start` (milliseconds
+    since this module was imported and spent inside this hook).
+    """
+    started = time.perf_counter()
+    settings = get_settings()
+
+    # Fingerprint assets, then compile templates and pre-render the pages
+    app.state.assets.build()
+    templates: Jinja2Templates = app.state.templates
+    app.state.pages = {
+        name: templates.get_template(name).render().encode("utf-8") for name in PAGES
+    }
+
+    try:
+        await run_in_threadpool(session.warm_pool, settings.db_pool_warm_connections)
+    except Exception as exc:
+        logger.warning("Could not warm up the database pool: %s", exc)
+
+    # Several workers need a shared broker for events to reach every stream
+    broker = create_event_broker(
+        settings.event_broker,
+        int(os.getenv("WEB_CONCURRENCY", "1")),
+        session.connect_unpooled,
+        session.get_engine,
+    )
+    broker.start()
+    set_event_broker(broker)
+
+    ready = time.perf_counter()
+    app.state.cold_start = {
+        "since_import_ms": round((ready - _IMPORTED_AT) * 1000, 1),
+        "lifespan_ms": round((ready - started) * 1000, 1),
+    }
+    logger.info(
+        "Startup complete in %.1f ms (%.1f ms since import)",
+        app.state.cold_start["lifespan_ms"],
+        app.state.cold_start["since_import_ms"],
+    )
+
+    yield
+
+    await run_in_threadpool(get_event_broker().close)
+    session.dispose_engine()
+
+
+pages_router = APIRouter()
+
+
+@pages_router.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """
     Serves the Landing Page (Home).
     """
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(request.app.state.pages["index.html"])
 
 
-@app.get("/auth", response_class=HTMLResponse)
+@pages_router.get("/auth", response_class=HTMLResponse)
 async def auth_page(request: Request):
     """
     Serves the Authentication Page (Login/Signup).
     """
-    return templates.TemplateResponse("auth.html", {"request": request})
+    return HTMLResponse(request.app.state.pages["auth.html"])
 
 
-@app.get("/dashboard", response_class=HTMLResponse)
+@pages_router.get("/dashboard", response_class=HTMLResponse)
 async def dashboard_page(request: Request):
     """
     Serves the Main Dashboard Page.
     Displays summary cards, charts, and recent activity.
     """
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return HTMLResponse(request.app.state.pages["dashboard.html"])
 
 
-@app.get("/expenses", response_class=HTMLResponse)
+@pages_router.get("/expenses", response_class=HTMLResponse)
 async def expenses_page(request: Request):
     """
     Serves the Expenses Management Page.
     Allows users to view, add, edit, and delete expenses.
     """
-    return templates.TemplateResponse("expenses.html", {"request": request})
+    return HTMLResponse(request.app.state.pages["expenses.html"])
 
 
-@app.get("/budgets", response_class=HTMLResponse)
+@pages_router.get("/budgets", response_class=HTMLResponse)
 async def budgets_page(request: Request):
     """
     Serves the Budgets Management Page.
     Allows users to set and track spending limits.
     """
-    return templates.TemplateResponse("budgets.html", {"request": request})
+    return HTMLResponse(request.app.state.pages["budgets.html"])
+
+
+def _load_shedding(app: ASGIApp) -> ASGIApp:
+    """
+    Wraps `app` in the load shedding middleware configured by the settings.
+
+    Called when the middleware stack is built, as the application starts, so
+    the settings are read in the worker and not at import time.
+    """
+    settings = get_settings()
+    if not settings.shed_enabled:
+        return app
+    return LoadSheddingMiddleware(
+        app,
+        low_priority_prefixes=settings.shed_low_priority_prefixes,
+        max_in_flight=settings.shed_max_in_flight,
+        max_pool_utilization=settings.shed_max_pool_utilization,
+        max_threadpool_queue=settings.shed_max_threadpool_queue,
+        retry_after_seconds=settings.shed_retry_after_seconds,
+        pool_utilization=session.pool_utilization,
+        untracked_prefixes=settings.shed_untracked_prefixes,
+        max_queue_wait=settings.shed_max_queue_wait_ms / 1000,
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Builds and configures the FastAPI application. The settings are not read
+    here; see `lifespan()` and `_load_shedding()`.
+
+    Returns:
+        FastAPI: The application, with its resources created by `lifespan`.
+    """
+    app = FastAPI(
+        title="CozyCash API",
+        description="""
+A modern, clean-architecture based API for expense tracking and budget management.
+
+## Features
+* **Authentication**: Secure login/signup with JWT tokens.
+* **Expenses**: Track daily spending with categories and detailed descriptions.
+* **Budgets**: Set monthly limits per category to maintain financial health.
+* **Analytics**: Real-time dashboard with trend charts and category breakdowns.
+
+Built with **FastAPI**, **SQLAlchemy**, and **PostgreSQL**.
+""",
+        version="1.0.0",
+        openapi_url=f"{API_V1_STR}/openapi.json",
+        docs_url=f"{API_V1_STR}/docs",
+        lifespan=lifespan,
+    )
+
+    # CORS Configuration
+    # Restricts requests to allowed origins to prevent unauthorized browser access.
+    origins = [
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        "http://localhost:5500",
+    ]
+    # Admission control: shed low-priority routes when this worker is saturated.
+    # Added before CORS so that 503 responses still carry CORS headers.
+    app.add_middleware(_load_shedding)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Total-Count", "X-Total-Count-Estimated"],
+    )
+
+    # Mount Static Files (CSS, JS, Images)
+    app.mount("/static", StaticFiles(directory="src/static"), name="static")
+
+    # Fingerprinted, precompressed copies of the static files, cached immutably
+    assets = AssetRegistry(directory="src/static", url_prefix="/assets")
+    app.state.assets = assets
+    app.mount("/assets", assets, name="assets")
+
+    # Configure Template Engine (Jinja2) for HTML rendering
+    templates = Jinja2Templates(directory="src/templates")
+    templates.env.globals["asset_url"] = assets.url
+    app.state.templates = templates
+
+    # Include API Router (all endpoints under /api/v1)
+    app.include_router(
+        api_router, prefix=API_V1_STR, dependencies=[Depends(record_queue_wait)]
+    )
+    app.include_router(pages_router)
+
+    return app
+
+
+# Module-level application for `uvicorn src.app.main:app`; building it is
+# cheap and reads no settings
+app = create_app()
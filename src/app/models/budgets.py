@@ -7,14 +7,22 @@ for specific categories and months.
 
 from sqlalchemy import (
     Column,
-    String,
     Integer,
+    BigInteger,
+    SmallInteger,
     DATE,
+    TIMESTAMP,
     Numeric,
+    Boolean,
     ForeignKey,
+    ForeignKeyConstraint,
     UniqueConstraint,
+    Index,
+    text,
 )
+from sqlalchemy.orm import relationship
 from src.app.db.session import Base
+from src.app.models.categories import Categories
 
 
 class Budgets(Base):
@@ -23,6 +31,12 @@ class Budgets(Base):
 
     Includes a unique constraint to ensure a user cannot have multiple budgets
     for the same category in the same month.
+
+    With `rollover` set, what is left of the budget at the end of its month
+    is added to the category's budget of the following month.
+
+    `row_version` is the user's change version (see `UserCounters`) of the
+    write that last touched the row; delta sync reads changes by it.
     """
 
     __tablename__ = "budgets"
@@ -31,12 +45,34 @@ class Budgets(Base):
     user_id = Column(
         Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
-    category = Column(String, nullable=False)
+    category_id = Column(SmallInteger, nullable=False)
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     month = Column(DATE, nullable=False)
+    rollover = Column(Boolean, nullable=False, server_default=text("false"))
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=text("now()"),
+    )
+    row_version = Column(BigInteger, nullable=False, server_default=text("0"))
+
+    category_entry = relationship(
+        Categories, lazy="joined", innerjoin=True, viewonly=True
+    )
 
     __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
         UniqueConstraint(
-            "user_id", "category", "month", name="user_category_month_unique"
+            "user_id", "category_id", "month", name="user_category_month_unique"
         ),
+        Index("ix_budgets_user_id_row_version", "user_id", "row_version", "id"),
     )
+
+    @property
+    def category(self) -> str:
+        return self.category_entry.name
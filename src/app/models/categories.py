@@ -0,0 +1,38 @@
+"""
+Category Database Model.
+
+Represents the 'categories' table, a per-user dictionary that maps category
+names to compact integer keys. Expenses and budgets reference a category by
+its key instead of repeating the name in every row.
+"""
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    SmallInteger,
+    ForeignKey,
+    UniqueConstraint,
+)
+from src.app.db.session import Base
+
+
+class Categories(Base):
+    """
+    SQLAlchemy model for Categories.
+
+    Category ids are numbered per user, so the primary key is the pair
+    (user_id, id) and a SMALLINT is enough for the id itself.
+    """
+
+    __tablename__ = "categories"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="user_category_name_unique"),
+    )
@@ -0,0 +1,44 @@
+"""
+Category Totals Database Model.
+
+Represents the 'category_totals' table, which keeps running lifetime totals
+of each user's spending per category. All-time analytics read these few rows
+instead of aggregating the user's whole expense history.
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    Numeric,
+    text,
+    ForeignKeyConstraint,
+)
+from src.app.db.session import Base
+
+
+class CategoryTotals(Base):
+    """
+    SQLAlchemy model for Category Totals.
+
+    Rows are adjusted in the same transaction as every expense insert,
+    update and delete, so they always match the expenses table. A category
+    whose expenses were all deleted keeps a row with a zero `expense_count`.
+    """
+
+    __tablename__ = "category_totals"
+
+    user_id = Column(Integer, primary_key=True)
+    category_id = Column(SmallInteger, primary_key=True)
+    total = Column(
+        Numeric(precision=14, scale=2), nullable=False, server_default=text("0")
+    )
+    expense_count = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
+    )
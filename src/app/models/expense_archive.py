@@ -0,0 +1,78 @@
+"""
+Expense Archive Database Models.
+
+Represents the 'expense_archive' table, which holds expenses moved out of the
+hot 'expenses' table once they are older than the archive horizon, and the
+'monthly_totals' table, which keeps per-category monthly totals of the
+archived expenses for analytics.
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    SmallInteger,
+    String,
+    Numeric,
+    DATE,
+    TIMESTAMP,
+    text,
+    ForeignKey,
+    ForeignKeyConstraint,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.app.db.session import Base
+
+
+class ExpenseArchive(Base):
+    """
+    SQLAlchemy model for Expense Archives.
+
+    One row stores all archived expenses of a user in one calendar year,
+    column by column: the n-th element of every array belongs to the same
+    expense. `local_dates` keeps the day each expense fell on in the user's
+    timezone when it was archived. Large arrays are stored compressed out of
+    line (TOAST), so an archived expense takes a fraction of the space of a
+    row plus its index entries, and nothing of it is in the hot table's
+    indexes.
+    """
+
+    __tablename__ = "expense_archive"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    year = Column(SmallInteger, primary_key=True)
+    ids = Column(ARRAY(Integer), nullable=False)
+    category_ids = Column(ARRAY(SmallInteger), nullable=False)
+    amounts = Column(ARRAY(Numeric(precision=10, scale=2)), nullable=False)
+    dates = Column(ARRAY(TIMESTAMP(timezone=True)), nullable=False)
+    local_dates = Column(ARRAY(DATE), nullable=False)
+    descriptions = Column(ARRAY(String), nullable=False)
+
+
+class MonthlyTotals(Base):
+    """
+    SQLAlchemy model for Monthly Totals.
+
+    Per-category spending of archived expenses in each month, so monthly and
+    yearly analytics over archived periods read a few rows instead of
+    unpacking the archive.
+    """
+
+    __tablename__ = "monthly_totals"
+
+    user_id = Column(Integer, primary_key=True)
+    month = Column(DATE, primary_key=True)
+    category_id = Column(SmallInteger, primary_key=True)
+    total = Column(
+        Numeric(precision=14, scale=2), nullable=False, server_default=text("0")
+    )
+    expense_count = Column(Integer, nullable=False, server_default=text("0"))
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
+    )
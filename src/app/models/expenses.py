@@ -5,13 +5,46 @@ Represents the 'expenses' table, tracking individual financial transactions
 linked to a specific user.
 """
 
-from sqlalchemy import Column, String, Integer, TIMESTAMP, text, Numeric, ForeignKey
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    BigInteger,
+    SmallInteger,
+    TIMESTAMP,
+    Date,
+    text,
+    Numeric,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Computed,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from src.app.db.session import Base
+from src.app.models.categories import Categories
 
 
 class Expenses(Base):
     """
     SQLAlchemy model for Expenses.
+
+    The category is stored as a per-user `category_id`; the `category`
+    property exposes its name for serialization.
+
+    `description_search` is a stored, generated `tsvector` of the description
+    used for full-text search. It is deferred so it is never loaded with rows.
+    Both search indexes lead with `user_id` (via the btree_gin extension) so a
+    search only touches the requesting user's entries.
+
+    `local_date` is the day `date` falls on in the user's timezone, computed
+    when the expense is written. Day and month buckets are read from it, and
+    its index covers the amount and category, so per-period aggregates are
+    index-only scans.
+
+    `row_version` is the user's change version (see `UserCounters`) of the
+    write that last touched the row; delta sync reads changes by it.
     """
 
     __tablename__ = "expenses"
@@ -22,10 +55,58 @@ class Expenses(Base):
     )
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     description = Column(String, nullable=False)
-    category = Column(String, nullable=False)
+    category_id = Column(SmallInteger, nullable=False)
     date = Column(
         TIMESTAMP(timezone=True),
         nullable=False,
         server_default=text("now()"),
         index=True,
     )
+    local_date = Column(Date, nullable=False)
+    updated_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        onupdate=text("now()"),
+    )
+    row_version = Column(BigInteger, nullable=False, server_default=text("0"))
+    description_search = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('simple', description)"))
+    )
+
+    category_entry = relationship(
+        Categories, lazy="joined", innerjoin=True, viewonly=True
+    )
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["user_id", "category_id"],
+            ["categories.user_id", "categories.id"],
+            ondelete="CASCADE",
+        ),
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+        Index("ix_expenses_user_id_row_version", "user_id", "row_version", "id"),
+        Index(
+            "ix_expenses_user_id_local_date",
+            "user_id",
+            "local_date",
+            postgresql_include=["category_id", "amount"],
+        ),
+        Index(
+            "ix_expenses_user_id_description_search",
+            "user_id",
+            "description_search",
+            postgresql_using="gin",
+        ),
+        Index(
+            "ix_expenses_user_id_description_trgm",
+            "user_id",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
+
+    @property
+    def category(self) -> str:
+        return self.category_entry.name
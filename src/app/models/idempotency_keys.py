@@ -0,0 +1,43 @@
+"""
+Idempotency Key Database Model.
+
+Represents the 'idempotency_keys' table, which remembers the response of
+create requests sent with an `Idempotency-Key` header so that retries of the
+same request are answered without creating the record again.
+"""
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    TIMESTAMP,
+    text,
+    ForeignKey,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from src.app.db.session import Base
+
+
+class IdempotencyKeys(Base):
+    """
+    SQLAlchemy model for Idempotency Keys.
+
+    Keys are scoped per user. `fingerprint` identifies the original request
+    (endpoint and payload), so a key reused for a different request can be
+    rejected. A row is only ever committed together with its response; while
+    the original request runs, the uncommitted row makes duplicates wait.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(JSONB, nullable=True)
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
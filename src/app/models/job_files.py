@@ -0,0 +1,26 @@
+"""
+Job File Database Model.
+
+Represents the 'job_files' table, which holds the files produced by
+background jobs (CSV exports), apart from the 'jobs' queue table that
+workers poll.
+"""
+
+from sqlalchemy import Column, Integer, LargeBinary, ForeignKey
+from src.app.db.session import Base
+
+
+class JobFiles(Base):
+    """
+    SQLAlchemy model for Job Files.
+
+    One file per succeeded job. Its name, content type and size are kept in
+    the job's `result`, so reading a job's status never loads the file.
+    """
+
+    __tablename__ = "job_files"
+
+    job_id = Column(
+        Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True
+    )
+    content = Column(LargeBinary, nullable=False)
@@ -0,0 +1,63 @@
+"""
+Background Job Database Model.
+
+Represents the 'jobs' table, a PostgreSQL-backed queue of long-running work
+(exports, multi-year analytics) that is executed by worker processes outside
+the request path.
+"""
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    TIMESTAMP,
+    text,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from src.app.db.session import Base
+
+
+class Jobs(Base):
+    """
+    SQLAlchemy model for Jobs.
+
+    A job moves from 'queued' to 'running' when a worker claims it, and ends
+    as 'succeeded' or 'failed'. Failed attempts are re-queued with a delay
+    (`run_after`) until `max_attempts` is reached. A running job whose lease
+    (`locked_until`) has expired is considered abandoned and can be claimed
+    again.
+    """
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, server_default=text("'queued'"))
+    params = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    result = Column(JSONB, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    max_attempts = Column(Integer, nullable=False, server_default=text("3"))
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(TIMESTAMP(timezone=True), nullable=True)
+    run_after = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    created_at = Column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+    started_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_jobs_claimable",
+            "run_after",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
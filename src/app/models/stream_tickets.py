@@ -0,0 +1,27 @@
+"""
+Stream Ticket Database Model.
+
+Represents the 'stream_tickets' table, in the main database, which holds the
+short-lived, single-use tickets that authenticate change event streams, so
+that access tokens never appear in URLs.
+"""
+
+from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey
+from src.app.db.session import Base
+
+
+class StreamTickets(Base):
+    """
+    SQLAlchemy model for Stream Tickets.
+
+    Only a digest of each ticket is stored. A ticket is deleted when it is
+    redeemed; expired ones are purged when the same user asks for a new one.
+    """
+
+    __tablename__ = "stream_tickets"
+
+    ticket_hash = Column(String(64), primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
@@ -0,0 +1,48 @@
+"""
+Sync Tombstone Database Model.
+
+Represents the 'sync_tombstones' table, which records deleted expenses and
+budgets so that clients syncing their cached data learn about deletions.
+"""
+
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    BigInteger,
+    TIMESTAMP,
+    text,
+    ForeignKey,
+    Index,
+)
+from src.app.db.session import Base
+
+
+class SyncTombstones(Base):
+    """
+    SQLAlchemy model for Sync Tombstones.
+
+    `entity` is "expense" or "budget" and `record_id` the deleted row's ID.
+    `row_version` is the user's change version of the deletion. Tombstones
+    are purged after `sync_tombstone_ttl_days` by the job worker.
+    """
+
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    entity = Column(String(16), nullable=False)
+    record_id = Column(Integer, nullable=False)
+    row_version = Column(BigInteger, nullable=False)
+    deleted_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text("now()"),
+        index=True,
+    )
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_row_version", "user_id", "row_version", "id"),
+    )
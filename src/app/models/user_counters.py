@@ -0,0 +1,36 @@
+"""
+User Counters Database Model.
+
+Represents the 'user_counters' table, which keeps the number of expenses and
+budgets each user has. List endpoints report these as their total count
+instead of running a `COUNT(*)` over the user's rows on every page, and the
+user's change version used by delta sync.
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, text
+from src.app.db.session import Base
+
+
+class UserCounters(Base):
+    """
+    SQLAlchemy model for User Counters.
+
+    The row is adjusted in the same transaction as every expense and budget
+    insert and delete, so the counts always match the tables they count.
+
+    `change_version` is advanced by every write to the user's expenses and
+    budgets, which stamp it on the rows they touch. The row stays locked
+    until the write commits, so versions are handed out in commit order.
+    Sync cursors older than `sync_floor` can no longer be served (their
+    tombstones were purged, or the user moved shards).
+    """
+
+    __tablename__ = "user_counters"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    expense_count = Column(Integer, nullable=False, server_default=text("0"))
+    budget_count = Column(Integer, nullable=False, server_default=text("0"))
+    change_version = Column(BigInteger, nullable=False, server_default=text("0"))
+    sync_floor = Column(BigInteger, nullable=False, server_default=text("0"))
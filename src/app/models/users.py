@@ -5,13 +5,20 @@ Represents the 'users' table in the database, storing authentication credentials
 and account metadata.
 """
 
-from sqlalchemy import Column, String, Integer, TIMESTAMP, text
+from sqlalchemy import Column, String, Integer, SmallInteger, TIMESTAMP, text
 from src.app.db.session import Base
 
 
 class Users(Base):
     """
     SQLAlchemy model for Users.
+
+    The main database's `users` table is the directory of all users; `shard`
+    tells which database holds the user's data. A user placed on another
+    shard also has a copy of this row there, for its foreign keys and its
+    `timezone`, which expense writes on that shard read.
+
+    `timezone` is an IANA name; the user's days and months are bucketed in it.
     """
 
     __tablename__ = "users"
@@ -22,3 +29,5 @@ class Users(Base):
     created_at = Column(
         TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
     )
+    shard = Column(SmallInteger, nullable=False, server_default=text("0"))
+    timezone = Column(String, nullable=False, server_default=text("'UTC'"))
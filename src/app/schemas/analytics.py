@@ -7,7 +7,7 @@ charts data, and trend analysis.
 """
 
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class DashboardSummary(BaseModel):
@@ -55,3 +55,64 @@ class SpendingTrendResponse(BaseModel):
     """
 
     data: List[TrendDataPoint]
+
+
+class PeriodTotal(BaseModel):
+    """
+    Schema for one period's spending, compared against the base (first) period.
+
+    `delta` is this period's total minus the base total, so a positive value
+    means more was spent in this period; `percent_change` is the delta
+    relative to the base total (None when nothing was spent in the base
+    period).
+    """
+
+    period: str
+    total_amount: float
+    delta: float
+    percent_change: Optional[float]
+
+
+class CategoryComparison(BaseModel):
+    """
+    Schema for a single category's totals across all compared periods.
+    """
+
+    category: str
+    periods: List[PeriodTotal]
+
+
+class PeriodComparisonResponse(BaseModel):
+    """
+    Wrapper schema for period-over-period comparison data.
+    """
+
+    periods: List[str]
+    totals: List[PeriodTotal]
+    data: List[CategoryComparison]
+
+
+class CategoryForecast(BaseModel):
+    """
+    Schema for one category's projected month-end spending.
+
+    `budget` and `status` are None when the category has no budget this month.
+    """
+
+    category: str
+    spent: float
+    projected: float
+    budget: Optional[float]
+    status: Optional[str]
+
+
+class ForecastResponse(BaseModel):
+    """
+    Wrapper schema for the month-end forecast of every category.
+    """
+
+    month: str
+    as_of: str
+    total_spent: float
+    total_projected: float
+    data: List[CategoryForecast]
@@ -7,7 +7,7 @@ to the first day of the month.
 """
 
 from pydantic import BaseModel, ConfigDict, field_validator
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 
 
@@ -19,6 +19,7 @@ class BudgetBase(BaseModel):
     category: str
     amount: Decimal
     month: date
+    rollover: bool = False
 
     @field_validator("month")
     @classmethod
@@ -40,10 +41,29 @@ class BudgetCreate(BudgetBase):
 
 class BudgetResponse(BudgetBase):
     """
-    Schema for reading budget data (Includes ID and User ID).
+    Schema for reading budget data (Includes ID, User ID and when it was
+    last changed).
     """
 
     id: int
     user_id: int
+    updated_at: datetime
+    row_version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BudgetRollover(BaseModel):
+    """
+    Schema for a budget with the amount carried over from earlier months.
+    """
+
+    id: int
+    category: str
+    month: date
+    amount: Decimal
+    rollover: bool
+    carried_over: Decimal
+    effective: Decimal
+    spent: Decimal
+    remaining: Decimal
@@ -0,0 +1,25 @@
+"""
+Dashboard Bootstrap Schemas.
+
+This module defines the combined payload returned by the dashboard bootstrap
+endpoint, which bundles the user profile, summary cards, recent activity and
+chart data so the dashboard page can render from a single request.
+"""
+
+from pydantic import BaseModel
+from typing import List
+from src.app.schemas.users import UserResponse
+from src.app.schemas.expenses import ExpenseResponse
+from src.app.schemas.analytics import DashboardSummary, CategoryData, TrendDataPoint
+
+
+class DashboardResponse(BaseModel):
+    """
+    Schema for everything the dashboard page needs on load.
+    """
+
+    user: UserResponse
+    summary: DashboardSummary
+    recent_expenses: List[ExpenseResponse]
+    spending_trend: List[TrendDataPoint]
+    category_breakdown: List[CategoryData]
@@ -6,7 +6,7 @@ It handles data validation for monetary amounts (Decimal) and dates.
 """
 
 from pydantic import BaseModel, ConfigDict
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 
@@ -23,7 +23,8 @@ class ExpenseBase(BaseModel):
 class ExpenseCreate(ExpenseBase):
     """
     Schema for creating a new expense.
-    Requires a specific date/time for the transaction.
+    Requires a specific date/time for the transaction; one without a UTC
+    offset is taken as the user's local time.
     """
 
     date: datetime
@@ -32,11 +33,15 @@ class ExpenseCreate(ExpenseBase):
 
 class ExpenseResponse(ExpenseBase):
     """
-    Schema for reading expense data (Includes IDs and timestamp).
+    Schema for reading expense data (Includes IDs, timestamp, the day it
+    falls on in the user's timezone and when it was last changed).
     """
 
     id: int
     user_id: int
     date: datetime
+    local_date: date
+    updated_at: datetime
+    row_version: int
 
     model_config = ConfigDict(from_attributes=True)
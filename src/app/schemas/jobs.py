@@ -0,0 +1,100 @@
+"""
+Background Job Schemas.
+
+This module defines the Pydantic models used to enqueue background jobs and
+report their progress.
+"""
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from datetime import date, datetime
+from typing import Annotated, Dict, Literal, Optional, Type, Union
+
+
+class ExportExpensesParams(BaseModel):
+    """
+    Parameters of an `export_expenses` job: an optional range of days in the
+    user's timezone (`end` exclusive).
+    """
+
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def check_range(self) -> "ExportExpensesParams":
+        """
+        Validator to reject a range ending before it starts.
+        """
+        if self.start and self.end and self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+
+class CategoryBreakdownParams(BaseModel):
+    """
+    Parameters of a `category_breakdown` job: an optional range of years
+    (both inclusive).
+    """
+
+    start_year: Optional[int] = Field(None, ge=1, le=9999)
+    end_year: Optional[int] = Field(None, ge=1, le=9999)
+
+    model_config = ConfigDict(extra="forbid")
+
+    @model_validator(mode="after")
+    def check_range(self) -> "CategoryBreakdownParams":
+        """
+        Validator to reject a range ending before it starts.
+        """
+        if self.start_year and self.end_year and self.end_year < self.start_year:
+            raise ValueError("end_year must not be before start_year")
+        return self
+
+
+class ExportExpensesJob(BaseModel):
+    """
+    Schema for enqueueing a CSV export.
+    """
+
+    kind: Literal["export_expenses"]
+    params: ExportExpensesParams = ExportExpensesParams()
+
+
+class CategoryBreakdownJob(BaseModel):
+    """
+    Schema for enqueueing a multi-year category breakdown.
+    """
+
+    kind: Literal["category_breakdown"]
+    params: CategoryBreakdownParams = CategoryBreakdownParams()
+
+
+# Schema for enqueueing a job; the `kind` selects how `params` is validated
+JobCreate = Annotated[
+    Union[ExportExpensesJob, CategoryBreakdownJob], Field(discriminator="kind")
+]
+
+# Parameter schema of each job kind, to validate stored params before a run
+JOB_PARAMS: Dict[str, Type[BaseModel]] = {
+    "export_expenses": ExportExpensesParams,
+    "category_breakdown": CategoryBreakdownParams,
+}
+
+
+class JobResponse(BaseModel):
+    """
+    Schema for reading a job's status (the result is served separately).
+    """
+
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,36 @@
+"""
+Delta Sync Schemas.
+
+This module defines the Pydantic models returned by the sync endpoint: the
+expenses and budgets changed since the client's cursor and the records
+deleted since then.
+"""
+
+from pydantic import BaseModel
+from typing import List, Literal
+from src.app.schemas.expenses import ExpenseResponse
+from src.app.schemas.budgets import BudgetResponse
+
+
+class SyncDeletion(BaseModel):
+    """
+    Schema for a deleted record.
+    """
+
+    entity: Literal["expense", "budget"]
+    id: int
+
+
+class SyncResponse(BaseModel):
+    """
+    Schema for one page of changes.
+
+    `cursor` is passed to the next sync; while `has_more` is true, more
+    changes are waiting and the client should sync again right away.
+    """
+
+    expenses: List[ExpenseResponse]
+    budgets: List[BudgetResponse]
+    deleted: List[SyncDeletion]
+    cursor: str
+    has_more: bool
@@ -18,6 +18,15 @@ class Token(BaseModel):
     token_type: str
 
 
+class StreamTicket(BaseModel):
+    """
+    Schema for a single-use ticket that opens the change event stream.
+    """
+
+    ticket: str
+    expires_in: int
+
+
 class TokenData(BaseModel):
     """
     Schema for the data embedded within the JWT token (payload).
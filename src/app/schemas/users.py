@@ -6,8 +6,15 @@ login, and profile retrieval. It explicitly separates the creation schema (with
 from the response schema (without password) for security.
 """
 
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
 from datetime import datetime
+from src.app.core.timezones import DEFAULT_TIMEZONE, is_valid_timezone
+
+
+def _check_timezone(v: str) -> str:
+    if not is_valid_timezone(v):
+        raise ValueError(f"Unknown timezone: {v}")
+    return v
 
 
 class UserCreate(BaseModel):
@@ -17,6 +24,31 @@ class UserCreate(BaseModel):
 
     email: EmailStr
     password: str
+    timezone: str = DEFAULT_TIMEZONE
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, v: str) -> str:
+        """
+        Validator to accept only IANA timezone names (e.g. "Europe/Berlin").
+        """
+        return _check_timezone(v)
+
+
+class UserUpdate(BaseModel):
+    """
+    Schema for updating the current user's settings.
+    """
+
+    timezone: str
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, v: str) -> str:
+        """
+        Validator to accept only IANA timezone names (e.g. "Europe/Berlin").
+        """
+        return _check_timezone(v)
 
 
 class UserResponse(BaseModel):
@@ -27,6 +59,7 @@ class UserResponse(BaseModel):
 
     id: int
     email: EmailStr
+    timezone: str
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
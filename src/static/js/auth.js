@@ -88,6 +88,7 @@ document.addEventListener("DOMContentLoaded", () => {
           body: JSON.stringify({
             email: email,
             password: password,
+            timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
           }),
         });
 
@@ -3,10 +3,21 @@
  * @description Manages the Budget page logic.
  * Responsible for fetching budgets AND expenses to calculate spending progress.
  * Includes logic for progress bars, color coding statuses, and duplicate budget prevention.
+ * Change events pushed by the server (Server-Sent Events) keep budgets and their
+ * spent amounts up to date without reloading the page. Amounts rolled over
+ * from earlier months are read from the server's rollover view.
  */
 const API_BASE_URL = "api/v1";
 let allBudgets = [];
 let allExpenses = [];
+let changeStream = null;
+
+// Spent amounts per "Category|YYYY-MM" received from change events; these
+// take precedence over sums of the (paginated) expense list.
+let spentByBudgetKey = {};
+
+// Amount carried over into each budget (by ID) from the month before
+let carriedByBudgetId = {};
 
 function getCategoryStyle(category) {
   const styles = {
@@ -51,8 +62,79 @@ document.addEventListener("DOMContentLoaded", async () => {
   loadUserProfile(token);
 
   await loadBudgetsAndCalculate(token);
+  subscribeToChanges(token);
 });
 
+/**
+ * Opens the server's change event stream and applies each `change` event
+ * (budget or expense mutations from any tab or device) to the current view.
+ * @param {string} token - JWT Access Token.
+ * @param {boolean} [reconnecting] - Whether this replaces a lost stream.
+ */
+async function subscribeToChanges(token, reconnecting = false) {
+  if (!window.EventSource) return;
+
+  // The stream is opened with a single-use ticket rather than the token
+  const response = await fetch(`${API_BASE_URL}/events/ticket`, {
+    method: "POST",
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!response.ok) return;
+  const { ticket } = await response.json();
+
+  changeStream = new EventSource(
+    `${API_BASE_URL}/events?ticket=${encodeURIComponent(ticket)}`
+  );
+  changeStream.addEventListener("change", (e) =>
+    applyChange(JSON.parse(e.data))
+  );
+  // Sent when events were dropped (e.g. the tab was asleep): reload everything
+  changeStream.addEventListener("resync", () => window.location.reload());
+  // Events sent while disconnected were missed
+  if (reconnecting) {
+    changeStream.addEventListener("ready", () => window.location.reload());
+  }
+  // The browser would retry with the used ticket: reconnect with a new one
+  changeStream.onerror = () => {
+    changeStream.close();
+    setTimeout(() => subscribeToChanges(token, true), 5000);
+  };
+}
+
+/**
+ * After a mutation on this page: rely on the change event if the stream is
+ * open, otherwise fall back to reloading the page.
+ */
+function refreshAfterMutation() {
+  if (changeStream === null || changeStream.readyState !== EventSource.OPEN) {
+    window.location.reload();
+  }
+}
+
+/**
+ * Patches the budget list and the spent amounts from a change event, then
+ * re-renders with the filters currently selected.
+ * @param {Object} change - The event payload.
+ */
+async function applyChange(change) {
+  change.budgets.forEach((item) => {
+    spentByBudgetKey[`${item.category}|${item.month.substring(0, 7)}`] =
+      item.spent;
+  });
+
+  if (change.entity === "budget") {
+    allBudgets = allBudgets.filter((b) => b.id !== change.id);
+    if (change.record) allBudgets.push(change.record);
+    allBudgets.sort((a, b) => new Date(b.month) - new Date(a.month));
+  }
+  // Any change can move the amounts carried into later months
+  await loadRollover(localStorage.getItem("accessToken"));
+
+  const monthInput = document.getElementById("filterMonth");
+  if (monthInput) monthInput.dispatchEvent(new Event("change"));
+  else renderBudgets(allBudgets);
+}
+
 function setupLogout() {
   const logoutBtn = document.getElementById("logoutBtn");
   if (logoutBtn) {
@@ -90,7 +172,7 @@ async function loadBudgetsAndCalculate(token) {
       fetch(`${API_BASE_URL}/budgets/`, {
         headers: { Authorization: `Bearer ${token}` },
       }),
-      fetch(`${API_BASE_URL}/expenses/`, {
+      fetch(`${API_BASE_URL}/expenses/?fields=amount,category,local_date`, {
         headers: { Authorization: `Bearer ${token}` },
       }),
     ]);
@@ -100,6 +182,7 @@ async function loadBudgetsAndCalculate(token) {
     if (budgetsRes.ok && expensesRes.ok) {
       allBudgets = await budgetsRes.json();
       allExpenses = await expensesRes.json();
+      await loadRollover(token);
       // Sort budgets by date descending
       allBudgets.sort((a, b) => new Date(b.month) - new Date(a.month));
       applyDefaultFilter(); // Show current month by default
@@ -109,6 +192,26 @@ async function loadBudgetsAndCalculate(token) {
   }
 }
 
+/**
+ * Fetches the amounts carried over into each budget from earlier months.
+ * @param {string} token - JWT Access Token.
+ */
+async function loadRollover(token) {
+  try {
+    const res = await fetch(`${API_BASE_URL}/budgets/rollover`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (handleAuthError(res) || !res.ok) return;
+
+    carriedByBudgetId = {};
+    (await res.json()).forEach((item) => {
+      carriedByBudgetId[item.id] = Number(item.carried_over);
+    });
+  } catch (error) {
+    console.error("Error:", error);
+  }
+}
+
 /**
  * Defaults the view to the current month when page loads.
  */
@@ -200,19 +303,23 @@ function renderBudgets(budgets) {
     });
 
     // Calculate how much spent for this budget
-    const spent = allExpenses
-      .filter((exp) => {
-        const expDate = new Date(exp.date);
-        return (
-          exp.category === budget.category &&
-          expDate.getMonth() === budgetDate.getMonth() &&
-          expDate.getFullYear() === budgetDate.getFullYear()
-        );
-      })
-      .reduce((sum, exp) => sum + Number(exp.amount), 0);
-
-    const percentage = Math.min((spent / budget.amount) * 100, 100);
-    const percentageText = Math.round((spent / budget.amount) * 100);
+    const budgetKey = `${budget.category}|${budget.month.substring(0, 7)}`;
+    const spent =
+      budgetKey in spentByBudgetKey
+        ? spentByBudgetKey[budgetKey]
+        : allExpenses
+            .filter(
+              (exp) =>
+                exp.category === budget.category &&
+                exp.local_date.substring(0, 7) === budget.month.substring(0, 7)
+            )
+            .reduce((sum, exp) => sum + Number(exp.amount), 0);
+
+    // The limit includes what rolled over from the month before
+    const carried = carriedByBudgetId[budget.id] || 0;
+    const limit = Number(budget.amount) + carried;
+    const percentage = limit > 0 ? Math.min((spent / limit) * 100, 100) : 100;
+    const percentageText = limit > 0 ? Math.round((spent / limit) * 100) : 100;
 
     // Dynamic coloring based on usage
     let colorClass = "bg-success";
@@ -269,9 +376,16 @@ function renderBudgets(budgets) {
                     $${Math.round(
                       spent
                     )} <span class="text-muted fs-6 fw-normal">/ $${Math.round(
-      budget.amount
+      limit
     )}</span>
                 </h3>
+                ${
+                  carried > 0
+                    ? `<small class="d-block text-muted mb-2"><i class="bi bi-arrow-repeat me-1"></i>$${Math.round(
+                        carried
+                      )} rolled over from last month</small>`
+                    : ""
+                }
                 
                 <div class="progress mb-2" style="height: 10px;">
                     <div class="progress-bar ${colorClass}" role="progressbar" style="width: ${percentage}%"></div>
@@ -302,6 +416,7 @@ function setupAddBudgetForm(token) {
       const category = document.getElementById("budgetCategory").value;
       const amount = document.getElementById("budgetAmount").value;
       const monthStr = document.getElementById("budgetMonth").value;
+      const rollover = document.getElementById("budgetRollover").checked;
 
       // Prevent duplicate budget for same category/month on client side
       const duplicate = allBudgets.find((b) => {
@@ -322,6 +437,7 @@ function setupAddBudgetForm(token) {
         category: category,
         amount: amount,
         month: fullDate,
+        rollover: rollover,
       };
 
       try {
@@ -338,7 +454,11 @@ function setupAddBudgetForm(token) {
 
         if (res.ok) {
           alert("Budget Set Successfully!");
-          window.location.reload();
+          const modal = bootstrap.Modal.getInstance(
+            document.getElementById("addBudgetModal")
+          );
+          if (modal) modal.hide();
+          refreshAfterMutation();
         } else {
           const err = await res.json();
           if (res.status === 409) {
@@ -367,6 +487,7 @@ window.openEditBudgetModal = function (id) {
 
   const monthStr = budget.month.substring(0, 7);
   document.getElementById("editBudgetMonth").value = monthStr;
+  document.getElementById("editBudgetRollover").checked = budget.rollover;
 
   const modalEl = document.getElementById("editBudgetModal");
   const modal = new bootstrap.Modal(modalEl);
@@ -387,11 +508,12 @@ async function submitEditBudget(originalBudget) {
   const newAmount = document.getElementById("editBudgetAmount").value;
   const token = localStorage.getItem("accessToken");
 
-  // Keep original month and category, only update amount
+  // Keep original month and category, only update amount and rollover
   const payload = {
     category: originalBudget.category,
     amount: newAmount,
     month: originalBudget.month,
+    rollover: document.getElementById("editBudgetRollover").checked,
   };
 
   try {
@@ -410,7 +532,7 @@ async function submitEditBudget(originalBudget) {
       alert("Budget Updated!");
       const closeBtn = document.querySelector("#editBudgetModal .btn-close");
       if (closeBtn) closeBtn.click();
-      window.location.reload();
+      refreshAfterMutation();
     } else {
       alert("Failed to update budget.");
     }
@@ -432,7 +554,7 @@ window.deleteBudget = async function (id) {
     if (handleAuthError(res)) return;
 
     if (res.status === 204) {
-      window.location.reload();
+      refreshAfterMutation();
     } else {
       alert("Failed to delete.");
     }
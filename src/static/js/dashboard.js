@@ -1,12 +1,21 @@
 /**
  * @file dashboard.js
  * @description Main controller for the Dashboard page.
- * Fetches and displays financial summaries, charts, and recent activities.
+ * Fetches the dashboard bootstrap payload in one request and displays
+ * financial summaries, charts, and recent activities. Afterwards, change
+ * events pushed by the server (Server-Sent Events) patch the view in place.
  */
 
 const API_BASE_URL = "api/v1";
 let spendingChartInstance = null;
 let categoryChartInstance = null;
+let changeStream = null;
+
+// Current view state, patched by change events
+let recentExpenses = [];
+let trendPoints = [];
+let categoryTotals = [];
+const RECENT_EXPENSES_LIMIT = 10;
 
 /**
  * Checks for 401 Unauthorized response and redirects to login if session expired.
@@ -34,14 +43,8 @@ document.addEventListener("DOMContentLoaded", async () => {
   setupAddExpenseForm(token);
 
   try {
-    await loadUserProfile(token);
-
-    // Load all dashboard components in parallel
-    await Promise.all([
-      loadDashboardSummary(token),
-      loadRecentActivity(token),
-      loadCharts(token),
-    ]);
+    await loadDashboard(token);
+    subscribeToChanges(token);
   } catch (error) {
     console.error("Error initializing dashboard:", error);
   }
@@ -60,86 +63,138 @@ function setupLogout() {
 }
 
 /**
- * Fetches current user profile to display the welcome message.
+ * Fetches the whole dashboard (profile, summary, recent activity and chart data)
+ * in a single request and renders every section from it.
  * @param {string} token - JWT Access Token.
  */
-async function loadUserProfile(token) {
-  try {
-    const response = await fetch(`${API_BASE_URL}/users/me`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
-    if (response.ok) {
-      const userData = await response.json();
-      let name = userData.email.split("@")[0];
-      name = name.charAt(0).toUpperCase() + name.slice(1);
-
-      const welcomeEl = document.getElementById("userWelcome");
-      if (welcomeEl) welcomeEl.textContent = `Hello, ${name}`;
-    }
-  } catch (error) {
-    console.error(error);
+async function loadDashboard(token) {
+  const response = await fetch(`${API_BASE_URL}/dashboard`, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+
+  if (handleAuthError(response)) return;
+
+  if (response.ok) {
+    const data = await response.json();
+    recentExpenses = data.recent_expenses;
+    trendPoints = data.spending_trend;
+    categoryTotals = data.category_breakdown;
+
+    renderUserProfile(data.user);
+    renderDashboardSummary(data.summary);
+    renderRecentTransactions(recentExpenses);
+    renderTrendChart(trendPoints);
+    renderCategoryChart(categoryTotals);
   }
 }
 
 /**
- * Loads high-level summary cards (Total Expenses, Remaining Budget, Top Category).
+ * Opens the server's change event stream. Each `change` event carries the new
+ * aggregates affected by an expense or budget mutation (from any tab or device),
+ * which are applied to the current view without refetching the dashboard.
  * @param {string} token - JWT Access Token.
+ * @param {boolean} [reconnecting] - Whether this replaces a lost stream.
  */
-async function loadDashboardSummary(token) {
-  try {
-    const response = await fetch(`${API_BASE_URL}/analytics/summary`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
+async function subscribeToChanges(token, reconnecting = false) {
+  if (!window.EventSource) return;
 
-    if (handleAuthError(response)) return;
+  // The stream is opened with a single-use ticket rather than the token
+  const response = await fetch(`${API_BASE_URL}/events/ticket`, {
+    method: "POST",
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!response.ok) return;
+  const { ticket } = await response.json();
+
+  changeStream = new EventSource(
+    `${API_BASE_URL}/events?ticket=${encodeURIComponent(ticket)}`
+  );
+  changeStream.addEventListener("change", (e) =>
+    applyChange(JSON.parse(e.data))
+  );
+  // Sent when events were dropped (e.g. the tab was asleep): reload everything
+  changeStream.addEventListener("resync", () => loadDashboard(token));
+  // Events sent while disconnected were missed
+  if (reconnecting) {
+    changeStream.addEventListener("ready", () => loadDashboard(token));
+  }
+  // The browser would retry with the used ticket: reconnect with a new one
+  changeStream.onerror = () => {
+    changeStream.close();
+    setTimeout(() => subscribeToChanges(token, true), 5000);
+  };
+}
 
-    if (response.ok) {
-      const data = await response.json();
+/**
+ * Tells whether change events are being received, in which case mutations
+ * made on this page do not need to refetch the dashboard.
+ * @returns {boolean}
+ */
+function isStreamOpen() {
+  return changeStream !== null && changeStream.readyState === EventSource.OPEN;
+}
 
-      // Update UI Cards
-      document.getElementById(
-        "totalExpensesCard"
-      ).textContent = `$${data.total_spent.toLocaleString()}`;
+/**
+ * Patches the summary, charts and recent activity from a change event.
+ * @param {Object} change - The event payload.
+ */
+function applyChange(change) {
+  renderDashboardSummary(change.summary);
 
-      const remainingEl = document.getElementById("remainingBudgetCard");
-      remainingEl.textContent = `$${data.remaining_budget.toLocaleString()}`;
+  change.categories.forEach((item) => {
+    categoryTotals = categoryTotals.filter((c) => c.category !== item.category);
+    if (item.total_amount > 0) categoryTotals.push(item);
+  });
+  categoryTotals.sort((a, b) => b.total_amount - a.total_amount);
+  renderCategoryChart(categoryTotals);
 
-      // Set color based on financial health status
-      if (data.status === "Danger")
-        remainingEl.className = "fw-bold mb-0 text-danger";
-      else if (data.status === "Warning")
-        remainingEl.className = "fw-bold mb-0 text-warning";
-      else remainingEl.className = "fw-bold mb-0 text-dark-brown";
+  if (change.entity !== "expense") return;
 
-      document.getElementById("topCategoryCard").textContent =
-        data.top_category;
-    }
-  } catch (error) {
-    console.error("Summary Error:", error);
-  }
+  change.days.forEach((day) => {
+    trendPoints = trendPoints.filter((dp) => dp.date !== day.date);
+    if (day.amount > 0) trendPoints.push(day);
+  });
+  trendPoints.sort((a, b) => a.date.localeCompare(b.date));
+  renderTrendChart(trendPoints);
+
+  recentExpenses = recentExpenses.filter((exp) => exp.id !== change.id);
+  if (change.record) recentExpenses.push(change.record);
+  recentExpenses.sort((a, b) => new Date(b.date) - new Date(a.date));
+  recentExpenses = recentExpenses.slice(0, RECENT_EXPENSES_LIMIT);
+  renderRecentTransactions(recentExpenses);
 }
 
 /**
- * Fetches recent expenses and renders them in the activity feed.
- * @param {string} token - JWT Access Token.
+ * Displays the welcome message for the current user.
+ * @param {Object} userData - The user profile.
  */
-async function loadRecentActivity(token) {
-  try {
-    const response = await fetch(`${API_BASE_URL}/expenses/`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
+function renderUserProfile(userData) {
+  let name = userData.email.split("@")[0];
+  name = name.charAt(0).toUpperCase() + name.slice(1);
 
-    if (response.ok) {
-      let expenses = await response.json();
-      // Sort by date descending and take top 10
-      expenses.sort((a, b) => new Date(b.date) - new Date(a.date));
-      expenses = expenses.slice(0, 10);
+  const welcomeEl = document.getElementById("userWelcome");
+  if (welcomeEl) welcomeEl.textContent = `Hello, ${name}`;
+}
 
-      renderRecentTransactions(expenses);
-    }
-  } catch (error) {
-    console.error("Recent Activity Error:", error);
-  }
+/**
+ * Fills the high-level summary cards (Total Expenses, Remaining Budget, Top Category).
+ * @param {Object} data - The dashboard summary.
+ */
+function renderDashboardSummary(data) {
+  document.getElementById(
+    "totalExpensesCard"
+  ).textContent = `$${data.total_spent.toLocaleString()}`;
+
+  const remainingEl = document.getElementById("remainingBudgetCard");
+  remainingEl.textContent = `$${data.remaining_budget.toLocaleString()}`;
+
+  // Set color based on financial health status
+  if (data.status === "Danger") remainingEl.className = "fw-bold mb-0 text-danger";
+  else if (data.status === "Warning")
+    remainingEl.className = "fw-bold mb-0 text-warning";
+  else remainingEl.className = "fw-bold mb-0 text-dark-brown";
+
+  document.getElementById("topCategoryCard").textContent = data.top_category;
 }
 
 /**
@@ -229,38 +284,6 @@ function renderRecentTransactions(expenses) {
   });
 }
 
-/**
- * Fetches data and renders both Spending Trend and Category Breakdown charts.
- * @param {string} token - JWT Access Token.
- */
-async function loadCharts(token) {
-  // --- Spending Trend (Line Chart) ---
-  try {
-    const trendRes = await fetch(`${API_BASE_URL}/analytics/spending-trend`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
-    if (trendRes.ok) {
-      const trendData = await trendRes.json();
-      renderTrendChart(trendData.data);
-    }
-  } catch (e) {
-    console.error("Trend Chart Error:", e);
-  }
-
-  // --- Category Breakdown (Doughnut Chart) ---
-  try {
-    const catRes = await fetch(`${API_BASE_URL}/analytics/category-breakdown`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
-    if (catRes.ok) {
-      const catData = await catRes.json();
-      renderCategoryChart(catData.data);
-    }
-  } catch (e) {
-    console.error("Category Chart Error:", e);
-  }
-}
-
 /**
  * Renders a Line Chart using Chart.js.
  * @param {Array<Object>} dataPoints - Array of {date, amount} objects.
@@ -427,14 +450,13 @@ function setupAddExpenseForm(token) {
           form.reset();
           setTodayDate();
 
-          // Refresh data based on current page context
-          if (typeof loadDashboardSummary === "function") {
+          // Refresh data based on current page context.
+          // With an open change stream the dashboard is patched by the event.
+          if (isStreamOpen()) {
+            console.log("Dashboard will update from the change event");
+          } else if (typeof loadDashboard === "function") {
             console.log("Updating Dashboard...");
-            await Promise.all([
-              loadDashboardSummary(token),
-              loadRecentActivity(token),
-              loadCharts(token),
-            ]);
+            await loadDashboard(token);
           } else if (typeof loadExpenses === "function") {
             console.log("Updating Expenses List...");
             loadExpenses(token);
@@ -1,16 +1,21 @@
 /**
  * @file expenses.js
  * @description Manages the Expenses list page.
- * Features include fetching expenses, pagination, client-side filtering (Search, Category, Date),
+ * Features include server-side pagination, server-side description search,
+ * client-side filtering (Category, Date),
  * and handling Create/Update/Delete operations via modals.
  */
 
 const API_BASE_URL = "api/v1";
 
-let allExpenses = [];
+let allExpenses = null; // Full list, only fetched once a Category/Date filter needs it
 let filteredExpenses = [];
+let pageSource = null; // Fetches one page from the server; null while filtering locally
+let pageItems = [];
+let pageRequest = 0;
 let currentPage = 1;
 const rowsPerPage = 10;
+const SEARCH_DEBOUNCE_MS = 250;
 
 /**
  * Returns the CSS classes and icon for a given category.
@@ -109,23 +114,56 @@ async function loadUserProfile(token) {
 }
 
 /**
- * Fetches all expenses from the API and initializes the table.
- * Sorts data by date descending.
+ * Fetches one page of a list endpoint along with its total size.
+ * @param {string} path - The endpoint path, optionally with a query string.
+ * @param {number} skip - Number of records to skip.
+ * @param {number} limit - Maximum number of records to return.
+ * @returns {Promise<Object|null>} { items, total }, or null on failure.
  */
-async function loadExpenses(token) {
-  try {
-    const response = await fetch(`${API_BASE_URL}/expenses/`, {
-      headers: { Authorization: `Bearer ${token}` },
-    });
+async function fetchPage(path, skip, limit) {
+  const token = localStorage.getItem("accessToken");
+  const separator = path.includes("?") ? "&" : "?";
+  const response = await fetch(
+    `${API_BASE_URL}${path}${separator}skip=${skip}&limit=${limit}`,
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
 
-    if (handleAuthError(response)) return;
+  if (handleAuthError(response) || !response.ok) return null;
 
-    if (response.ok) {
-      allExpenses = await response.json();
-      allExpenses.sort((a, b) => new Date(b.date) - new Date(a.date));
-      filteredExpenses = [...allExpenses]; // Init filtered list with all items
-      displayData(1); // Show first page
-    }
+  const items = await response.json();
+  let total = Number(response.headers.get("X-Total-Count") || 0);
+  // Estimated totals can be off; a short page tells where the list really ends
+  if (items.length < limit) total = skip + items.length;
+  return { items, total };
+}
+
+/**
+ * Fetches every expense (newest first), one page of 100 at a time.
+ * Only needed for the Category and Date filters, which run in the browser.
+ */
+async function loadAllExpenses() {
+  if (allExpenses) return allExpenses;
+
+  const expenses = [];
+  let total = Infinity;
+  while (expenses.length < total) {
+    const page = await fetchPage("/expenses/", expenses.length, 100);
+    if (!page) break;
+    expenses.push(...page.items);
+    total = page.items.length ? page.total : expenses.length;
+  }
+  allExpenses = expenses;
+  return allExpenses;
+}
+
+/**
+ * Shows the first page of the user's expenses, fetched from the server.
+ */
+async function loadExpenses(token) {
+  allExpenses = null;
+  pageSource = (skip, limit) => fetchPage("/expenses/", skip, limit);
+  try {
+    await displayData(1); // Show first page
   } catch (error) {
     console.error("Error loading expenses:", error);
   }
@@ -133,26 +171,42 @@ async function loadExpenses(token) {
 
 /**
  * Calculates pagination logic and renders the current page's items.
+ * Pages are fetched from the server unless a local filter is active.
  * @param {number} page - The page number to display.
  */
-function displayData(page) {
-  const container = document.getElementById("expensesList");
-  container.innerHTML = "";
+async function displayData(page) {
+  if (page < 1) page = 1;
 
-  const totalItems = filteredExpenses.length;
-  const pageCount = Math.ceil(totalItems / rowsPerPage);
+  let items;
+  let totalItems;
+  if (pageSource) {
+    // Ignore pages that arrive after a newer one was requested
+    const requestId = ++pageRequest;
+    const result = await pageSource((page - 1) * rowsPerPage, rowsPerPage);
+    if (!result || requestId !== pageRequest) return;
+
+    // The page may no longer exist (e.g. after deleting its last item)
+    const lastPage = Math.ceil(result.total / rowsPerPage);
+    if (page > lastPage && lastPage > 0) return displayData(lastPage);
+
+    items = result.items;
+    totalItems = result.total;
+  } else {
+    totalItems = filteredExpenses.length;
+    const lastPage = Math.ceil(totalItems / rowsPerPage);
+    if (page > lastPage && lastPage > 0) page = lastPage;
+
+    const start = (page - 1) * rowsPerPage;
+    items = filteredExpenses.slice(start, start + rowsPerPage);
+  }
 
-  if (page < 1) page = 1;
-  if (page > pageCount && pageCount > 0) page = pageCount;
   currentPage = page;
+  pageItems = items;
 
-  const start = (currentPage - 1) * rowsPerPage;
-  const end = start + rowsPerPage;
-  const paginatedItems = filteredExpenses.slice(start, end);
-
-  renderExpenses(paginatedItems);
+  document.getElementById("expensesList").innerHTML = "";
+  renderExpenses(items);
 
-  setupPaginationControls(totalItems, pageCount);
+  setupPaginationControls(totalItems, Math.ceil(totalItems / rowsPerPage));
 }
 
 /**
@@ -272,25 +326,71 @@ function renderExpenses(items) {
   });
 }
 
+/**
+ * Searches expense descriptions on the server (ranked, typo-tolerant).
+ * @param {string} term - The search text.
+ * @returns {Promise<Array<Object>>} Matching expenses, best matches first.
+ */
+async function searchExpenses(term) {
+  const token = localStorage.getItem("accessToken");
+  const response = await fetch(
+    `${API_BASE_URL}/expenses/search?q=${encodeURIComponent(term)}`,
+    { headers: { Authorization: `Bearer ${token}` } }
+  );
+
+  if (handleAuthError(response)) return [];
+  return response.ok ? await response.json() : [];
+}
+
 /**
  * Sets up listeners for the Search Bar, Category Dropdown, and Date Picker.
- * Filters the `filteredExpenses` array based on input.
+ * Description search runs on the server and is paged there (with an
+ * estimated total); category and date filters are applied to the full
+ * list, or to the search results, in the browser.
  */
 function setupFilters() {
   const searchInput = document.getElementById("filterSearch");
   const categorySelect = document.getElementById("filterCategory");
   const dateInput = document.getElementById("filterDate");
   const resetBtn = document.getElementById("resetFiltersBtn");
+  let searchTimer = null;
+  let searchRequest = 0;
 
-  function applyFilters() {
+  async function applyFilters() {
     if (!searchInput || !categorySelect || !dateInput) return;
 
-    const searchTerm = searchInput.value.toLowerCase();
+    const searchTerm = searchInput.value.trim();
     const selectedCategory = categorySelect.value;
     const selectedDate = dateInput.value;
 
-    filteredExpenses = allExpenses.filter((exp) => {
-      const matchesSearch = exp.description.toLowerCase().includes(searchTerm);
+    // Ignore responses from searches that were superseded while in flight
+    const requestId = ++searchRequest;
+    const filtersLocally =
+      (selectedCategory !== "" && selectedCategory !== "All Categories") ||
+      selectedDate;
+
+    if (!filtersLocally) {
+      const query = `q=${encodeURIComponent(searchTerm)}&estimate=true`;
+      pageSource = searchTerm
+        ? (skip, limit) => fetchPage(`/expenses/search?${query}`, skip, limit)
+        : (skip, limit) => fetchPage("/expenses/", skip, limit);
+      displayData(1);
+      return;
+    }
+
+    let baseExpenses;
+    try {
+      baseExpenses = searchTerm
+        ? await searchExpenses(searchTerm)
+        : await loadAllExpenses();
+    } catch (error) {
+      console.error("Search error:", error);
+      baseExpenses = [];
+    }
+    if (requestId !== searchRequest) return;
+    pageSource = null;
+
+    filteredExpenses = baseExpenses.filter((exp) => {
       const matchesCategory =
         selectedCategory === "" ||
         selectedCategory === "All Categories" ||
@@ -298,11 +398,11 @@ function setupFilters() {
 
       let matchesDate = true;
       if (selectedDate) {
-        const expDateStr = exp.date.split("T")[0];
+        const expDateStr = exp.local_date;
         matchesDate = expDateStr === selectedDate;
       }
 
-      return matchesSearch && matchesCategory && matchesDate;
+      return matchesCategory && matchesDate;
     });
 
     displayData(1); // Reset to page 1 after filter
@@ -315,12 +415,17 @@ function setupFilters() {
       categorySelect.selectedIndex = 0;
       dateInput.value = "";
 
-      filteredExpenses = [...allExpenses];
+      searchRequest++;
+      pageSource = (skip, limit) => fetchPage("/expenses/", skip, limit);
       displayData(1);
     });
   }
 
-  if (searchInput) searchInput.addEventListener("input", applyFilters);
+  if (searchInput)
+    searchInput.addEventListener("input", () => {
+      clearTimeout(searchTimer);
+      searchTimer = setTimeout(applyFilters, SEARCH_DEBOUNCE_MS);
+    });
   if (categorySelect) categorySelect.addEventListener("change", applyFilters);
   if (dateInput) dateInput.addEventListener("change", applyFilters);
 }
@@ -329,7 +434,7 @@ function setupFilters() {
  * Populates and shows the Edit Modal for a specific expense.
  */
 window.openEditModal = function (id) {
-  const expense = allExpenses.find((e) => e.id === id);
+  const expense = pageItems.find((e) => e.id === id);
   if (!expense) return;
 
   document.getElementById("editExpenseId").value = expense.id;
@@ -337,8 +442,7 @@ window.openEditModal = function (id) {
   document.getElementById("editDesc").value = expense.description;
   document.getElementById("editCategory").value = expense.category;
 
-  const dateStr = expense.date.split("T")[0];
-  document.getElementById("editDate").value = dateStr;
+  document.getElementById("editDate").value = expense.local_date;
 
   const modalEl = document.getElementById("editExpenseModal");
   const modal = new bootstrap.Modal(modalEl);
@@ -358,14 +462,21 @@ async function submitEditExpense() {
   const id = document.getElementById("editExpenseId").value;
   const token = localStorage.getItem("accessToken");
 
-  // Construct ISO date string
   const payload = {
     amount: document.getElementById("editAmount").value,
     description: document.getElementById("editDesc").value,
     category: document.getElementById("editCategory").value,
-    date: new Date(document.getElementById("editDate").value).toISOString(),
   };
 
+  // Only a changed day is sent, as a local date/time (the server applies the
+  // user's timezone), so the time of day is kept otherwise
+  const expense = pageItems.find((e) => e.id === Number(id));
+  const rawDate = document.getElementById("editDate").value;
+  if (!expense || rawDate !== expense.local_date) {
+    const timePart = new Date().toTimeString().split(" ")[0];
+    payload.date = `${rawDate}T${timePart}`;
+  }
+
   try {
     const res = await fetch(`${API_BASE_URL}/expenses/${id}`, {
       method: "PUT",
@@ -406,8 +517,8 @@ window.deleteExpense = async function (id) {
     if (handleAuthError(response)) return;
 
     if (response.status === 204) {
-      // Optimistic UI update: Remove locally without refetching all
-      allExpenses = allExpenses.filter((exp) => exp.id !== id);
+      // Remove locally when filtering in the browser; otherwise refetch the page
+      if (allExpenses) allExpenses = allExpenses.filter((exp) => exp.id !== id);
       filteredExpenses = filteredExpenses.filter((exp) => exp.id !== id);
 
       displayData(currentPage);
@@ -0,0 +1,177 @@
+"""
+Tests of the analytics queries and period-over-period comparisons.
+"""
+
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+from src.app.api.v1.endpoints import analytics
+from src.app.crud import analytics as crud_analytics
+
+Row = namedtuple("Row", ["category", "period_0", "period_1"])
+user = SimpleNamespace(id=1, timezone="UTC")
+
+
+def compare(rows, period):
+    with patch.object(
+        analytics.crud_analytics, "get_period_comparison_data", return_value=rows
+    ) as query:
+        result = analytics.compare_periods(
+            db=MagicMock(), current_user=user, period=period
+        )
+    return result, query
+
+
+def test_months_are_compared_as_half_open_ranges():
+    _, query = compare([], ["2026-12", "2026-11"])
+
+    (_, _, ranges), _ = query.call_args
+    assert ranges == [
+        (date(2026, 12, 1), date(2027, 1, 1)),
+        (date(2026, 11, 1), date(2026, 12, 1)),
+    ]
+
+
+def test_categories_are_ordered_by_base_spending_and_totalled():
+    rows = [
+        Row("Food", Decimal("20"), Decimal("5")),
+        Row("Rent", Decimal("100"), Decimal("100")),
+    ]
+    result, _ = compare(rows, ["2026-10", "2026-09"])
+
+    assert result["periods"] == ["2026-10", "2026-09"]
+    assert [c["category"] for c in result["data"]] == ["Rent", "Food"]
+    assert [p["total_amount"] for p in result["totals"]] == [
+        Decimal("120"),
+        Decimal("105"),
+    ]
+
+
+@pytest.mark.parametrize("period", [["2026-10"], ["2026-10", "October"]])
+def test_invalid_periods_are_rejected(period):
+    with pytest.raises(HTTPException) as raised:
+        compare([], period)
+    assert raised.value.status_code == 422
+
+
+def test_more_spending_than_the_base_is_a_positive_change():
+    period = analytics._compare_period("2026-10", Decimal("150"), Decimal("100"))
+    assert period["delta"] == Decimal("50")
+    assert period["percent_change"] == Decimal("50.0")
+
+
+def test_less_spending_than_the_base_is_a_negative_change():
+    period = analytics._compare_period("2026-10", Decimal("75"), Decimal("100"))
+    assert period["delta"] == Decimal("-25")
+    assert period["percent_change"] == Decimal("-25.0")
+
+
+def test_no_percentage_without_base_spending():
+    period = analytics._compare_period("2026-10", Decimal("40"), Decimal("0"))
+    assert period["delta"] == Decimal("40")
+    assert period["percent_change"] is None
+
+
+BreakdownRow = namedtuple("BreakdownRow", ["category_id", "total", "percentage"])
+
+
+def breakdown(rows, limit=None):
+    names = {1: "Food", 2: "Rent", 3: "Other"}
+    statements = []
+
+    def all_(query):
+        statements.append(query.statement)
+        return rows
+
+    with patch.object(Query, "all", all_), patch.object(
+        crud_analytics.crud_categories, "get_category_names", return_value=names
+    ):
+        result = crud_analytics.get_category_breakdown_data(
+            Session(), 2, month=10, year=2026, limit=limit
+        )
+    return result, str(statements[-1].compile(dialect=postgresql.dialect()))
+
+
+def test_breakdown_percentages_and_order_come_from_one_query():
+    rows = [
+        BreakdownRow(2, Decimal("60"), Decimal("60.0")),
+        BreakdownRow(1, Decimal("40"), Decimal("40.0")),
+    ]
+    result, sql = breakdown(rows)
+
+    assert "OVER ()" in sql
+    assert "row_number() OVER (ORDER BY" in sql
+    assert "CASE WHEN" not in sql
+    assert result == [
+        ("Rent", Decimal("60"), Decimal("60.0")),
+        ("Food", Decimal("40"), Decimal("40.0")),
+    ]
+
+
+def test_breakdown_folds_categories_past_the_limit_into_other():
+    rows = [
+        BreakdownRow(1, Decimal("50"), Decimal("50.0")),
+        BreakdownRow(3, Decimal("10"), Decimal("10.0")),
+        BreakdownRow(None, Decimal("40"), Decimal("40.0")),
+    ]
+    result, sql = breakdown(rows, limit=2)
+
+    assert "CASE WHEN" in sql
+    # The user's own "Other" category is merged into the bucket
+    assert result == [
+        ("Food", Decimal("50"), Decimal("50.0")),
+        (crud_analytics.OTHER_CATEGORY, Decimal("50"), Decimal("50.0")),
+    ]
+
+
+def test_breakdown_without_spending_is_empty():
+    assert breakdown([])[0] == []
+
+
+def test_summary_runs_the_prebuilt_statement_for_its_filters():
+    db = MagicMock()
+    db.scalar.return_value = Decimal("12.50")
+
+    assert crud_analytics.get_total_spent(db, 2, month=10, year=None) == Decimal(
+        "12.50"
+    )
+    assert crud_analytics.get_total_spent(db, 3, month=11, year=None)
+
+    first, second = db.scalar.call_args_list
+    assert first.args[0] is second.args[0] is crud_analytics.TOTAL_SPENT[True, False]
+    assert first.args[1] == {"user_id": 2, "month": 10, "start": None, "end": None}
+    sql = str(first.args[0].compile(dialect=postgresql.dialect()))
+    assert "EXTRACT(month FROM spending_rows.local_date) = %(month)s" in sql
+    assert "%(start)s" not in sql
+
+
+def test_month_of_a_year_is_bound_as_a_date_range():
+    db = MagicMock()
+
+    crud_analytics.get_total_budget(db, 2, month=12, year=2026)
+
+    (statement, params), _ = db.scalar.call_args
+    assert statement is crud_analytics.TOTAL_BUDGET[True, True]
+    assert (params["start"], params["end"]) == (date(2026, 12, 1), date(2027, 1, 1))
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "budgets.month >= %(start)s AND budgets.month < %(end)s" in sql
+    assert "EXTRACT" not in sql
+
+
+def test_all_time_summary_reads_the_lifetime_totals():
+    db = MagicMock()
+    db.scalar.return_value = None
+
+    assert crud_analytics.get_top_category(db, 2, None, None) == "No Data"
+
+    (statement, params), _ = db.scalar.call_args
+    assert statement is crud_analytics.TOP_CATEGORY_ALL_TIME
+    assert params == {"user_id": 2}
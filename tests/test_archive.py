@@ -0,0 +1,103 @@
+"""
+Tests of archiving expenses and reading them back.
+"""
+
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, call, patch
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from src.app.crud import archive as crud_archive
+from src.app.jobs import worker
+
+
+def compiled(selectable):
+    return str(select(selectable).compile(dialect=postgresql.dialect()))
+
+
+def test_expense_rows_unpack_the_archive():
+    sql = compiled(crud_archive.expense_rows(3))
+
+    assert "UNION ALL" in sql
+    assert "unnest(expense_archive.ids, expense_archive.category_ids" in sql
+
+
+def test_expense_rows_skip_archived_years_before_the_start():
+    sql = compiled(crud_archive.expense_rows(3, since=date(2025, 6, 1)))
+
+    assert "expenses.local_date >=" in sql
+    assert "expense_archive.year >=" in sql
+    assert "archived.local_date >=" in sql
+
+
+def test_spending_rows_read_archived_monthly_totals():
+    sql = compiled(crud_archive.spending_rows(3))
+
+    assert "FROM monthly_totals" in sql
+    assert "expense_archive" not in sql
+
+
+def test_archiving_adjusts_the_expense_count():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = 5
+    with patch.object(
+        crud_archive.crud_user_counters, "adjust_user_counters", return_value=9
+    ) as adjust:
+        assert crud_archive.archive_expenses(db, 3, date(2024, 3, 1)) == 5
+
+    assert adjust.call_args_list == [call(db, 3), call(db, 3, expenses=-5)]
+    (_, params), _ = db.execute.call_args
+    assert params == {"user_id": 3, "before": date(2024, 3, 1), "version": 9}
+    assert "INSERT INTO sync_tombstones" in crud_archive.ARCHIVE_EXPENSES.text
+    db.commit.assert_called_once()
+
+
+def test_archive_horizon_waits_for_every_timezone():
+    # Already March 1st east of UTC, still February 28th in UTC and west
+    assert worker.archive_horizon(24, datetime(2026, 3, 1, 5, tzinfo=timezone.utc)) == (
+        date(2024, 2, 1)
+    )
+    assert worker.archive_horizon(
+        24, datetime(2026, 3, 1, 23, tzinfo=timezone.utc)
+    ) == (date(2024, 2, 1))
+    assert worker.archive_horizon(24, datetime(2026, 3, 2, 0, tzinfo=timezone.utc)) == (
+        date(2024, 3, 1)
+    )
+
+
+def test_users_to_archive_are_walked_by_id():
+    db = MagicMock()
+    crud_archive.get_users_to_archive(db, date(2024, 3, 1), after=40)
+
+    (statement,), _ = db.scalars.call_args
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "WHERE users.id > " in sql
+    assert "EXISTS (SELECT expenses.id" in sql
+    assert "ORDER BY users.id" in sql
+    assert "DISTINCT" not in sql
+
+
+def test_archiving_resumes_after_the_last_user():
+    db = MagicMock()
+    with patch.object(
+        crud_archive, "get_users_to_archive", side_effect=[[3, 8], [12], []]
+    ) as users, patch.object(crud_archive, "archive_expenses", return_value=2):
+        assert worker.archive_old_expenses(db, 24) == 6
+
+    assert [c.args[2] for c in users.call_args_list] == [0, 8, 12]
+
+
+def test_archived_local_date_is_read_back_not_recomputed():
+    rows = crud_archive.expense_rows(3, since=date(2025, 1, 1))
+    sql = str(select(rows).compile(dialect=postgresql.dialect()))
+
+    assert "expense_archive.local_dates" in sql
+    assert "archived.local_date >=" in sql
+    assert "timezone(" not in sql
+
+
+def test_archiving_stores_local_dates():
+    sql = crud_archive.ARCHIVE_EXPENSES.text
+    assert "array_agg(local_date ORDER BY date, id)" in sql
+    assert "local_dates = expense_archive.local_dates || excluded.local_dates" in sql
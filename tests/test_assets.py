@@ -0,0 +1,81 @@
+"""
+Tests of the fingerprinted static asset registry.
+"""
+
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from src.app.core.assets import IMMUTABLE_CACHE_CONTROL, AssetRegistry
+
+SCRIPT = b"console.log('cozycash');\n" * 40
+
+
+@pytest.fixture
+def registry(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "js" / "app.js").write_bytes(SCRIPT)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(200))
+
+    registry = AssetRegistry(directory=str(tmp_path), url_prefix="/assets")
+    registry.build()
+    return registry
+
+
+@pytest.fixture
+def client(registry):
+    return TestClient(Starlette(routes=[Mount("/assets", app=registry)]))
+
+
+def test_url_changes_with_the_content(registry, tmp_path):
+    url = registry.url("js/app.js")
+    assert url.startswith("/assets/js/app.") and url.endswith(".js")
+
+    (tmp_path / "js" / "app.js").write_bytes(SCRIPT + b"// changed\n")
+    registry.build()
+    assert registry.url("js/app.js") != url
+
+
+def test_asset_is_served_precompressed_and_immutable(registry, client):
+    response = client.get(
+        registry.url("js/app.js"), headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == SCRIPT
+
+
+def test_binary_assets_are_not_compressed(registry, client):
+    response = client.get(registry.url("logo.png"), headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-type"] == "image/png"
+
+
+def test_refused_encoding_falls_back_to_identity(registry):
+    asset = registry.assets[registry.url("js/app.js")[len("/assets/") :]]
+
+    assert gzip.decompress(asset.encodings["gzip"]) == SCRIPT
+    assert asset.negotiate("gzip;q=0, deflate") == "identity"
+    assert asset.negotiate("deflate, gzip") == "gzip"
+
+
+def test_matching_etag_is_not_modified(registry, client):
+    url = registry.url("js/app.js")
+    etag = client.get(url).headers["etag"]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_unknown_asset_and_method(registry, client):
+    assert client.get("/assets/js/app.000000000000.js").status_code == 404
+    assert client.post(registry.url("js/app.js")).status_code == 405
@@ -0,0 +1,61 @@
+"""
+Tests of the microbenchmark harness and its baseline comparison.
+"""
+
+import json
+import os
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+HARNESS = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "conftest.py")
+
+BENCH = """
+import time
+
+
+def test_sleep(bench):
+    bench(lambda: time.sleep(0.001))
+"""
+
+
+@pytest.fixture
+def suite(pytester):
+    with open(HARNESS) as f:
+        pytester.makeconftest(f.read())
+    pytester.makepyfile(bench_sleep=BENCH)
+    return pytester
+
+
+def run(suite, *args):
+    return suite.runpytest_inprocess(
+        "--bench-rounds", "1", "--bench-min-time", "0.001", *args
+    )
+
+
+def test_results_are_written_as_json(suite):
+    run(suite, "--bench-json", "out.json").assert_outcomes(passed=1)
+
+    with open(suite.path / "out.json") as f:
+        results = json.load(f)["results"]
+    assert results["test_sleep"]["seconds"] >= 0.001
+
+
+def test_slowdown_past_the_threshold_fails(suite):
+    baseline = {"results": {"test_sleep": {"seconds": 0.0001}}}
+    (suite.path / "baseline.json").write_text(json.dumps(baseline))
+
+    result = run(suite, "--bench-json", "out.json", "--bench-baseline", "baseline.json")
+
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*slower than the baseline*"])
+
+
+def test_slowdown_within_the_threshold_passes(suite):
+    baseline = {"results": {"test_sleep": {"seconds": 1.0}}}
+    (suite.path / "baseline.json").write_text(json.dumps(baseline))
+
+    run(
+        suite, "--bench-json", "out.json", "--bench-baseline", "baseline.json"
+    ).assert_outcomes(passed=1)
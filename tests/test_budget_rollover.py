@@ -0,0 +1,64 @@
+"""
+Tests of the budget rollover view.
+"""
+
+from collections import namedtuple
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+from src.app.crud import budgets as crud_budgets
+
+Row = namedtuple(
+    "Row",
+    ["id", "category_id", "month", "amount", "rollover", "carried_over", "spent"],
+)
+
+
+def rollover(rows, month=None):
+    statements = []
+
+    def all_(query):
+        statements.append(query.statement)
+        return rows
+
+    with patch.object(Query, "all", all_), patch.object(
+        crud_budgets.crud_categories, "get_category_names", return_value={3: "Food"}
+    ):
+        result = crud_budgets.get_budget_rollover(Session(), 2, month=month)
+    return result, str(statements[-1].compile(dialect=postgresql.dialect()))
+
+
+def test_carry_is_computed_in_one_statement_without_iterating_months():
+    _, sql = rollover([])
+
+    assert sql.count("SELECT") > 1
+    assert "lag(budgets.rollover) OVER (PARTITION BY budgets.category_id" in sql
+    assert (
+        "min(running.total) OVER (PARTITION BY running.category_id, running.chain "
+        "ORDER BY running.month ROWS BETWEEN UNBOUNDED PRECEDING AND"
+    ) in sql
+    assert "spending_rows.local_date" in sql
+
+
+def test_effective_budget_and_remainder_include_the_carry():
+    rows = [
+        Row(
+            7, 3, date(2026, 10, 1), Decimal("100"), True, Decimal("25"), Decimal("90")
+        ),
+    ]
+    result, sql = rollover(rows, month=date(2026, 10, 1))
+
+    assert "WHERE rollover.month = " in sql
+    ((_, category, _, _, _, carried, effective, spent, remaining),) = result
+    assert category == "Food"
+    assert carried == Decimal("25")
+    assert effective == Decimal("125")
+    assert remaining == Decimal("35")
+
+
+def test_no_budgets_have_no_rollover():
+    assert rollover([])[0] == []
@@ -0,0 +1,70 @@
+"""
+Tests of the counter handling of budget updates and deletes.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.app.crud import budgets as crud_budgets
+
+
+@pytest.fixture
+def writes():
+    calls = MagicMock()
+    with patch.object(
+        crud_budgets.crud_categories, "get_or_create_category_id", calls.category
+    ), patch.object(
+        crud_budgets.crud_user_counters, "lock_user_counters", calls.lock
+    ), patch.object(
+        crud_budgets.crud_user_counters, "adjust_user_counters", calls.adjust
+    ), patch.object(
+        crud_budgets.crud_sync, "record_deletions", calls.tombstone
+    ), patch.object(
+        crud_budgets.crud_changes, "publish_budget_change"
+    ):
+        calls.adjust.return_value = 4
+        yield calls
+
+
+def test_delete_locks_counters_before_reading(writes):
+    db = MagicMock()
+    writes.read.return_value = SimpleNamespace(
+        id=1, category_id=3, month=date(2026, 10, 1)
+    )
+    db.scalars.return_value.first.side_effect = writes.read
+
+    crud_budgets.delete_budget(db, budget_id=1, user_id=2)
+
+    assert [c[0] for c in writes.mock_calls][:2] == ["lock", "read"]
+    writes.adjust.assert_called_once_with(db, 2, budgets=-1)
+    writes.tombstone.assert_called_once_with(db, 2, "budget", [1], 4)
+    db.commit.assert_called_once()
+
+
+def test_duplicate_delete_changes_nothing(writes):
+    db = MagicMock()
+    db.scalars.return_value.first.return_value = None
+
+    assert crud_budgets.delete_budget(db, budget_id=1, user_id=2) is None
+
+    writes.adjust.assert_not_called()
+    writes.tombstone.assert_not_called()
+    db.delete.assert_not_called()
+    db.commit.assert_not_called()
+
+
+def test_update_resolves_the_category_before_locking_counters(writes):
+    db = MagicMock()
+    writes.read.return_value = SimpleNamespace(
+        id=1, category_id=3, month=date(2026, 10, 1)
+    )
+    db.scalars.return_value.first.side_effect = writes.read
+    data = MagicMock()
+    data.model_dump.return_value = {"category": "Food"}
+
+    crud_budgets.update_budget(db, budget_id=1, budget_data=data, user_id=2)
+
+    assert [c[0] for c in writes.mock_calls][:3] == ["category", "lock", "read"]
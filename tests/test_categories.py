@@ -0,0 +1,101 @@
+"""
+Tests of the per-user category dictionary and its cache.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.app.crud import categories as crud_categories
+
+
+class FakeSession(Session):
+    """
+    Session answering `execute()` from a mock and without savepoints.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.results = MagicMock()
+        self.begin_nested = MagicMock()
+
+    def execute(self, statement, params=None, **kwargs):
+        return self.results(statement)
+
+    def get_bind(self, *args, **kwargs):
+        raise AssertionError("categories must not use a second connection")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    crud_categories._cache.clear()
+    yield
+    crud_categories._cache.clear()
+
+
+def session(*loads):
+    db = MagicMock()
+    db.execute.return_value.all.side_effect = list(loads)
+    return db
+
+
+def test_category_ids_are_read_once_per_user():
+    db = session([("Food", 1), ("Rent", 2)])
+
+    assert crud_categories.get_category_ids(db, 2) == {"Food": 1, "Rent": 2}
+    assert crud_categories.get_category_ids(db, 2) == {"Food": 1, "Rent": 2}
+    assert db.execute.call_count == 1
+
+
+def test_unknown_ids_reload_the_names():
+    # "Fun" was created by another worker process after the first load
+    db = session([("Food", 1)], [("Food", 1), ("Fun", 2)])
+    crud_categories.get_category_ids(db, 2)
+
+    names = crud_categories.get_category_names(db, 2, required_ids=[2])
+
+    assert names == {1: "Food", 2: "Fun"}
+    assert crud_categories.get_category_id(db, 2, "Fun") == 2
+    assert db.execute.call_count == 2
+
+
+def created(db, user_id, name, category_id):
+    db.results.return_value.all.return_value = []
+    db.results.return_value.scalar.return_value = category_id
+    return crud_categories.get_or_create_category_id(db, user_id, name)
+
+
+def test_new_category_is_only_cached_after_the_transaction():
+    db = FakeSession()
+    assert created(db, 2, "Food", 1) == 1
+    db.begin_nested.assert_called_once()
+
+    # Not cached while the insert may still be rolled back
+    crud_categories.get_category_ids(db, 2)
+    assert 2 not in crud_categories._cache
+
+    crud_categories._end_transaction(db, SimpleNamespace(parent=None))
+    db.results.return_value.all.return_value = [("Food", 1)]
+    assert crud_categories.get_category_id(db, 2, "Food") == 1
+    assert crud_categories._cache[2] == {"Food": 1}
+
+
+def test_id_race_retries_from_a_savepoint():
+    db = FakeSession()
+    db.results.return_value.all.return_value = []
+    db.results.return_value.scalar.side_effect = [
+        IntegrityError("insert", {}, Exception("duplicate key")),
+        2,
+    ]
+    assert crud_categories.get_or_create_category_id(db, 2, "Fun") == 2
+    assert db.begin_nested.call_count == 2
+
+
+def test_category_committed_concurrently_is_read_back():
+    db = FakeSession()
+    db.results.return_value.scalar_one.return_value = 3
+    assert created(db, 2, "Rent", None) == 3
+    assert crud_categories._UNCOMMITTED not in db.info
@@ -0,0 +1,120 @@
+"""
+Tests of the change event brokers and stream tickets.
+"""
+
+import asyncio
+import hashlib
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from src.app.api import deps
+from src.app.core import events
+from src.app.core.events import (
+    InMemoryEventBroker,
+    PgNotifyEventBroker,
+    create_event_broker,
+)
+from src.app.crud import stream_tickets as crud_stream_tickets
+
+
+def notified_payload(engine: MagicMock) -> dict:
+    conn = engine.connect.return_value.__enter__.return_value
+    (statement,), _ = conn.execute.call_args
+    channel, payload = statement.compile().params.values()
+    assert channel == events.NOTIFY_CHANNEL
+    conn.commit.assert_called_once()
+    return json.loads(payload)
+
+
+def test_several_workers_share_events_through_postgres():
+    connect, engine = MagicMock(), MagicMock()
+
+    assert isinstance(
+        create_event_broker("auto", 4, connect, engine), PgNotifyEventBroker
+    )
+    assert isinstance(
+        create_event_broker("auto", 1, connect, engine), InMemoryEventBroker
+    )
+    assert isinstance(
+        create_event_broker("memory", 4, connect, engine), InMemoryEventBroker
+    )
+    assert isinstance(
+        create_event_broker("postgres", 1, connect, engine), PgNotifyEventBroker
+    )
+
+
+def test_events_are_published_as_notifications():
+    engine = MagicMock()
+    broker = PgNotifyEventBroker(MagicMock(), lambda: engine)
+
+    broker.publish(7, "change", {"id": 3})
+
+    assert notified_payload(engine) == {
+        "user_id": 7,
+        "message": events.format_event("change", {"id": 3}),
+    }
+
+
+def test_oversized_events_are_replaced_by_resync():
+    engine = MagicMock()
+    broker = PgNotifyEventBroker(MagicMock(), lambda: engine)
+
+    broker.publish(7, "change", {"note": "x" * events.MAX_NOTIFY_PAYLOAD})
+
+    assert notified_payload(engine) == {"user_id": 7, "message": events.RESYNC_EVENT}
+
+
+def test_notifications_reach_the_local_streams_of_their_user():
+    broker = PgNotifyEventBroker(MagicMock(), MagicMock())
+    message = events.format_event("change", {"id": 3})
+
+    async def scenario():
+        mine, other = broker.subscribe(7), broker.subscribe(8)
+        broker.receive(json.dumps({"user_id": 7, "message": message}))
+        broker.receive("not json")
+        assert await asyncio.wait_for(mine.get(), 1) == message
+        await asyncio.sleep(0)
+        assert other._queue.empty()
+
+    asyncio.run(scenario())
+
+
+def test_stream_tickets_are_stored_as_digests():
+    db = MagicMock()
+
+    ticket = crud_stream_tickets.create_stream_ticket(db, 7, 30)
+
+    (row,), _ = db.add.call_args
+    assert row.user_id == 7
+    assert row.ticket_hash == hashlib.sha256(ticket.encode()).hexdigest()
+    db.commit.assert_called_once()
+
+
+def test_stream_tickets_are_consumed_when_redeemed():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = 7
+    user = SimpleNamespace(id=7, shard=0)
+
+    with patch.object(deps.crud_users, "get_user_by_id", return_value=user):
+        assert deps.get_current_user_from_ticket(db, "abc") is user
+
+    (statement,), _ = db.execute.call_args
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("DELETE FROM stream_tickets")
+    assert "expires_at > now()" in sql
+    assert "RETURNING stream_tickets.user_id" in sql
+    db.commit.assert_called_once()
+
+
+def test_used_or_expired_stream_tickets_are_rejected():
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = None
+
+    with pytest.raises(HTTPException) as raised:
+        deps.get_current_user_from_ticket(db, "abc")
+    assert raised.value.status_code == 401
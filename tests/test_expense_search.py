@@ -0,0 +1,54 @@
+"""
+Tests of the expense description search.
+"""
+
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from src.app.crud import expenses as crud_expenses
+
+
+def search(q):
+    db = MagicMock()
+    query = db.query.return_value
+    query.filter.return_value = query
+    query.order_by.return_value = query
+    query.offset.return_value = query
+    query.limit.return_value = query
+    crud_expenses.search_expenses(db, user_id=7, q=q, skip=20, limit=10)
+
+    compiled = [
+        condition.compile(dialect=postgresql.dialect())
+        for condition in query.filter.call_args.args
+    ]
+    sql = " AND ".join(str(condition) for condition in compiled)
+    params = {}
+    for condition in compiled:
+        params.update(condition.params)
+    return query, sql, params
+
+
+def test_search_is_limited_to_the_user_and_paginated():
+    query, sql, params = search("coffee")
+
+    assert "expenses.user_id = %(user_id_1)s" in sql
+    assert params["user_id_1"] == 7
+    query.offset.assert_called_once_with(20)
+    query.limit.assert_called_once_with(10)
+
+
+def test_search_matches_text_substring_and_trigrams():
+    _, sql, params = search("coffee")
+
+    assert "expenses.description_search @@ websearch_to_tsquery" in sql
+    assert "expenses.description ILIKE" in sql
+    assert "expenses.description %" in sql
+    assert "%coffee%" in params.values()
+
+
+def test_like_wildcards_in_the_query_are_escaped():
+    _, sql, params = search("100%_off")
+
+    assert "ESCAPE '/'" in sql
+    assert "%100/%/_off%" in params.values()
@@ -0,0 +1,276 @@
+"""
+Tests of expense reads and writes.
+"""
+
+import threading
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from src.app.core.group_commit import GroupCommitter
+from src.app.crud import expenses as crud_expenses
+
+
+@pytest.fixture
+def writes():
+    """
+    Patches the category, counter, totals and tombstone writes; yields a mock whose
+    children record them in call order.
+    """
+    calls = MagicMock()
+    with patch.object(
+        crud_expenses.crud_categories, "get_or_create_category_id", calls.category
+    ), patch.object(
+        crud_expenses.crud_user_counters, "lock_user_counters", calls.lock
+    ), patch.object(
+        crud_expenses.crud_user_counters, "adjust_user_counters", calls.adjust
+    ), patch.object(
+        crud_expenses.crud_category_totals, "adjust_category_totals", calls.totals
+    ), patch.object(
+        crud_expenses.crud_sync, "record_deletions", calls.tombstone
+    ), patch.object(
+        crud_expenses.crud_changes, "publish_expense_change"
+    ):
+        calls.category.return_value = 4
+        calls.adjust.return_value = 7
+        yield calls
+
+
+def expense():
+    return SimpleNamespace(
+        id=1,
+        user_id=2,
+        category_id=3,
+        amount=Decimal("12.50"),
+        date=datetime(2026, 10, 1, 12),
+        local_date=date(2026, 10, 1),
+    )
+
+
+def locked_read(db, writes):
+    db.scalars.return_value.first.side_effect = writes.read
+
+
+def test_delete_locks_counters_before_reading(writes):
+    db = MagicMock()
+    locked_read(db, writes)
+    writes.read.return_value = expense()
+
+    crud_expenses.delete_expense(db, expense_id=1, user_id=2)
+
+    assert [c[0] for c in writes.mock_calls][:2] == ["lock", "read"]
+    writes.adjust.assert_called_once_with(db, 2, expenses=-1)
+    writes.totals.assert_called_once_with(db, 2, {3: (Decimal("-12.50"), -1)})
+    writes.tombstone.assert_called_once_with(db, 2, "expense", [1], 7)
+    db.commit.assert_called_once()
+
+
+def test_duplicate_delete_changes_nothing(writes):
+    # The second of two concurrent deletes reads the row after the first one
+    # committed, under the counter lock, and finds it gone
+    db = MagicMock()
+    locked_read(db, writes)
+    writes.read.return_value = None
+
+    assert crud_expenses.delete_expense(db, expense_id=1, user_id=2) is None
+
+    assert writes.lock.call_args == call(db, 2)
+    writes.adjust.assert_not_called()
+    writes.totals.assert_not_called()
+    writes.tombstone.assert_not_called()
+    db.delete.assert_not_called()
+    db.commit.assert_not_called()
+    db.rollback.assert_called_once()
+
+
+def test_update_resolves_the_category_before_locking_counters(writes):
+    db = MagicMock()
+    locked_read(db, writes)
+    writes.read.return_value = expense()
+    data = MagicMock()
+    data.model_dump.return_value = {"category": "Food", "amount": Decimal("20")}
+
+    crud_expenses.update_expense(db, expense_id=1, expense_data=data, user_id=2)
+
+    assert [c[0] for c in writes.mock_calls][:3] == ["category", "lock", "read"]
+    writes.totals.assert_called_once_with(
+        db, 2, {3: (Decimal("-12.50"), -1), 4: (Decimal("20"), 1)}
+    )
+
+
+def test_recent_expenses_break_date_ties_by_id():
+    db = MagicMock()
+    crud_expenses.get_recent_expenses(db, user_id=2)
+
+    order = db.query.return_value.filter.return_value.order_by.call_args.args
+    assert [str(c) for c in order] == ["expenses.date DESC", "expenses.id DESC"]
+
+
+def test_time_without_offset_is_the_users_local_time():
+    expense = SimpleNamespace(date=datetime(2026, 10, 1, 23, 30))
+
+    crud_expenses._set_local_date(expense, user_id=2)
+
+    assert expense.local_date == date(2026, 10, 1)
+    assert str(expense.date).startswith("timezone((SELECT users.timezone")
+
+
+def test_local_day_of_an_aware_time_is_computed_by_the_database():
+    when = datetime(2026, 10, 1, 23, 30, tzinfo=timezone.utc)
+    expense = SimpleNamespace(date=when)
+
+    crud_expenses._set_local_date(expense, user_id=2)
+
+    assert expense.date is when
+    assert str(expense.local_date).startswith("CAST(timezone((SELECT users.timezone")
+
+
+def submit_together(committer, items):
+    results = {}
+    threads = [
+        threading.Thread(target=lambda i=i: results.update({i: committer.submit(i)}))
+        for i in items
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_creates_share_one_flush():
+    flushed = []
+
+    def flush(items):
+        flushed.append(sorted(items))
+        return [f"expense {item}" for item in items]
+
+    committer = GroupCommitter(flush, window=0.5, max_batch=3)
+    results = submit_together(committer, range(3))
+
+    assert flushed == [[0, 1, 2]]
+    assert results == {i: f"expense {i}" for i in range(3)}
+    assert (committer.batches, committer.items) == (1, 3)
+
+
+def test_failed_batch_is_retried_one_by_one():
+    def flush(items):
+        if 1 in items:
+            raise ValueError("invalid")
+        return list(items)
+
+    committer = GroupCommitter(flush, window=0.5, max_batch=3)
+    results = submit_together(committer, [0, 2])
+    with pytest.raises(ValueError):
+        committer.submit(1)
+
+    assert results == {0: 0, 2: 2}
+
+
+def test_create_with_before_commit_is_not_grouped(writes):
+    db = MagicMock()
+    data = MagicMock()
+    data.model_dump.return_value = {"category": "Food", "amount": Decimal("20")}
+    settings = SimpleNamespace(expense_group_commit=True)
+    with patch.object(
+        crud_expenses, "get_settings", return_value=settings
+    ), patch.object(crud_expenses, "_get_group_committer") as committer, patch.object(
+        crud_expenses, "_set_local_date"
+    ), patch.object(
+        crud_expenses, "_publish_change"
+    ):
+        crud_expenses.create_expense(db, data, user_id=2, before_commit=MagicMock())
+
+    committer.assert_not_called()
+    db.commit.assert_called_once()
+
+
+def create_in_group(db, category_id):
+    order = MagicMock()
+    db.commit.side_effect = order.commit
+    db.close.side_effect = order.close
+    settings = SimpleNamespace(expense_group_commit=True)
+    committer = SimpleNamespace(submit=order.submit)
+    data = SimpleNamespace(model_dump=lambda: {"category": "Food", "amount": 1})
+    with patch.object(
+        crud_expenses, "get_settings", return_value=settings
+    ), patch.object(
+        crud_expenses, "_get_group_committer", return_value=committer
+    ), patch.object(
+        crud_expenses.crud_categories, "get_category_id", return_value=category_id
+    ), patch.object(
+        crud_expenses.crud_categories, "get_or_create_category_id", return_value=4
+    ):
+        crud_expenses.create_expense(db, data, user_id=2)
+    return order
+
+
+def test_group_commit_releases_the_connection_before_waiting():
+    order = create_in_group(MagicMock(), category_id=3)
+
+    assert [c[0] for c in order.mock_calls] == ["close", "submit"]
+    order.submit.assert_called_once_with((2, {"amount": 1, "category_id": 3}, "Food"))
+
+
+def test_group_commit_commits_a_new_category_first():
+    order = create_in_group(MagicMock(), category_id=None)
+
+    assert [c[0] for c in order.mock_calls] == ["commit", "submit"]
+    order.submit.assert_called_once_with((2, {"amount": 1, "category_id": 4}, "Food"))
+
+
+def test_batch_is_not_retried_when_publishing_fails():
+    flushed = []
+
+    def flush(items):
+        flushed.append(list(items))
+        return [f"expense {item}" for item in items]
+
+    def publish(results):
+        raise RuntimeError("broker down")
+
+    committer = GroupCommitter(flush, window=0.05, max_batch=2, after_commit=publish)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(committer.submit(i)))
+        for i in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert flushed == [[0, 1]]
+    assert sorted(results) == ["expense 0", "expense 1"]
+
+
+def test_batch_expenses_come_from_the_insert_and_are_not_published():
+    db = MagicMock()
+    db.execute.return_value.all.side_effect = [
+        [(2, "UTC")],
+        [
+            SimpleNamespace(_mapping={"id": 10, "user_id": 2, "category_id": 3}),
+            SimpleNamespace(_mapping={"id": 11, "user_id": 2, "category_id": 3}),
+        ],
+    ]
+    items = [
+        (2, {"category_id": 3, "amount": 1, "date": datetime(2026, 1, 1)}, "Food"),
+        (2, {"category_id": 3, "amount": 2, "date": datetime(2026, 1, 2)}, "Food"),
+    ]
+    with patch.object(crud_expenses, "SessionLocal", return_value=db), patch.object(
+        crud_expenses, "_publish_change"
+    ) as publish, patch.object(
+        crud_expenses.crud_user_counters, "adjust_user_counters", return_value=7
+    ), patch.object(
+        crud_expenses.crud_category_totals, "adjust_category_totals"
+    ):
+        expenses = crud_expenses._create_expense_batch(None, items)
+
+    assert [e.id for e in expenses] == [10, 11]
+    assert [e.category for e in expenses] == ["Food", "Food"]
+    db.scalars.assert_not_called()
+    db.commit.assert_called_once()
+    publish.assert_not_called()
@@ -0,0 +1,48 @@
+"""
+Tests of the month-end spending forecast.
+"""
+
+from datetime import date
+
+from src.app.core.forecast import forecast_month_end, history_start
+
+
+def test_history_starts_on_the_first_of_an_earlier_month():
+    assert history_start(date(2026, 2, 10), 3) == date(2025, 11, 1)
+
+
+def test_no_spending_has_no_forecast():
+    assert forecast_month_end([], date(2026, 10, 10), 12) == {}
+
+
+def test_without_history_the_pace_is_kept():
+    rows = [("Food", date(2026, 11, day), 10.0) for day in range(1, 11)]
+
+    assert forecast_month_end(rows, date(2026, 11, 10), 12) == {"Food": (100.0, 300.0)}
+
+
+def test_spending_done_early_in_the_month_is_not_extrapolated():
+    rows = [("Rent", date(2026, month, 1), 1000.0) for month in (8, 9, 10)]
+
+    assert forecast_month_end(rows, date(2026, 10, 15), 2) == {"Rent": (1000.0, 1000.0)}
+
+
+def test_monthly_totals_follow_their_trend():
+    rows = [
+        ("Travel", date(2026, 7, 28), 100.0),
+        ("Travel", date(2026, 8, 28), 200.0),
+        ("Travel", date(2026, 9, 28), 300.0),
+    ]
+
+    assert forecast_month_end(rows, date(2026, 10, 10), 3) == {"Travel": (0.0, 400.0)}
+
+
+def test_rows_outside_the_window_are_ignored():
+    rows = [
+        ("Food", date(2026, 10, 5), 50.0),
+        ("Food", date(2026, 10, 20), 999.0),
+        ("Food", date(2025, 1, 5), 999.0),
+    ]
+
+    spent, _ = forecast_month_end(rows, date(2026, 10, 10), 3)["Food"]
+    assert spent == 50.0
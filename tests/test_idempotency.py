@@ -0,0 +1,83 @@
+"""
+Tests of idempotency keys sharing the transaction of the write they guard.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from src.app.api import idempotency
+
+
+class Payload(BaseModel):
+    amount: int
+
+
+class Response(BaseModel):
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+@pytest.fixture
+def keys():
+    calls = MagicMock()
+    with patch.object(
+        idempotency.crud_idempotency, "claim_idempotency_key", calls.claim
+    ), patch.object(
+        idempotency.crud_idempotency, "save_idempotent_response", calls.save
+    ):
+        calls.claim.return_value = None
+        yield calls
+
+
+def test_key_is_claimed_and_saved_in_the_request_session(keys):
+    db = MagicMock()
+    with idempotency.idempotent_request(
+        db, 2, "k", "POST /x/", Payload(amount=1), 201
+    ) as request:
+        assert request.replay is None
+        request.before_commit(Response)(SimpleNamespace(id=5))
+
+    assert keys.claim.call_args.args[:3] == (db, 2, "k")
+    keys.save.assert_called_once_with(db, 2, "k", 201, {"id": 5})
+    db.get_bind.assert_not_called()
+    db.rollback.assert_not_called()
+
+
+def test_failed_request_releases_its_key(keys):
+    db = MagicMock()
+    with pytest.raises(HTTPException):
+        with idempotency.idempotent_request(
+            db, 2, "k", "POST /x/", Payload(amount=1), 201
+        ):
+            raise HTTPException(status_code=400)
+
+    keys.save.assert_not_called()
+    db.rollback.assert_called_once()
+
+
+def test_stored_response_is_replayed(keys):
+    db = MagicMock()
+    fingerprint = idempotency._fingerprint("POST /x/", Payload(amount=1))
+    keys.claim.return_value = SimpleNamespace(
+        fingerprint=fingerprint, response_status=201, response_body={"id": 5}
+    )
+    with idempotency.idempotent_request(
+        db, 2, "k", "POST /x/", Payload(amount=1), 201
+    ) as request:
+        assert request.replay.status_code == 201
+        assert request.replay.headers["Idempotent-Replayed"] == "true"
+
+
+def test_without_key_nothing_is_stored(keys):
+    db = MagicMock()
+    with idempotency.idempotent_request(
+        db, 2, None, "POST /x/", Payload(amount=1), 201
+    ) as request:
+        assert request.before_commit(Response) is None
+    keys.claim.assert_not_called()
+    db.execute.assert_not_called()
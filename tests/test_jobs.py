@@ -0,0 +1,145 @@
+"""
+Tests of job parameter validation.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from src.app.crud import jobs as crud_jobs
+from src.app.jobs import worker
+from src.app.schemas.jobs import JobCreate
+
+jobs = TypeAdapter(JobCreate)
+
+
+def test_params_are_validated_for_their_kind():
+    job = jobs.validate_python(
+        {"kind": "export_expenses", "params": {"start": "2026-01-01"}}
+    )
+    assert job.params.model_dump(mode="json", exclude_none=True) == {
+        "start": "2026-01-01"
+    }
+    assert jobs.validate_python({"kind": "category_breakdown"}).params.end_year is None
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"kind": "export_expenses", "params": {"start": "yesterday"}},
+        {"kind": "export_expenses", "params": {"start_year": 2020}},
+        {
+            "kind": "export_expenses",
+            "params": {"start": "2026-02-01", "end": "2026-01-01"},
+        },
+        {"kind": "category_breakdown", "params": {"end_year": "soon"}},
+        {
+            "kind": "category_breakdown",
+            "params": {"start_year": 2026, "end_year": 2020},
+        },
+        {"kind": "cleanup"},
+    ],
+)
+def test_invalid_jobs_are_rejected(body):
+    with pytest.raises(ValidationError):
+        jobs.validate_python(body)
+
+
+def test_job_with_invalid_stored_params_fails_without_retry():
+    db = MagicMock()
+    job = SimpleNamespace(
+        id=4, kind="export_expenses", user_id=2, params={"start": "yesterday"}
+    )
+    handler = MagicMock()
+    with patch.object(worker, "get_shard_session", return_value=db), patch.object(
+        worker.crud_jobs, "claim_job", return_value=job
+    ), patch.object(worker.crud_jobs, "fail_job") as fail_job, patch.dict(
+        worker.JOB_HANDLERS, {"export_expenses": handler}
+    ):
+        assert worker.run_once("w1") is True
+
+    handler.assert_not_called()
+    assert fail_job.call_args.kwargs == {"retry": False}
+
+
+def test_expired_job_without_attempts_left_is_failed_not_reclaimed():
+    db = MagicMock()
+    expired = SimpleNamespace(status="running", attempts=3, max_attempts=3)
+    queued = SimpleNamespace(status="queued", attempts=0, max_attempts=3)
+    claims = db.query.return_value.filter.return_value.order_by.return_value
+    claims.with_for_update.return_value.first.side_effect = [expired, queued]
+
+    assert crud_jobs.claim_job(db, "w1", 300) is queued
+
+    assert expired.status == "failed"
+    assert expired.locked_by is None
+    assert queued.status == "running"
+    assert queued.locked_by == "w1"
+    assert db.commit.call_count == 2
+
+
+def test_expired_job_with_attempts_left_is_reclaimed():
+    db = MagicMock()
+    expired = SimpleNamespace(status="running", attempts=1, max_attempts=3)
+    claims = db.query.return_value.filter.return_value.order_by.return_value
+    claims.with_for_update.return_value.first.side_effect = [expired]
+
+    assert crud_jobs.claim_job(db, "w2", 300) is expired
+    assert expired.locked_by == "w2"
+
+
+def test_job_limit_is_checked_under_a_per_user_lock():
+    db = MagicMock()
+    calls = MagicMock()
+    db.execute.side_effect = calls.lock
+    with patch.object(crud_jobs, "count_active_jobs", calls.count):
+        calls.count.return_value = 3
+        assert crud_jobs.create_job(db, 2, "export_expenses", {}, 3, 3) is None
+
+    assert [c[0] for c in calls.mock_calls] == ["lock", "count"]
+    (lock,), _ = calls.lock.call_args
+    assert "pg_advisory_xact_lock" in str(lock)
+    db.add.assert_not_called()
+    db.rollback.assert_called_once()
+
+
+def test_job_is_created_below_the_limit():
+    db = MagicMock()
+    with patch.object(crud_jobs, "count_active_jobs", return_value=2):
+        job = crud_jobs.create_job(db, 2, "export_expenses", {}, 3, 3)
+
+    assert job.user_id == 2
+    db.add.assert_called_once_with(job)
+    db.commit.assert_called_once()
+
+
+def test_job_file_is_stored_apart_from_the_result():
+    db = MagicMock()
+    db.execute.return_value.rowcount = 1
+    file = crud_jobs.JobFile("expenses-2.csv", "text/csv", b"id\n1\n", rows=1)
+
+    assert crud_jobs.complete_job(db, 4, "w1", file)
+
+    (update,), _ = db.execute.call_args_list[0]
+    (insert,), _ = db.execute.call_args_list[1]
+    result = update.compile().params["result"]
+    assert result == {
+        "filename": "expenses-2.csv",
+        "content_type": "text/csv",
+        "rows": 1,
+        "size": 5,
+    }
+    assert insert.table.name == "job_files"
+    assert insert.compile().params["content"] == b"id\n1\n"
+    db.commit.assert_called_once()
+
+
+def test_job_file_is_not_stored_for_a_lost_lease():
+    db = MagicMock()
+    db.execute.return_value.rowcount = 0
+    file = crud_jobs.JobFile("expenses-2.csv", "text/csv", b"id\n", rows=0)
+
+    assert not crud_jobs.complete_job(db, 4, "w1", file)
+    assert db.execute.call_count == 1
@@ -0,0 +1,113 @@
+"""
+Tests of which requests the load shedding middleware rejects and counts.
+"""
+
+import anyio
+import pytest
+
+from src.app.core import load_shedding
+from src.app.core.load_shedding import LoadSheddingMiddleware
+from src.app.core.config import get_settings
+
+
+async def ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def middleware(in_flight: int, app=ok) -> LoadSheddingMiddleware:
+    settings = get_settings()
+    shedder = LoadSheddingMiddleware(
+        app,
+        low_priority_prefixes=settings.shed_low_priority_prefixes,
+        max_in_flight=1,
+        max_pool_utilization=0.9,
+        max_threadpool_queue=20,
+        retry_after_seconds=5,
+        pool_utilization=lambda: 0.0,
+        untracked_prefixes=settings.shed_untracked_prefixes,
+    )
+    shedder.in_flight = in_flight
+    return shedder
+
+
+def status_of(shedder: LoadSheddingMiddleware, path: str) -> int:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request"}
+
+    anyio.run(shedder, {"type": "http", "path": path}, receive, send)
+    return sent[0]["status"]
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/v1/analytics/summary",
+        "/api/v1/dashboard/",
+        "/api/v1/expenses/search",
+        "/api/v1/jobs/",
+        "/api/v1/jobs/3/result",
+        "/api/v1/events",
+    ],
+)
+def test_low_priority_requests_are_shed_under_overload(path):
+    assert status_of(middleware(in_flight=1), path) == 503
+    assert status_of(middleware(in_flight=0), path) == 200
+
+
+def test_writes_are_not_shed():
+    assert status_of(middleware(in_flight=1), "/api/v1/expenses/") == 200
+
+
+def test_open_streams_are_not_counted_in_flight():
+    seen = []
+
+    async def stream(scope, receive, send):
+        seen.append(shedder.in_flight)
+        await ok(scope, receive, send)
+
+    shedder = middleware(in_flight=0, app=stream)
+    status_of(shedder, "/api/v1/events")
+    status_of(shedder, "/api/v1/expenses/")
+    assert seen == [0, 1]
+
+
+def test_requests_are_shed_on_time_in_queue():
+    shedder = middleware(in_flight=0)
+    shedder.max_queue_wait = 0.25
+    for _ in range(10):
+        shedder.record_queue_wait(1.0)
+
+    assert shedder.overload_reason() == "queue_wait"
+    assert status_of(shedder, "/api/v1/analytics/summary") == 503
+    assert status_of(shedder, "/api/v1/expenses/") == 200
+
+
+def test_time_in_queue_decays_once_the_queue_drains(monkeypatch):
+    shedder = middleware(in_flight=0)
+    shedder.max_queue_wait = 0.25
+    for _ in range(10):
+        shedder.record_queue_wait(1.0)
+
+    later = shedder._queue_wait_at + 10 * load_shedding.QUEUE_WAIT_HALF_LIFE
+    monkeypatch.setattr(load_shedding.time, "monotonic", lambda: later)
+    assert shedder.queue_wait() < shedder.max_queue_wait
+
+
+def test_handlers_report_their_time_in_queue():
+    from fastapi.testclient import TestClient
+    from src.app.main import create_app
+
+    app = create_app()
+    with TestClient(app) as client:
+        client.get("/api/v1/expenses/")
+
+    layer = app.middleware_stack
+    while not isinstance(layer, LoadSheddingMiddleware):
+        layer = layer.app
+    assert layer._queue_wait > 0
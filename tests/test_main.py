@@ -0,0 +1,44 @@
+"""
+Tests of building the application.
+"""
+
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from src.app.core.load_shedding import LoadSheddingMiddleware
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_main_imports_without_environment():
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if name in ("PATH", "HOME", "LANG", "SYSTEMROOT")
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.app.main as m; print(type(m.app).__name__)"],
+        cwd=ROOT,
+        env={**env, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "FastAPI"
+
+
+def test_load_shedding_is_configured_when_the_app_starts():
+    from src.app.main import create_app
+
+    app = create_app()
+    assert app.middleware_stack is None
+    with TestClient(app) as client:
+        assert client.get("/api/v1/openapi.json").status_code == 200
+
+    layer = app.middleware_stack
+    while layer is not None and not isinstance(layer, LoadSheddingMiddleware):
+        layer = getattr(layer, "app", None)
+    assert isinstance(layer, LoadSheddingMiddleware)
@@ -0,0 +1,78 @@
+"""
+Tests of sparse fieldsets and columnar list responses.
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+from src.app.api.projection import parse_fields, projected_response
+from src.app.crud import expenses as crud_expenses
+
+ROWS = [
+    (Decimal("4.50"), "Food", datetime(2026, 10, 2, 9, 30)),
+    (Decimal("12.00"), "Fuel", datetime(2026, 10, 1, 18, 0)),
+]
+FIELDS = ["amount", "category", "date"]
+
+
+def test_fields_are_deduplicated_in_order():
+    assert parse_fields(" date,amount,date ", FIELDS) == ["date", "amount"]
+    assert parse_fields(None, FIELDS) is None
+
+
+@pytest.mark.parametrize("fields", ["", ",", "amount,password"])
+def test_empty_or_unknown_fields_are_rejected(fields):
+    with pytest.raises(HTTPException) as raised:
+        parse_fields(fields, FIELDS)
+    assert raised.value.status_code == 422
+
+
+def test_rows_are_encoded_like_the_response_models():
+    body = json.loads(projected_response(ROWS, FIELDS, columnar=False).body)
+
+    assert body[0] == {
+        "amount": "4.50",
+        "category": "Food",
+        "date": "2026-10-02T09:30:00",
+    }
+
+
+def test_columnar_format_has_one_array_per_field():
+    body = json.loads(projected_response(ROWS, FIELDS, columnar=True).body)
+    assert body["category"] == ["Food", "Fuel"]
+
+    empty = json.loads(projected_response([], FIELDS, columnar=True).body)
+    assert empty == {"amount": [], "category": [], "date": []}
+
+
+def projected_sql(fields):
+    statements = []
+
+    def all_(query):
+        statements.append(query.statement)
+        return []
+
+    with patch.object(Query, "all", all_):
+        crud_expenses.get_expenses(Session(), user_id=2, fields=fields)
+    return str(statements[0].compile(dialect=postgresql.dialect()))
+
+
+def test_only_the_requested_columns_are_selected():
+    sql = projected_sql(["amount", "date"])
+
+    assert sql.startswith("SELECT expenses.amount, expenses.date \nFROM expenses")
+    assert "categories" not in sql
+
+
+def test_categories_are_joined_only_for_the_category_field():
+    sql = projected_sql(["category", "amount"])
+
+    assert sql.startswith("SELECT categories.name, expenses.amount")
+    assert "JOIN categories ON categories.user_id = expenses.user_id" in sql
@@ -0,0 +1,74 @@
+"""
+Tests of the token-bucket rate limits on login and sign-up.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from src.app.api import deps
+from src.app.core import rate_limit
+from src.app.core.config import get_settings
+from src.app.core.rate_limit import InMemoryTokenBucketStore, RateLimit
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = InMemoryTokenBucketStore()
+    monkeypatch.setattr(rate_limit, "_store", store)
+    return store
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    store = InMemoryTokenBucketStore()
+    limit = RateLimit(capacity=2, period_seconds=60)
+
+    assert store.consume("k", limit) == 0.0
+    assert store.consume("k", limit) == 0.0
+    assert store.consume("k", limit) == pytest.approx(30.0)
+
+    clock[0] += 30
+    assert store.consume("k", limit) == 0.0
+
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    store = InMemoryTokenBucketStore(max_keys=2)
+    limit = RateLimit(capacity=1, period_seconds=60)
+    store.consume("a", limit)
+    store.consume("b", limit)
+    store.consume("c", limit)
+
+    assert list(store._buckets) == ["b", "c"]
+    assert store.consume("a", limit) == 0.0
+
+
+def test_login_is_limited_per_account(clock, store):
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+    form = SimpleNamespace(username=" Ana@Example.com ")
+    for _ in range(get_settings().login_attempts_per_account):
+        deps.limit_login_attempts(request, form)
+
+    other_ip = SimpleNamespace(client=SimpleNamespace(host="10.0.0.2"))
+    with pytest.raises(HTTPException) as exc:
+        deps.limit_login_attempts(other_ip, SimpleNamespace(username="ana@example.com"))
+
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+
+def test_signups_are_limited_per_ip(clock, store):
+    request = SimpleNamespace(client=SimpleNamespace(host="10.0.0.1"))
+    for _ in range(get_settings().signups_per_ip):
+        deps.limit_signups(request)
+
+    with pytest.raises(HTTPException) as exc:
+        deps.limit_signups(request)
+    assert exc.value.status_code == 429
@@ -0,0 +1,26 @@
+"""
+Tests of copying a user's rows to another shard.
+"""
+
+from unittest.mock import MagicMock
+
+from src.app.db import rebalance
+
+
+def test_archived_expense_ids_are_drawn_from_the_target():
+    source, target = MagicMock(), MagicMock()
+    archive = {"user_id": 2, "year": 2024, "ids": [10, 11, 12], "amounts": [1, 2, 3]}
+
+    def rows(statement):
+        table = statement.get_final_froms()[0].name
+        return MagicMock(
+            mappings=lambda: [archive] if table == "expense_archive" else []
+        )
+
+    source.execute.side_effect = rows
+    target.execute.return_value.scalars.return_value = iter([501, 502, 503])
+
+    assert rebalance._copy_user_rows(source, target, 2) == 1
+
+    (_, batch), _ = target.execute.call_args
+    assert batch == [{**archive, "ids": [501, 502, 503]}]
@@ -0,0 +1,111 @@
+"""
+Tests of delta sync cursors, paging and tombstones.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1.endpoints import sync as sync_endpoints
+from src.app.crud import sync as crud_sync
+
+user = SimpleNamespace(id=2)
+
+
+def test_cursor_round_trips():
+    assert crud_sync.decode_cursor(crud_sync.encode_cursor((12, 1, 40))) == (
+        12,
+        1,
+        40,
+    )
+
+
+@pytest.mark.parametrize("value", ["12.1", "12.4.1", "-1.0.0", "a.b.c", ""])
+def test_malformed_cursors_are_rejected(value):
+    with pytest.raises(ValueError):
+        crud_sync.decode_cursor(value)
+
+
+def changes(db_rows, cursor=None, limit=500, state=(9, 0)):
+    db = MagicMock()
+    db.execute.return_value.first.return_value = state
+    db.scalars.side_effect = db_rows
+    return crud_sync.get_changes(db, 2, cursor, limit), db
+
+
+def row(version, id, **fields):
+    return SimpleNamespace(row_version=version, id=id, **fields)
+
+
+def test_cursor_before_the_floor_has_expired():
+    result, db = changes([], cursor=(3, 0, 1), state=(9, 4))
+
+    assert result is None
+    db.scalars.assert_not_called()
+
+
+def test_changes_of_all_kinds_come_in_version_order():
+    expenses = [row(3, 10), row(5, 11)]
+    budgets = [row(3, 7)]
+    tombstones = [row(4, 1, entity="expense", record_id=9)]
+
+    result, _ = changes([expenses, budgets, tombstones])
+
+    assert result.expenses == expenses
+    assert result.budgets == budgets
+    assert result.deleted == [("expense", 9)]
+    # Past the user's current version, so the next sync starts after it
+    assert result.cursor == (9, 3, 0)
+    assert result.has_more is False
+
+
+def test_a_full_page_ends_at_its_last_change():
+    expenses = [row(3, 10), row(5, 11)]
+    budgets = [row(4, 7)]
+
+    result, _ = changes([expenses, budgets, []], limit=2)
+
+    assert result.expenses == [expenses[0]]
+    assert result.budgets == budgets
+    assert result.cursor == (4, 1, 7)
+    assert result.has_more is True
+
+
+def test_only_committed_versions_after_the_cursor_are_read():
+    _, db = changes([[], [], []], cursor=(4, 1, 7))
+
+    expenses, budgets, tombstones = (
+        str(c.args[0].compile(dialect=postgresql.dialect()))
+        for c in db.scalars.call_args_list
+    )
+    assert "expenses.row_version <= %(row_version_1)s" in expenses
+    # Expenses rank before budgets, so those of the cursor's version are done
+    assert "expenses.row_version > %(row_version_2)s" in expenses
+    assert "(budgets.row_version, budgets.id) > (" in budgets
+    assert "sync_tombstones.row_version >= %(row_version_2)s" in tombstones
+
+
+def test_no_deletions_record_no_tombstones():
+    db = MagicMock()
+
+    crud_sync.record_deletions(db, 2, crud_sync.EXPENSE, [], 5)
+
+    db.execute.assert_not_called()
+
+
+def test_expired_cursor_answers_gone():
+    with patch.object(crud_sync, "get_changes", return_value=None):
+        with pytest.raises(HTTPException) as raised:
+            sync_endpoints.sync(
+                since="3.0.1", limit=500, db=MagicMock(), current_user=user
+            )
+    assert raised.value.status_code == 410
+
+
+def test_malformed_cursor_is_unprocessable():
+    with pytest.raises(HTTPException) as raised:
+        sync_endpoints.sync(since="3", limit=500, db=MagicMock(), current_user=user)
+    assert raised.value.status_code == 422
@@ -0,0 +1,60 @@
+"""
+Tests of the verified-token cache.
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.app.api import deps
+from src.app.core.token_cache import VerifiedTokenCache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    deps.get_token_cache().clear()
+    yield
+    deps.get_token_cache().clear()
+
+
+def test_claims_are_returned_until_the_token_expires(monkeypatch):
+    cache = VerifiedTokenCache()
+    cache.put("token", {"user_id": 1, "exp": 1000})
+
+    monkeypatch.setattr(time, "time", lambda: 999.0)
+    assert cache.get("token") == {"user_id": 1, "exp": 1000}
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    assert cache.get("token") is None
+
+
+def test_tokens_without_expiry_are_not_cached():
+    cache = VerifiedTokenCache()
+    cache.put("token", {"user_id": 1})
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    cache.get("a")
+    cache.put("c", {"exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert all(len(key) == 32 for key in cache._entries)
+
+
+def test_signature_is_verified_once_per_token():
+    token = deps.create_access_token({"user_id": 4})
+    user = MagicMock()
+
+    with patch.object(deps.jwt, "decode", wraps=deps.jwt.decode) as decode, patch(
+        "src.app.crud.users.get_user_by_id", return_value=user
+    ), patch.object(deps, "route_session"):
+        assert deps.get_current_user(db=None, token=token) is user
+        assert deps.get_current_user(db=None, token=token) is user
+
+    decode.assert_called_once()
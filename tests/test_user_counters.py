@@ -0,0 +1,90 @@
+"""
+Tests of the per-user counters behind X-Total-Count.
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from fastapi import Response
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1.endpoints import expenses as expense_endpoints
+from src.app.crud import expenses as crud_expenses
+from src.app.crud import user_counters as crud_user_counters
+
+
+def test_counts_are_upserted_atomically():
+    db = MagicMock()
+
+    crud_user_counters.adjust_user_counters(db, 2, expenses=-1)
+
+    (stmt,), _ = db.scalar.call_args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (user_id) DO UPDATE SET" in sql
+    assert "expense_count = (user_counters.expense_count + excluded" in sql
+    db.commit.assert_not_called()
+
+
+def test_every_write_advances_the_change_version():
+    db = MagicMock()
+    db.scalar.return_value = 8
+
+    assert crud_user_counters.adjust_user_counters(db, 2) == 8
+
+    (stmt,), _ = db.scalar.call_args
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "change_version = (user_counters.change_version + " in sql
+    assert sql.endswith("RETURNING user_counters.change_version")
+
+
+def test_user_without_counters_has_zero_counts():
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = None
+
+    assert crud_user_counters.get_user_counts(db, 2) == (0, 0)
+
+
+def test_expense_delete_decrements_the_count():
+    db = MagicMock()
+    with patch.object(
+        crud_expenses.crud_category_totals, "adjust_category_totals"
+    ), patch.object(
+        crud_expenses.crud_user_counters, "adjust_user_counters"
+    ) as adjust, patch.object(
+        crud_expenses.crud_changes, "publish_expense_change"
+    ):
+        crud_expenses.delete_expense(db, expense_id=1, user_id=2)
+
+    adjust.assert_called_once_with(db, 2, expenses=-1)
+
+
+def test_search_count_estimate_comes_from_the_plan():
+    db = MagicMock()
+    db.get_bind.return_value.dialect = postgresql.dialect()
+    explain = db.connection.return_value.exec_driver_sql
+    explain.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 42}}]
+
+    assert crud_expenses.count_search_expenses(db, 2, "coffee", estimate=True) == 42
+
+    (sql, params), _ = explain.call_args
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT expenses.id")
+    assert 2 in params.values()
+    db.scalar.assert_not_called()
+
+
+def test_projected_list_carries_the_total_count():
+    user = SimpleNamespace(id=2)
+    with patch.object(
+        crud_user_counters, "get_user_counts", return_value=(7, 1)
+    ), patch.object(crud_expenses, "get_expenses", return_value=[("Food",)]):
+        result = expense_endpoints.read_expenses(
+            Response(),
+            fields="category",
+            response_format="columnar",
+            db=MagicMock(),
+            current_user=user,
+        )
+
+    assert result.headers["X-Total-Count"] == "7"
+    assert json.loads(result.body) == {"category": ["Food"]}
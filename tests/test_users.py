@@ -0,0 +1,141 @@
+"""
+Tests of registering users and changing their settings across shards.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from src.app.crud import users as crud_users
+from src.app.db import session
+from src.app.schemas.users import UserCreate
+
+new_user = UserCreate(email="ana@example.com", password="s3cret-pass")
+
+
+def test_new_users_are_spread_over_the_shards():
+    settings = SimpleNamespace(database_shard_urls=["postgresql://a", "postgresql://b"])
+    with patch.object(session, "get_settings", return_value=settings):
+        assert [session.shard_for_user(i) for i in range(4)] == [0, 1, 2, 0]
+
+
+def register(shard):
+    db = MagicMock()
+    with patch.object(crud_users, "shard_for_user", return_value=shard), patch.object(
+        crud_users, "hash_password", return_value="hash"
+    ), patch.object(crud_users, "copy_user_row") as copy:
+        user = crud_users.create_user(db, new_user)
+    return user, copy
+
+
+def test_user_on_the_main_database_is_not_copied():
+    user, copy = register(0)
+
+    assert user.shard == 0
+    copy.assert_not_called()
+
+
+def test_user_placed_on_another_shard_is_copied_there():
+    user, copy = register(2)
+
+    assert user.shard == 2
+    assert copy.call_args.args[1:] == (user.id, 2)
+
+
+def test_request_session_is_moved_to_the_users_shard():
+    db, engine = MagicMock(), MagicMock()
+    with patch.object(session, "get_engine", return_value=engine):
+        session.route_session(db, 1)
+
+    db.close.assert_called_once()
+    assert db.bind is engine
+
+
+def test_session_of_a_main_database_user_is_left_alone():
+    db = MagicMock()
+    with patch.object(session, "get_engine") as get_engine:
+        session.route_session(db, 0)
+
+    get_engine.assert_not_called()
+    db.close.assert_not_called()
+
+
+def test_registration_is_committed_before_the_shard_copy():
+    db = MagicMock()
+    calls = MagicMock()
+    db.commit.side_effect = calls.commit
+    with patch.object(crud_users, "shard_for_user", return_value=1), patch.object(
+        crud_users, "hash_password", return_value="hash"
+    ), patch.object(crud_users, "copy_user_row", calls.copy):
+        crud_users.create_user(db, new_user)
+
+    assert [c[0] for c in calls.mock_calls] == ["commit", "copy"]
+    db.execute.assert_not_called()
+
+
+def test_registration_is_removed_if_the_shard_copy_fails():
+    db = MagicMock()
+    with patch.object(crud_users, "shard_for_user", return_value=1), patch.object(
+        crud_users, "hash_password", return_value="hash"
+    ), patch.object(crud_users, "copy_user_row", side_effect=OSError("shard down")):
+        with pytest.raises(OSError):
+            crud_users.create_user(db, new_user)
+
+    (statement,), _ = db.execute.call_args
+    assert str(statement).startswith("DELETE FROM users")
+    assert db.commit.call_count == 2
+
+
+def test_timezone_must_be_an_iana_name():
+    assert new_user.timezone == "UTC"
+    with pytest.raises(ValidationError):
+        UserCreate(email="ana@example.com", password="s3cret-pass", timezone="CEST")
+
+
+def test_timezone_change_moves_hot_expenses_to_their_new_days():
+    db = MagicMock()
+    user = SimpleNamespace(id=5, shard=0, timezone="UTC")
+
+    with patch.object(crud_users, "get_shard_session") as directory:
+        crud_users.set_user_timezone(db, user, "Europe/Berlin")
+
+    (set_timezone,), (rebucket,) = [c.args for c in db.execute.call_args_list]
+    assert str(set_timezone).startswith("UPDATE users SET timezone=")
+    sql = str(rebucket.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE expenses SET local_date=CAST(timezone(")
+    db.commit.assert_called_once()
+    directory.assert_not_called()
+    assert user.timezone == "Europe/Berlin"
+
+
+def test_timezone_is_changed_in_the_directory_first():
+    db, directory = MagicMock(), MagicMock()
+    calls = MagicMock()
+    directory.commit.side_effect = calls.directory_commit
+    db.execute.side_effect = lambda *args: calls.shard_execute(*args)
+    user = SimpleNamespace(id=5, shard=1, timezone="UTC")
+
+    with patch.object(crud_users, "get_shard_session", return_value=directory):
+        crud_users.set_user_timezone(db, user, "Europe/Berlin")
+
+    assert [c[0] for c in calls.mock_calls][:2] == [
+        "directory_commit",
+        "shard_execute",
+    ]
+    (statement,), _ = directory.execute.call_args
+    assert "users.timezone != " in str(statement)
+    assert user.timezone == "Europe/Berlin"
+
+
+def test_timezone_already_on_the_shard_is_not_reapplied():
+    db = MagicMock()
+    db.execute.return_value.first.return_value = None
+    user = SimpleNamespace(id=5, shard=0, timezone="UTC")
+
+    crud_users.set_user_timezone(db, user, "UTC")
+
+    assert db.execute.call_count == 1
+    db.commit.assert_called_once()